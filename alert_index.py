@@ -0,0 +1,223 @@
+import itertools
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+from journal import Journal
+
+class PriceAlert:
+    """A user-defined alert: price crossing a level, or moving a percentage from a reference"""
+    
+    __slots__ = ("alert_id", "asset", "chat_id", "kind", "value", "reference", "repeat", "direction")
+    
+    def __init__(self, alert_id: int, asset: str, chat_id: str, kind: str, value: float,
+                 reference: float, repeat: bool = False, direction: str = ""):
+        self.alert_id = alert_id
+        self.asset = asset
+        self.chat_id = str(chat_id)
+        self.kind = kind  # "cross" or "percent"
+        self.value = float(value)  # Level for cross alerts, percentage for percent alerts
+        self.reference = float(reference)  # Price when the alert was (re-)armed
+        self.repeat = bool(repeat)
+        self.direction = direction  # "up" or "down" for cross alerts
+    
+    def levels(self) -> Tuple[Optional[float], Optional[float]]:
+        """Upper and lower trigger levels; None where the alert has no trigger"""
+        if self.kind == "cross":
+            if self.direction == "up":
+                return self.value, None
+            return None, self.value
+        move = self.reference * self.value / 100
+        return self.reference + move, self.reference - move
+    
+    def to_row(self) -> list:
+        return [self.alert_id, self.asset, self.chat_id, self.kind, self.value,
+                self.reference, int(self.repeat), self.direction]
+    
+    @classmethod
+    def from_row(cls, row: list) -> "PriceAlert":
+        return cls(*row)
+    
+    def to_dict(self) -> Dict:
+        upper, lower = self.levels()
+        return {
+            "id": self.alert_id,
+            "asset": self.asset,
+            "chat_id": self.chat_id,
+            "kind": self.kind,
+            "value": self.value,
+            "reference": self.reference,
+            "repeat": self.repeat,
+            "upper": upper,
+            "lower": lower
+        }
+
+class AlertIndex:
+    """Sorted upper and lower trigger levels for one asset
+    
+    A tick at price p fires every upper level <= p and every lower level >= p.
+    Both are found with bisect and removed as one slice, so evaluating a tick
+    costs O(log n + fired) comparisons however many alerts are armed.
+    """
+    
+    def __init__(self):
+        self.upper: List[Tuple[float, int]] = []  # (level, alert_id), fire when price >= level
+        self.lower: List[Tuple[float, int]] = []  # (level, alert_id), fire when price <= level
+    
+    def __len__(self) -> int:
+        return len(self.upper) + len(self.lower)
+    
+    def arm(self, alert: PriceAlert):
+        upper, lower = alert.levels()
+        if upper is not None:
+            insort(self.upper, (upper, alert.alert_id))
+        if lower is not None:
+            insort(self.lower, (lower, alert.alert_id))
+    
+    def disarm(self, alert: PriceAlert):
+        upper, lower = alert.levels()
+        if upper is not None:
+            self._discard(self.upper, (upper, alert.alert_id))
+        if lower is not None:
+            self._discard(self.lower, (lower, alert.alert_id))
+    
+    @staticmethod
+    def _discard(levels: List[Tuple[float, int]], entry: Tuple[float, int]):
+        i = bisect_left(levels, entry)
+        if i < len(levels) and levels[i] == entry:
+            del levels[i]
+    
+    def evaluate(self, price: float) -> List[Tuple[int, float]]:
+        """Remove and return (alert_id, level) for every trigger the price has reached"""
+        hi = bisect_right(self.upper, (price, float("inf")))
+        lo = bisect_left(self.lower, (price, -1))
+        
+        fired = [(alert_id, level) for level, alert_id in self.upper[:hi]]
+        fired.extend((alert_id, level) for level, alert_id in self.lower[lo:])
+        del self.upper[:hi]
+        del self.lower[lo:]
+        return fired
+
+class PriceAlertBook:
+    """File-backed collection of price alerts with one AlertIndex per asset
+    
+    Alerts are saved through a Journal: each added, re-armed or removed alert
+    is one appended line, and the snapshot is only rewritten once the journal
+    outgrows the book.
+    """
+    
+    def __init__(self, filename: str = "price_alerts.json", compact_min: int = 1000):
+        self.filename = filename
+        self._journal = Journal(filename, "price alerts", compact_min)
+        self._alerts: Dict[int, PriceAlert] = {}
+        self._indexes: Dict[str, AlertIndex] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        """Load the snapshot, replay the journal over it and arm every alert"""
+        rows, changes = self._journal.load()
+        for row in rows:
+            alert = PriceAlert.from_row(row)
+            self._alerts[alert.alert_id] = alert
+        for op, value in changes:
+            if op == "put":
+                alert = PriceAlert.from_row(value)
+                self._alerts[alert.alert_id] = alert
+            else:
+                self._alerts.pop(value, None)
+        
+        for alert in self._alerts.values():
+            self._index(alert.asset).arm(alert)
+        self._ids = itertools.count(max(self._alerts, default=0) + 1)
+    
+    def _log(self, put: List[PriceAlert] = (), removed: List[int] = ()):
+        """Journal changes; call with the lock held"""
+        changes = [("put", alert.to_row()) for alert in put]
+        changes.extend(("del", alert_id) for alert_id in removed)
+        self._journal.append(
+            changes,
+            len(self._alerts),
+            lambda: [alert.to_row() for alert in self._alerts.values()]
+        )
+    
+    def _index(self, asset: str) -> AlertIndex:
+        index = self._indexes.get(asset)
+        if index is None:
+            index = self._indexes[asset] = AlertIndex()
+        return index
+    
+    def add_cross(self, asset: str, chat_id: str, level: float, current_price: float,
+                  repeat: bool = False) -> PriceAlert:
+        """Alert when the price crosses level from where it is now"""
+        direction = "up" if level > current_price else "down"
+        return self._add(PriceAlert(0, asset, chat_id, "cross", level, current_price, repeat, direction))
+    
+    def add_percent(self, asset: str, chat_id: str, percent: float, reference: float,
+                    repeat: bool = True) -> PriceAlert:
+        """Alert when the price moves percent either way from reference"""
+        return self._add(PriceAlert(0, asset, chat_id, "percent", abs(percent), reference, repeat))
+    
+    def _add(self, alert: PriceAlert) -> PriceAlert:
+        with self._lock:
+            alert.alert_id = next(self._ids)
+            self._alerts[alert.alert_id] = alert
+            self._index(alert.asset).arm(alert)
+            self._log(put=[alert])
+        return alert
+    
+    def remove(self, alert_id: int) -> bool:
+        """Remove an alert"""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+            self._index(alert.asset).disarm(alert)
+            self._log(removed=[alert_id])
+            return True
+    
+    def list(self, chat_id: Optional[str] = None) -> List[PriceAlert]:
+        """All alerts, or those of one chat"""
+        with self._lock:
+            return [
+                alert for alert in self._alerts.values()
+                if chat_id is None or alert.chat_id == str(chat_id)
+            ]
+    
+    def __len__(self) -> int:
+        return len(self._alerts)
+    
+    def evaluate(self, asset: str, price: float) -> List[Tuple[PriceAlert, float]]:
+        """Fire alerts reached by price, re-arming repeating ones and removing the rest"""
+        with self._lock:
+            index = self._indexes.get(asset)
+            if index is None or not len(index):
+                return []
+            
+            fired = []
+            rearmed = []
+            removed = []
+            seen = set()
+            for alert_id, level in index.evaluate(price):
+                alert = self._alerts.get(alert_id)
+                if alert is None or alert_id in seen:
+                    continue
+                seen.add(alert_id)
+                fired.append((alert, level))
+                
+                # A percent alert's other side must go too before it is re-armed
+                index.disarm(alert)
+                if alert.repeat:
+                    alert.reference = price
+                    if alert.kind == "cross":
+                        alert.direction = "down" if alert.direction == "up" else "up"
+                    index.arm(alert)
+                    rearmed.append(alert)
+                else:
+                    del self._alerts[alert_id]
+                    removed.append(alert_id)
+            
+            if fired:
+                self._log(rearmed, removed)
+            return fired
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bot import EthereumBot
+from config import Config
+
+class AsyncEthereumBot(EthereumBot):
+    """EthereumBot whose check cycle fetches prices, 24h data and news concurrently
+    
+    The cycle first gathers every network read it will need with asyncio, each
+    bounded by its own timeout, then runs the unchanged alert, report and news
+    logic against those results. Alert and report semantics therefore match
+    EthereumBot exactly; only the waiting overlaps. Fetches run on worker
+    threads over the shared pooled HTTP client, so no async HTTP library is needed.
+    """
+    
+    def __init__(self, config: Optional[Config] = None):
+        super().__init__(config)
+        self._cycle = threading.local()
+    
+    def _prefetched(self) -> Dict[str, Any]:
+        """Results prefetched for the cycle running on this thread"""
+        return getattr(self._cycle, "results", {})
+    
+    async def _fetch(self, name: str, func: Callable, *args) -> Any:
+        """Run a blocking fetch on a worker thread with a timeout"""
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(func, *args),
+                timeout=self.config.async_fetch_timeout
+            )
+        except asyncio.TimeoutError:
+            print(f"⏱️ {name} fetch timed out after {self.config.async_fetch_timeout}s")
+            self.store.set("last_error", f"{name} fetch timed out")
+        except Exception as e:
+            print(f"Error fetching {name}: {e}")
+        return None
+    
+    async def prefetch(self, prices_only: bool = False) -> Dict[str, Any]:
+        """Fetch everything the check cycle needs at once, or just the prices"""
+        fetches = {
+            "prices": self._fetch("prices", super().get_prices, None)
+        }
+        if not prices_only and self._daily_report_due():
+            fetches["eth_24h"] = self._fetch("24h data", super().get_eth_24h_data)
+        if not prices_only and self.config.has_cryptopanic_key:
+            fetches["news"] = self._fetch("news", super().get_crypto_news)
+        
+        results = await asyncio.gather(*fetches.values())
+        return {
+            name: result
+            for name, result in zip(fetches, results)
+            if result is not None
+        }
+    
+    async def _run_prefetched(self, func: Callable, prices_only: bool = False):
+        """Prefetch, then run func on a worker thread against the results"""
+        started = datetime.now()
+        results = await self.prefetch(prices_only)
+        print(f"🌐 Prefetched {', '.join(results) or 'nothing'} in {(datetime.now() - started).total_seconds():.2f}s")
+        await asyncio.to_thread(self._run_with_results, func, results)
+    
+    async def run_check_cycle_async(self):
+        """Run a complete check cycle with concurrent fetches"""
+        await self._run_prefetched(super().run_check_cycle)
+    
+    def _run_with_results(self, func: Callable, results: Dict[str, Any]):
+        """Run synchronous bot logic against prefetched results"""
+        self._cycle.results = results
+        try:
+            func()
+        finally:
+            self._cycle.results = {}
+    
+    def run_check_cycle(self):
+        """Run a complete check cycle"""
+        asyncio.run(self.run_check_cycle_async())
+    
+    def run_price_check(self):
+        """Run the price alert check on prices fetched within async_fetch_timeout
+        
+        The scheduled Price Monitoring task in async mode; reports and news keep
+        their own hourly and 5-minute tasks, so their timing matches EthereumBot.
+        """
+        asyncio.run(self._run_prefetched(super().check_price_alerts, prices_only=True))
+    
+    def get_prices(self, crypto_ids: Optional[List[str]] = None) -> Dict[str, Optional[float]]:
+        """Get prices, using this cycle's prefetched prices when they cover crypto_ids"""
+        prices = self._prefetched().get("prices")
+        crypto_ids = crypto_ids or self.config.cryptocurrencies
+        if prices and all(crypto_id in prices for crypto_id in crypto_ids):
+            return {crypto_id: prices[crypto_id] for crypto_id in crypto_ids}
+        return super().get_prices(crypto_ids)
+    
+    def get_eth_24h_data(self) -> Optional[Tuple[float, float]]:
+        """Get 24h data, using this cycle's prefetched result if there is one"""
+        results = self._prefetched()
+        if "eth_24h" in results:
+            return results["eth_24h"]
+        return super().get_eth_24h_data()
+    
+    def get_crypto_news(self) -> List[Dict]:
+        """Get news, using this cycle's prefetched result if there is one"""
+        results = self._prefetched()
+        if "news" in results:
+            return results["news"]
+        return super().get_crypto_news()
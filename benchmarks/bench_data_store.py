@@ -0,0 +1,111 @@
+"""Micro-benchmark: DataStore read throughput and latency under concurrent writes
+
+Reader threads call get() in a loop while writer threads set, increment and
+compare_and_set. Each writer count is run twice: with the store's lock-free
+snapshot reads, and with reads taken under the write lock as a baseline.
+Every run also checks that no increments were lost.
+
+    python benchmarks/bench_data_store.py --duration 2 --writers 0 1 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import DataStore
+
+def run(writers: int, readers: int, duration: float, locked_reads: bool,
+        flush_interval, write_rate: float) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench-store-")
+    store = DataStore(os.path.join(directory, "bot_data.json"), flush_interval=flush_interval)
+    store.set("total_alerts_sent", 0)
+    stop = threading.Event()
+    read_counts = [0] * readers
+    latencies = [[] for _ in range(readers)]
+    write_counts = [0] * writers
+    
+    def reader(i: int):
+        count = 0
+        samples = latencies[i]
+        clock = time.perf_counter
+        while not stop.is_set():
+            start = clock()
+            if locked_reads:
+                with store._lock:
+                    store.get("total_alerts_sent")
+            else:
+                store.get("total_alerts_sent")
+            if not count & 15:
+                samples.append(clock() - start)
+            count += 1
+        read_counts[i] = count
+    
+    def writer(i: int):
+        count = 0
+        interval = 1 / write_rate if write_rate else 0
+        while not stop.is_set():
+            store.set(f"writer_{i}", count)
+            store.increment("total_alerts_sent")
+            store.compare_and_set(f"writer_{i}", count, count + 1)
+            count += 1
+            if interval:
+                time.sleep(interval)
+        write_counts[i] = count
+    
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    store.flush()
+    
+    samples = sorted(s for thread_samples in latencies for s in thread_samples)
+    increments = sum(write_counts)
+    return {
+        "reads": "locked" if locked_reads else "snapshot",
+        "writers": writers,
+        "reads_per_sec": round(sum(read_counts) / elapsed),
+        "read_p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 2) if samples else None,
+        "read_max_us": round(samples[-1] * 1e6, 1) if samples else None,
+        "write_cycles_per_sec": round(increments / elapsed),
+        "lost_increments": increments - store.get("total_alerts_sent")
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=2, help="Seconds per run")
+    parser.add_argument("--readers", type=int, default=2, help="Reader threads")
+    parser.add_argument("--writers", type=int, nargs="+", default=[0, 1, 4], help="Writer thread counts to try")
+    parser.add_argument("--flush-interval", type=float, default=None,
+                        help="Store flush interval; default writes through on every change")
+    parser.add_argument("--write-rate", type=float, default=0,
+                        help="Write cycles per second per writer; 0 is unthrottled")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    results = []
+    for writers in args.writers:
+        for locked_reads in (False, True):
+            results.append(run(writers, args.readers, args.duration, locked_reads,
+                               args.flush_interval, args.write_rate))
+            if not args.json:
+                r = results[-1]
+                print(f"{r['reads']:>8} reads, {r['writers']} writers: {r['reads_per_sec']:>9,} reads/s  "
+                      f"p99 {r['read_p99_us']}us  max {r['read_max_us']}us  "
+                      f"{r['write_cycles_per_sec']:,} write cycles/s  lost increments {r['lost_increments']}")
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
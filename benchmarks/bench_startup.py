@@ -0,0 +1,140 @@
+"""Startup benchmark: import-to-first-cycle for the CLI and import-to-first-request for the web app
+
+Each run is a fresh Python process in a scratch directory with dummy
+credentials. Outbound HTTP goes to canned CoinGecko, CryptoPanic and
+Telegram responses that each take --latency seconds, so the timings count
+the round trips startup makes without touching the network. The first run
+starts from an empty directory (cold); later runs reuse its files (warm).
+
+    python benchmarks/bench_startup.py --runs 5 --latency 0.1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; prints one JSON line of phase timings
+CHILD = r'''
+import json, sys, time
+import requests
+import http_client
+
+LATENCY = float(sys.argv[2])
+calls = []
+
+def canned(self, method, url, **kwargs):
+    calls.append(url.split("?")[0].rstrip("/").rsplit("/", 1)[-1])
+    time.sleep(LATENCY)
+    response = requests.Response()
+    response.status_code = 200
+    if "getMe" in url:
+        body = {"ok": True, "result": {"id": 1, "username": "bench_bot"}}
+    elif "api.telegram.org" in url:
+        body = {"ok": True, "result": []}
+    elif "simple/price" in url:
+        body = {i: {"usd": 100.0} for i in kwargs["params"]["ids"].split(",")}
+    elif "market_chart" in url:
+        start, end = kwargs["params"]["from"], kwargs["params"]["to"]
+        body = {"prices": [[t * 1000, 100.0] for t in range(start, end + 1, 3600)]}
+    elif "cryptopanic" in url:
+        body = {"results": []}
+    else:
+        response.status_code = 404
+        body = {}
+    response._content = json.dumps(body).encode()
+    return response
+
+http_client.HttpClient.request = canned
+t_stub = time.perf_counter()
+result = {}
+
+if sys.argv[1] == "cli":
+    import main
+    from config import Config
+    t_import = time.perf_counter()
+    config = Config()
+    from bot import EthereumBot
+    bot = EthereumBot(config)
+    t_ready = time.perf_counter()
+    bot.run_check_cycle()
+    t_done = time.perf_counter()
+    bot.outbox.stop()
+    bot.store.flush()
+    result["first_cycle_ms"] = (t_done - t_ready) * 1000
+else:
+    import web_app
+    t_import = time.perf_counter()
+    client = web_app.app.test_client()
+    t_ready = time.perf_counter()
+    response = client.get("/api/status")
+    t_done = time.perf_counter()
+    assert response.status_code == 200, response.status_code
+    result["first_request_ms"] = (t_done - t_ready) * 1000
+
+# The stub's own imports are left out of the totals
+result.update({
+    "import_ms": (t_import - t_stub) * 1000,
+    "init_ms": (t_ready - t_import) * 1000,
+    "total_ms": (t_done - t_stub) * 1000,
+    "upstream_calls": calls
+})
+print(json.dumps(result))
+'''
+
+def run_once(mode: str, directory: str, latency: float) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": REPO,
+        "TELEGRAM_TOKEN": "1:bench",
+        "TELEGRAM_USER_ID": "1",
+        "CRYPTOPANIC_API_KEY": "bench"
+    })
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, str(latency)],
+        cwd=directory, env=env, capture_output=True, text=True
+    )
+    wall = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = wall
+    return result
+
+def summarize(runs: list) -> dict:
+    keys = [key for key, value in runs[0].items() if isinstance(value, float)]
+    summary = {key: round(statistics.median(run[key] for run in runs), 1) for key in keys}
+    summary["upstream_calls"] = runs[0]["upstream_calls"]
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode; the first is cold")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per canned upstream response")
+    parser.add_argument("--modes", nargs="+", default=["cli", "web"], choices=["cli", "web"])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    results = {}
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory(prefix=f"bench-startup-{mode}-") as directory:
+            runs = [run_once(mode, directory, args.latency) for _ in range(max(2, args.runs))]
+        results[mode] = {"cold": summarize(runs[:1]), "warm": summarize(runs[1:])}
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for mode, phases in results.items():
+        for phase, r in phases.items():
+            timings = "  ".join(f"{key[:-3]} {value:,.0f}ms" for key, value in r.items() if key.endswith("_ms"))
+            print(f"{mode:>3} {phase}: {timings}  upstream calls {len(r['upstream_calls'])}: "
+                  f"{', '.join(r['upstream_calls'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Offline benchmark suite: check cycle, alert evaluation, DataStore writes, scheduler and dashboard
+
+Everything runs against local stand-ins for CoinGecko, CryptoPanic and
+Telegram (see standins.py) inside a scratch directory, so no live service
+is touched and no state files are left behind. Results are written as JSON;
+pass an earlier result file to --compare to see the change per metric.
+    
+    python benchmarks/run_suite.py --output results.json
+    python benchmarks/run_suite.py --latency 0.05 --error-rate 0.1 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from standins import StandinAPIs
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def timed(samples: List[float]) -> Dict[str, float]:
+    """Milliseconds summary of per-operation durations in seconds"""
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3)
+    }
+
+def bench_check_cycle(args, standins: StandinAPIs) -> Dict:
+    """Full run_check_cycle latency, forcing a fresh price fetch every cycle"""
+    from config import Config
+    from bot import EthereumBot
+    
+    bot = EthereumBot(Config())
+    before = standins.stats()
+    samples = []
+    for _ in range(args.cycles):
+        bot.price_cache.expire()
+        start = time.perf_counter()
+        bot.run_check_cycle()
+        samples.append(time.perf_counter() - start)
+    bot.outbox.drain(30)
+    bot.outbox.stop()
+    bot.store.flush()
+    
+    after = standins.stats()
+    return dict(timed(samples), cycles=args.cycles, upstream={
+        key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)
+    })
+
+def bench_alerts(args, standins: StandinAPIs) -> Dict:
+    """PriceAlertBook.evaluate and subscriber threshold lookups
+    
+    The quiet pass evaluates prices that reach no trigger, which is the common
+    case for every tick; the sweep then fires every alert, including
+    journaling the fired alerts after each evaluation that fires something.
+    """
+    from alert_index import PriceAlertBook
+    from subscribers import SubscriberRegistry
+    
+    rng = random.Random(1)
+    book = PriceAlertBook("bench_alerts.json")
+    start = time.perf_counter()
+    for alert_id in range(1, args.alerts + 1):
+        chat_id = str(alert_id % 50)
+        if alert_id % 2:
+            level = rng.choice((rng.uniform(2400, 2970), rng.uniform(3030, 3600)))
+            book.add_cross("ethereum", chat_id, level, 3000.0)
+        else:
+            book.add_percent("ethereum", chat_id, rng.uniform(1, 20), 3000.0, repeat=False)
+    add_seconds = time.perf_counter() - start
+    
+    registry = SubscriberRegistry("bench_subscribers.json")
+    for i in range(args.alerts // 10 or 1):
+        registry.add(str(i), ["ethereum"], rng.uniform(0.5, 5), [8])
+    
+    quiet = [rng.uniform(2990, 3010) for _ in range(args.ticks)]
+    start = time.perf_counter()
+    for price in quiet:
+        book.evaluate("ethereum", price)
+    evaluate_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for price in quiet:
+        registry.for_alert("ethereum", (price - 3000.0) / 30)
+    lookup_seconds = time.perf_counter() - start
+    
+    sweep = [3000 - 600 * i / 500 for i in range(500)] + [2400 + 1200 * i / 500 for i in range(501)]
+    fired = 0
+    start = time.perf_counter()
+    for price in sweep:
+        fired += len(book.evaluate("ethereum", price))
+    sweep_seconds = time.perf_counter() - start
+    
+    return {
+        "alerts": args.alerts,
+        "add_ms_per_alert": round(add_seconds / args.alerts * 1000, 3),
+        "quiet_evaluations_per_sec": round(args.ticks / evaluate_seconds),
+        "threshold_lookups_per_sec": round(args.ticks / lookup_seconds),
+        "sweep_fired": fired,
+        "sweep_ms_per_fired_alert": round(sweep_seconds / max(1, fired) * 1000, 3)
+    }
+
+def bench_data_store(args, standins: StandinAPIs) -> Dict:
+    """Cost of one set() and one increment() for each store flavour"""
+    from data_store import DataStore
+    from sqlite_store import SQLiteDataStore
+    
+    stores = {
+        "json_write_through": (lambda: DataStore("bench_through.json"), args.store_ops // 20 or 1),
+        "json_write_behind": (lambda: DataStore("bench_behind.json", flush_interval=5), args.store_ops),
+        "sqlite_wal": (lambda: SQLiteDataStore("bench_store.db", json_filename=None), args.store_ops)
+    }
+    results = {}
+    for name, (factory, ops) in stores.items():
+        store = factory()
+        start = time.perf_counter()
+        for i in range(ops):
+            store.set("last_ethereum_price", 3000.0 + i)
+        set_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(ops):
+            store.increment("total_alerts_sent")
+        increment_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        store.flush()
+        results[name] = {
+            "ops": ops,
+            "set_us": round(set_seconds / ops * 1e6, 2),
+            "increment_us": round(increment_seconds / ops * 1e6, 2),
+            "final_flush_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+    return results
+
+def bench_scheduler(args, standins: StandinAPIs) -> Dict:
+    """Dispatch accuracy and CPU cost of many short periodic no-op tasks"""
+    from scheduler import TaskScheduler
+    
+    interval = 0.05
+    runs: Dict[int, List[float]] = {i: [] for i in range(args.tasks)}
+    scheduler = TaskScheduler(max_workers=4)
+    for i in range(args.tasks):
+        scheduler.add_periodic_task(lambda i=i: runs[i].append(time.monotonic()), interval, f"task-{i}")
+    
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    scheduler.start()
+    time.sleep(args.duration)
+    scheduler.stop()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    
+    # Lateness of each run against the one before it
+    lateness = [
+        later - earlier - interval
+        for times in runs.values()
+        for earlier, later in zip(times, times[1:])
+    ]
+    total = sum(len(times) for times in runs.values())
+    return {
+        "tasks": args.tasks,
+        "interval_s": interval,
+        "runs": total,
+        "runs_per_sec": round(total / wall),
+        "lateness_mean_ms": round(statistics.mean(lateness) * 1000, 3) if lateness else None,
+        "lateness_p99_ms": round(percentile(lateness, 0.99) * 1000, 3) if lateness else None,
+        "cpu_per_run_us": round(cpu / total * 1e6, 1) if total else None
+    }
+
+def bench_dashboard(args, standins: StandinAPIs) -> Dict:
+    """Requests per second for dashboard endpoints over real HTTP"""
+    import requests
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import web_app
+    
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    service = web_app.get_service()
+    bot = service.get_bot()
+    for crypto_id in bot.config.cryptocurrencies:
+        for i in range(200):
+            bot._record_price(crypto_id, time.time() - (200 - i) * 60, 3000.0 + i)
+    bot.get_prices()
+    
+    server = make_server("127.0.0.1", 0, web_app.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    etag = requests.get(f"{base}/api/status").headers["ETag"]
+    
+    endpoints = {
+        "status": ("/api/status", {}),
+        "status_304": ("/api/status", {"If-None-Match": etag}),
+        "price_series": ("/api/price-series?id=ethereum&limit=200", {})
+    }
+    results = {}
+    for name, (path, headers) in endpoints.items():
+        counts = [0] * args.clients
+        stop = threading.Event()
+        
+        def client(i: int):
+            session = requests.Session()
+            while not stop.is_set():
+                session.get(f"{base}{path}", headers=headers)
+                counts[i] += 1
+        
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        results[name] = {"requests_per_sec": round(sum(counts) / (time.perf_counter() - start), 1)}
+    
+    server.shutdown()
+    bot.outbox.stop()
+    return dict(results, clients=args.clients)
+
+BENCHMARKS: Dict[str, Callable] = {
+    "check_cycle": bench_check_cycle,
+    "alerts": bench_alerts,
+    "data_store": bench_data_store,
+    "scheduler": bench_scheduler,
+    "dashboard": bench_dashboard
+}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by dotted path"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def compare(current: Dict, baseline: Dict):
+    """Print each metric next to its baseline value"""
+    now = flatten(current["benchmarks"])
+    before = flatten(baseline.get("benchmarks", {}))
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')}):")
+    for key in sorted(now.keys() & before.keys()):
+        if before[key]:
+            change = (now[key] - before[key]) / abs(before[key]) * 100
+            print(f"  {key:<50} {before[key]:>12,.3f} -> {now[key]:>12,.3f}  {change:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier JSON results to compare with")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stand-in share of 5xx responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Stand-in share of 429 responses")
+    parser.add_argument("--cycles", type=int, default=10, help="Check cycles to time")
+    parser.add_argument("--alerts", type=int, default=2000, help="Price alerts in the alert book")
+    parser.add_argument("--ticks", type=int, default=20000, help="Quiet prices evaluated against the alerts")
+    parser.add_argument("--store-ops", type=int, default=2000, help="Writes per store flavour")
+    parser.add_argument("--tasks", type=int, default=20, help="Periodic tasks for the scheduler benchmark")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent dashboard clients")
+    parser.add_argument("--duration", type=float, default=3, help="Seconds for timed benchmarks")
+    args = parser.parse_args()
+    
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    
+    standins = StandinAPIs(latency=args.latency, error_rate=args.error_rate,
+                           rate_limit_rate=args.rate_limit_rate).start()
+    os.environ.update(standins.env())
+    os.environ["STORE_BACKEND"] = "json"
+    os.environ["PRICE_STREAM_URL"] = ""
+    
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": vars(args),
+        "benchmarks": {}
+    }
+    with tempfile.TemporaryDirectory(prefix="bench-suite-") as directory:
+        os.chdir(directory)
+        for name in args.only or BENCHMARKS:
+            print(f"▶ {name}", file=sys.stderr)
+            start = time.perf_counter()
+            results["benchmarks"][name] = BENCHMARKS[name](args, standins)
+            print(f"  {json.dumps(results['benchmarks'][name])} ({time.perf_counter() - start:.1f}s)",
+                  file=sys.stderr)
+        os.chdir(REPO)
+    standins.stop()
+    
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {output}", file=sys.stderr)
+    else:
+        print(json.dumps(results, indent=2))
+    if baseline:
+        compare(results, baseline)
+
+if __name__ == "__main__":
+    main()
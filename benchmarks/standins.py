@@ -0,0 +1,188 @@
+"""Local stand-ins for the CoinGecko, CryptoPanic and Telegram APIs
+
+One threaded HTTP server answers all three under their own path prefixes:
+
+    CoinGecko    /api/v3/simple/price, /api/v3/coins/<id>/market_chart/range
+    CryptoPanic  /api/v1/posts/
+    Telegram     /bot<token>/getMe, /sendMessage, /getUpdates
+
+Every response waits latency seconds. A share of requests fail with a 5xx
+(error_rate) or a 429 with Retry-After (rate_limit_rate), so retries and
+fallbacks can be measured too. Point the bot at it with the variables from
+env(), or run this file and export what it prints.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+MARKET_CHART_PATH = re.compile(r"^/api/v3/coins/([^/]+)/market_chart/range$")
+
+class StandinAPIs:
+    """Stand-in upstream APIs on one local port, with request and status counts"""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: int = 1,
+                 prices: Optional[Dict[str, float]] = None, volatility: float = 0.002):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.prices = dict(prices or {"ethereum": 3000.0, "chainlink": 15.0})
+        self.volatility = volatility
+        self.requests: Counter = Counter()  # "api status" -> count
+        self._lock = threading.Lock()
+        self._news_id = 0
+        self._message_id = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point Config at these stand-ins"""
+        return {
+            "COINGECKO_API_URL": f"{self.base_url}/api/v3",
+            "CRYPTOPANIC_API_URL": f"{self.base_url}/api/v1",
+            "TELEGRAM_API_URL": self.base_url,
+            "TELEGRAM_TOKEN": "1:standin",
+            "TELEGRAM_USER_ID": "1",
+            "CRYPTOPANIC_API_KEY": "standin"
+        }
+    
+    def start(self) -> "StandinAPIs":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.requests)
+    
+    def _walk(self) -> Dict[str, float]:
+        """Move every price one random step and return them all"""
+        with self._lock:
+            for crypto_id in self.prices:
+                self.prices[crypto_id] *= 1 + random.gauss(0, self.volatility)
+            return dict(self.prices)
+    
+    def _route(self, path: str, query: Dict[str, str]):
+        """(api, status, body) for a request that is not failed on purpose"""
+        if path == "/api/v3/simple/price":
+            prices = self._walk()
+            ids = [i for i in query.get("ids", "").split(",") if i in prices]
+            return "coingecko", 200, {i: {"usd": round(prices[i], 4)} for i in ids}
+        
+        match = MARKET_CHART_PATH.match(path)
+        if match:
+            price = self.prices.get(match.group(1), 100.0)
+            start, end = int(query.get("from", 0)), int(query.get("to", 0))
+            points = []
+            for timestamp in range(start - start % 300 + 300, end + 1, 300):
+                price *= 1 + random.gauss(0, self.volatility)
+                points.append([timestamp * 1000, round(price, 4)])
+            return "coingecko", 200, {"prices": points}
+        
+        if path == "/api/v1/posts/":
+            with self._lock:
+                self._news_id += 1
+                news_id = self._news_id
+            published = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            return "cryptopanic", 200, {"results": [{
+                "title": f"Stand-in headline {news_id}",
+                "url": f"https://example.com/news/{news_id}",
+                "published_at": published,
+                "source": {"title": "Stand-in"}
+            }]}
+        
+        if path.startswith("/bot"):
+            method = path.rsplit("/", 1)[-1]
+            if method == "getMe":
+                return "telegram", 200, {"ok": True, "result": {"id": 1, "username": "standin_bot"}}
+            if method == "sendMessage":
+                with self._lock:
+                    self._message_id += 1
+                    message_id = self._message_id
+                return "telegram", 200, {"ok": True, "result": {"message_id": message_id}}
+            return "telegram", 200, {"ok": True, "result": []}
+        
+        return "unknown", 404, {"error": "not found"}
+    
+    def _handler(self):
+        standins = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+            
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                parts = urlsplit(self.path)
+                query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                api, status, body = standins._route(parts.path, query)
+                
+                if standins.latency:
+                    time.sleep(standins.latency)
+                headers = {}
+                roll = random.random()
+                if api != "unknown" and roll < standins.rate_limit_rate:
+                    status = 429
+                    headers["Retry-After"] = str(standins.retry_after)
+                    body = {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                            "parameters": {"retry_after": standins.retry_after}}
+                elif api != "unknown" and roll < standins.rate_limit_rate + standins.error_rate:
+                    status = random.choice((500, 502, 503))
+                    body = {"error": "stand-in failure"}
+                
+                with standins._lock:
+                    standins.requests[f"{api} {status}"] += 1
+                
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+            
+            do_GET = _serve
+            do_POST = _serve
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-ins for CoinGecko, CryptoPanic and Telegram")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 5xx responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of 429 responses")
+    args = parser.parse_args()
+    
+    standins = StandinAPIs(args.host, args.port, args.latency, args.error_rate, args.rate_limit_rate)
+    for name, value in standins.env().items():
+        print(f"export {name}={value}")
+    try:
+        standins.server.serve_forever()
+    except KeyboardInterrupt:
+        standins.server.server_close()
@@ -1,93 +1,201 @@
-import requests
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from config import Config
 from data_store import DataStore
+from sqlite_store import SQLiteDataStore, SQLiteTimeSeriesStore
+from http_client import HttpClient, get_http_client
+from price_cache import PriceCache
+from timeseries import TimeSeriesStore
+from rolling_stats import RollingStats
+from history_fetcher import MarketChartFetcher
+from subscribers import SubscriberRegistry
+from alert_index import PriceAlertBook
+from price_feed import NDJSONFeed, StreamIngestor
+from telegram_queue import PRIORITY_ALERT, PRIORITY_NEWS, PRIORITY_REPORT, RetryLater, TelegramQueue
 
 class EthereumBot:
     """Ethereum monitoring bot with Telegram notifications"""
     
-    def __init__(self):
-        self.config = Config()
-        self.store = DataStore()
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or Config()
+        if self.config.store_backend == "sqlite":
+            self.store = SQLiteDataStore(self.config.store_database)
+        else:
+            self.store = DataStore(flush_interval=self.config.store_flush_interval)
+        self.http = get_http_client(
+            retries=self.config.http_retries,
+            backoff_factor=self.config.http_backoff_factor,
+            max_backoff=self.config.http_max_backoff,
+            pool_size=self.config.http_pool_size,
+            timeout=self.config.http_timeout
+        )
+        self.price_cache = PriceCache(
+            self._fetch_prices,
+            ttl=self.config.price_cache_ttl,
+            store=self.store,
+            persist_interval=self.config.price_cache_persist_interval
+        )
+        self.outbox = TelegramQueue(
+            self._queue_send,
+            filename=self.config.telegram_outbox_file,
+            on_delivered=self._on_message_delivered,
+            global_rate=self.config.telegram_global_rate,
+            chat_rate=self.config.telegram_chat_rate,
+            group_rate=self.config.telegram_group_rate,
+            max_attempts=self.config.telegram_max_attempts,
+            send_workers=self.config.telegram_send_workers
+        )
+        self.price_alerts = PriceAlertBook(self.config.price_alerts_file)
+        self.subscribers = SubscriberRegistry(self.config.subscribers_file)
+        self.subscribers.ensure_default(
+            self.config.telegram_user_id,
+            self.config.cryptocurrencies,
+            self.config.price_change_threshold,
+            self.config.daily_report_hours
+        )
+        if isinstance(self.store, SQLiteDataStore):
+            self.history = SQLiteTimeSeriesStore(
+                self.store,
+                self.config.price_history_dir,
+                capacity=self.config.price_history_capacity
+            )
+        else:
+            self.history = TimeSeriesStore(
+                self.config.price_history_dir,
+                capacity=self.config.price_history_capacity
+            )
+        self.market_chart = MarketChartFetcher(
+            self.http,
+            self.config.coingecko_history_url,
+            directory=self.config.market_chart_dir,
+            capacity=self.config.market_chart_capacity,
+            refresh_interval=self.config.market_chart_refresh
+        )
+        self.stats = RollingStats(capacity=self.config.price_history_capacity)
+        self.price_stream: Optional[StreamIngestor] = None
         
-        # Initialize Telegram bot using HTTP API
-        self.telegram_api_url = f"https://api.telegram.org/bot{self.config.telegram_token}"
+        # Telegram bot using HTTP API; its identity is looked up on first use
+        self.telegram_api_url = f"{self.config.telegram_api_base_url}/bot{self.config.telegram_token}"
+        self._bot_identity: Optional[Dict] = None
+        
+        self.outbox.start()
+    
+    def get_bot_identity(self, refresh: bool = False) -> Optional[Dict]:
+        """Telegram getMe result for the configured token, cached in memory and in the store"""
+        token_id = self.config.telegram_token.split(":", 1)[0]
+        if not refresh:
+            if self._bot_identity is None:
+                cached = self.store.get("telegram_bot_identity")
+                if cached and cached.get("token_id") == token_id:
+                    self._bot_identity = cached
+            if self._bot_identity is not None:
+                return self._bot_identity
         
         try:
-            # Test the connection
-            response = requests.get(f"{self.telegram_api_url}/getMe", timeout=10)
-            if response.status_code == 200:
-                bot_info = response.json()
-                if bot_info.get("ok"):
-                    print(f"✅ Telegram bot initialized successfully: @{bot_info['result']['username']}")
-                else:
-                    raise Exception(f"Telegram API error: {bot_info.get('description', 'Unknown error')}")
-            else:
+            response = self.http.get(f"{self.telegram_api_url}/getMe")
+            if response.status_code != 200:
                 raise Exception(f"HTTP error: {response.status_code}")
+            bot_info = response.json()
+            if not bot_info.get("ok"):
+                raise Exception(f"Telegram API error: {bot_info.get('description', 'Unknown error')}")
         except Exception as e:
-            print(f"❌ Failed to initialize Telegram bot: {e}")
-            raise
+            print(f"❌ Failed to get Telegram bot identity: {e}")
+            self.store.set("last_error", f"Telegram getMe error: {e}")
+            return None
+        
+        identity = {
+            "token_id": token_id,
+            "id": bot_info["result"].get("id"),
+            "username": bot_info["result"].get("username")
+        }
+        self._bot_identity = identity
+        self.store.set("telegram_bot_identity", identity)
+        print(f"✅ Telegram bot identity: @{identity['username']}")
+        return identity
     
-    def get_crypto_price(self, crypto_id: str) -> Optional[float]:
-        """Get current cryptocurrency price from CoinGecko"""
+    def get_prices(self, crypto_ids: Optional[List[str]] = None) -> Dict[str, Optional[float]]:
+        """Get current prices for several cryptocurrencies, served from the shared price cache"""
+        return self.price_cache.get_many(crypto_ids or self.config.cryptocurrencies)
+    
+    def _fetch_prices(self, crypto_ids: List[str]) -> Dict[str, float]:
+        """Fetch prices for several cryptocurrencies with one CoinGecko call"""
+        prices: Dict[str, float] = {}
+        
         try:
-            cache_key = f"cached_{crypto_id}_price"
             params = {
-                "ids": crypto_id,
+                "ids": ",".join(crypto_ids),
                 "vs_currencies": "usd"
             }
-            response = requests.get(self.config.coingecko_price_url, params=params, timeout=10)
+            response = self.http.get(self.config.coingecko_price_url, params=params)
             
             if response.status_code == 429:
-                print(f"Rate limited by CoinGecko, using cached {crypto_id} price")
-                cached_price = self.store.get(cache_key)
-                if cached_price:
-                    return cached_price
-                return None
+                print(f"Rate limited by CoinGecko, using cached prices for {', '.join(crypto_ids)}")
+                return prices
             
             response.raise_for_status()
             data = response.json()
-            price = float(data[crypto_id]["usd"])
-            # Cache the successful price fetch
-            self.store.set(cache_key, price)
-            return price
+            for crypto_id in crypto_ids:
+                if crypto_id in data and "usd" in data[crypto_id]:
+                    prices[crypto_id] = float(data[crypto_id]["usd"])
+            
+            # Record every fetched price in the local history
+            fetched_at = time.time()
+            for crypto_id, price in prices.items():
+                self._record_price(crypto_id, fetched_at, price)
         except Exception as e:
-            print(f"Error fetching {crypto_id} price: {e}")
+            print(f"Error fetching prices for {', '.join(crypto_ids)}: {e}")
             self.store.set("last_error", f"Price fetch error: {e}")
-            # Return cached price if available
-            cached_price = self.store.get(f"cached_{crypto_id}_price")
-            return cached_price
-
+        return prices
+    
+    def get_crypto_price(self, crypto_id: str) -> Optional[float]:
+        """Get current cryptocurrency price from CoinGecko"""
+        return self.get_prices([crypto_id])[crypto_id]
+    
     def get_eth_price(self) -> Optional[float]:
         """Get current Ethereum price from CoinGecko"""
         return self.get_crypto_price("ethereum")
-
+    
     def get_link_price(self) -> Optional[float]:
         """Get current Chainlink price from CoinGecko"""
         return self.get_crypto_price("chainlink")
     
-    def get_eth_24h_data(self) -> Optional[Tuple[float, float]]:
-        """Get Ethereum price data for 24h change calculation"""
-        try:
-            params = {
-                "vs_currency": "usd",
-                "days": "1"
-            }
-            response = requests.get(self.config.coingecko_history_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            prices = data["prices"]
-            if len(prices) >= 2:
-                current_price = prices[-1][1]  # Latest price
-                price_24h_ago = prices[0][1]   # Price 24h ago
-                return current_price, price_24h_ago
+    def _record_price(self, crypto_id: str, timestamp: float, price: float):
+        """Record a price point in the local history and the rolling statistics"""
+        self._ensure_stats(crypto_id)
+        self.history.append(crypto_id, timestamp, price)
+        self.stats.add(crypto_id, timestamp, price)
+    
+    def _ensure_stats(self, crypto_id: str):
+        """Seed an asset's rolling statistics from its recorded history on first use"""
+        self.stats.ensure(crypto_id, lambda: self.history.arrays(crypto_id))
+    
+    def get_price_stats(self, crypto_id: str, window: str = "24h") -> Optional[Dict]:
+        """Rolling change, high/low, averages and volatility from locally recorded prices"""
+        self._ensure_stats(crypto_id)
+        return self.stats.summary(crypto_id, window)
+    
+    def get_local_24h_data(self, crypto_id: str) -> Optional[Tuple[float, float]]:
+        """Get current and 24h-ago prices from local history, if it reaches back far enough"""
+        stats = self.get_price_stats(crypto_id, "24h")
+        if not stats:
             return None
-        except Exception as e:
-            print(f"Error fetching 24h data: {e}")
+        
+        # The window must start close enough to 24h before its latest point
+        if stats["start_time"] - (stats["end_time"] - 86400) > self.config.price_history_tolerance:
             return None
+        return stats["price"], stats["start_price"]
+    
+    def get_crypto_24h_data(self, crypto_id: str) -> Optional[Tuple[float, float]]:
+        """Get current and 24h-ago prices, from local history or the cached market chart"""
+        local_data = self.get_local_24h_data(crypto_id)
+        if local_data:
+            return local_data
+        return self.market_chart.change(crypto_id, days=1)
+    
+    def get_eth_24h_data(self) -> Optional[Tuple[float, float]]:
+        """Get Ethereum price data for 24h change calculation"""
+        return self.get_crypto_24h_data("ethereum")
     
     def get_crypto_news(self) -> List[Dict]:
         """Get latest crypto news from CryptoPanic"""
@@ -101,7 +209,7 @@ class EthereumBot:
                 "filter": "important",
                 "public": "true"
             }
-            response = requests.get(self.config.cryptopanic_url, params=params, timeout=10)
+            response = self.http.get(self.config.cryptopanic_url, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -113,76 +221,112 @@ class EthereumBot:
             self.store.set("last_error", f"News fetch error: {e}")
             return []
     
-    def send_telegram_message(self, message: str) -> bool:
-        """Send message via Telegram"""
+    def _resolve_chat_id(self, chat_id: str) -> str:
+        """Handle both username (@username) and user ID formats"""
+        chat_id = str(chat_id)
+        if not chat_id.startswith("@") and not chat_id.lstrip("-").isdigit():
+            chat_id = f"@{chat_id}"
+        return chat_id
+    
+    def _post_message(self, chat_id: str, message: str, retries: Optional[int] = None) -> bool:
+        """Post a message to a Telegram chat, raising RetryLater for rate limits and transient errors"""
+        data = {
+            "chat_id": self._resolve_chat_id(chat_id),
+            "text": message,
+            "parse_mode": "HTML",
+            "disable_web_page_preview": True
+        }
+        
         try:
-            # Handle both username (@username) and user ID formats
-            chat_id = self.config.telegram_user_id
-            if not chat_id.startswith("@") and not chat_id.isdigit():
-                chat_id = f"@{chat_id}"
-            
-            data = {
-                "chat_id": chat_id,
-                "text": message,
-                "parse_mode": "HTML",
-                "disable_web_page_preview": True
-            }
-            
-            response = requests.post(
+            response = self.http.post(
                 f"{self.telegram_api_url}/sendMessage",
                 json=data,
-                timeout=10
+                retries=retries
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("ok"):
-                    return True
-                else:
-                    error_msg = result.get("description", "Unknown error")
-                    print(f"Telegram API error: {error_msg}")
-                    
-                    # If chat not found, provide helpful instructions
-                    if "chat not found" in error_msg.lower():
-                        print(f"\n❌ Chat ID '{chat_id}' not found!")
-                        print("📱 To fix this:")
-                        print("1. Start a chat with your bot by sending /start to @my_very_cool_eth_bot")
-                        print("2. Or get your numeric chat ID by sending any message to the bot")
-                        print("3. Then update TELEGRAM_USER_ID in .env with your numeric ID")
-                    
-                    self.store.set("last_error", f"Telegram API error: {error_msg}")
-                    return False
+        except Exception as e:
+            raise RetryLater(str(e))
+        
+        if response.status_code == 429:
+            raise RetryLater("Telegram rate limit", HttpClient.retry_after(response) or 1)
+        if response.status_code >= 500:
+            raise RetryLater(f"Telegram HTTP error: {response.status_code}")
+        
+        if response.status_code == 200:
+            result = response.json()
+            if result.get("ok"):
+                return True
             else:
-                print(f"Telegram HTTP error: {response.status_code}")
-                self.store.set("last_error", f"Telegram HTTP error: {response.status_code}")
-                return False
+                error_msg = result.get("description", "Unknown error")
+                print(f"Telegram API error: {error_msg}")
                 
+                # If chat not found, provide helpful instructions
+                if "chat not found" in error_msg.lower():
+                    print(f"\n❌ Chat ID '{data['chat_id']}' not found!")
+                    print("📱 To fix this:")
+                    print("1. Start a chat with your bot by sending /start to @my_very_cool_eth_bot")
+                    print("2. Or get your numeric chat ID by sending any message to the bot")
+                    print("3. Then update TELEGRAM_USER_ID in .env with your numeric ID")
+                
+                self.store.set("last_error", f"Telegram API error: {error_msg}")
+                return False
+        else:
+            print(f"Telegram HTTP error: {response.status_code}")
+            self.store.set("last_error", f"Telegram HTTP error: {response.status_code}")
+            return False
+    
+    def _queue_send(self, chat_id: str, message: str) -> bool:
+        """Sender used by the outbound queue; lets the queue handle rate limits itself"""
+        return self._post_message(chat_id, message, retries=0)
+    
+    def _on_message_delivered(self, message: Dict):
+        """Count queued messages once Telegram has accepted them"""
+        if message.get("counter"):
+            self.store.increment(message["counter"])
+    
+    def send_telegram_message(self, message: str) -> bool:
+        """Send message via Telegram"""
+        try:
+            return self._post_message(self.config.telegram_user_id, message)
         except Exception as e:
             print(f"Telegram error: {e}")
             self.store.set("last_error", f"Telegram error: {e}")
             return False
     
+    def broadcast(self, message: str, chat_ids: List[str], priority: int = PRIORITY_REPORT,
+                  counter: Optional[str] = None) -> int:
+        """Queue one rendered message for many chats; counter increments per delivery"""
+        if chat_ids:
+            self.outbox.enqueue_many(chat_ids, message, priority, counter)
+        return len(chat_ids)
+    
     def check_price_alerts(self):
         """Check for significant price changes and send alerts"""
-        # Check ETH price alerts
-        self._check_crypto_alert("ethereum", "ETH")
-        # Check LINK price alerts
-        self._check_crypto_alert("chainlink", "LINK")
-
-    def _check_crypto_alert(self, crypto_id: str, symbol: str):
-        """Check price alerts for a specific cryptocurrency"""
-        current_price = self.get_crypto_price(crypto_id)
+        # One batched request covers every monitored cryptocurrency
+        prices = self.get_prices()
+        for crypto_id, current_price in prices.items():
+            self._check_crypto_alert(crypto_id, self.config.symbol_for(crypto_id), current_price)
+    
+    def _check_crypto_alert(self, crypto_id: str, symbol: str, current_price: Optional[float],
+                            streamed: bool = False):
+        """Check price alerts for a specific cryptocurrency
+        
+        Streamed ticks only move the stored reference price when they alert,
+        so a slow drift across many ticks still adds up to an alert.
+        """
         if current_price is None:
             return
         
         last_price_key = f"last_{crypto_id}_price"
         last_price = self.store.get(last_price_key)
+        alerted = False
         
         if last_price is not None:
             price_change = current_price - last_price
             price_change_percent = (price_change / last_price) * 100
             
-            if abs(price_change_percent) >= self.config.price_change_threshold:
+            # Every subscriber whose threshold this move meets gets the same message
+            chat_ids = self.subscribers.for_alert(crypto_id, price_change_percent)
+            if chat_ids:
                 direction = "📈" if price_change > 0 else "📉"
                 message = (
                     f"{direction} <b>{symbol} Price Alert</b>\n\n"
@@ -192,23 +336,101 @@ class EthereumBot:
                     f"⏰ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
                 )
                 
-                if self.send_telegram_message(message):
-                    self.store.increment("total_alerts_sent")
-                    print(f"🚨 {symbol} alert sent: {price_change_percent:+.2f}%")
+                self.broadcast(message, chat_ids, PRIORITY_ALERT, counter="total_alerts_sent")
+                print(f"🚨 {symbol} alert queued for {len(chat_ids)} chats: {price_change_percent:+.2f}%")
+                alerted = True
         
         # Update stored price
-        self.store.set(last_price_key, current_price)
-        print(f"💰 Current {symbol} price: ${current_price:,.2f}")
+        if not streamed or alerted or last_price is None:
+            self.store.set(last_price_key, current_price)
+        if not streamed:
+            print(f"💰 Current {symbol} price: ${current_price:,.2f}")
+        
+        self._check_price_level_alerts(crypto_id, symbol, current_price)
+    
+    def on_price_tick(self, crypto_id: str, price: float, timestamp: float):
+        """Handle a streamed price tick: cache it, record it and evaluate alerts straight away"""
+        if crypto_id not in self.config.cryptocurrencies:
+            return
+        
+        self.price_cache.put(crypto_id, price)
+        
+        # Ticks can arrive many times a minute; keep history at its usual resolution
+        last_recorded = self.history.series(crypto_id).last_timestamp
+        if last_recorded is None or timestamp - last_recorded >= self.config.price_stream_history_interval:
+            self._record_price(crypto_id, timestamp, price)
+        
+        self._check_crypto_alert(crypto_id, self.config.symbol_for(crypto_id), price, streamed=True)
+    
+    def start_price_stream(self) -> bool:
+        """Start streaming ingestion if a stream URL is configured"""
+        if not self.config.price_stream_url:
+            return False
+        if self.price_stream is None:
+            self.price_stream = StreamIngestor(
+                NDJSONFeed(self.config.price_stream_url, read_timeout=self.config.price_stream_stale_after),
+                self.on_price_tick,
+                self._poll_price_alerts,
+                stale_after=self.config.price_stream_stale_after,
+                gap_threshold=self.config.price_stream_gap,
+                fallback_interval=self.config.price_stream_fallback_interval
+            )
+        self.price_stream.start()
+        return True
+    
+    def _poll_price_alerts(self):
+        """REST price check used while the stream is down and to backfill after a gap"""
+        # Prices cached from the stream before it dropped must not stand in for a real fetch
+        self.price_cache.expire()
+        self.check_price_alerts()
+    
+    def stop_price_stream(self):
+        """Stop streaming ingestion; scheduled REST polling carries on"""
+        if self.price_stream:
+            self.price_stream.stop()
+    
+    def _check_price_level_alerts(self, crypto_id: str, symbol: str, current_price: float):
+        """Send user-defined price level and percent move alerts reached by current_price"""
+        fired = self.price_alerts.evaluate(crypto_id, current_price)
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        for alert, level in fired:
+            if alert.kind == "cross":
+                direction = "📈" if current_price >= level else "📉"
+                message = (
+                    f"{direction} <b>{symbol} crossed ${level:,.2f}</b>\n\n"
+                    f"💰 Current Price: <b>${current_price:,.2f}</b>\n"
+                    f"⏰ Time: {now_str}"
+                )
+            else:
+                direction = "📈" if current_price >= level else "📉"
+                sign = "+" if current_price >= level else "-"
+                message = (
+                    f"{direction} <b>{symbol} moved {sign}{alert.value:.2f}%</b>\n\n"
+                    f"💰 Current Price: <b>${current_price:,.2f}</b>\n"
+                    f"📍 Trigger Level: ${level:,.2f}\n"
+                    f"⏰ Time: {now_str}"
+                )
+            self.outbox.enqueue(alert.chat_id, message, PRIORITY_ALERT, counter="total_alerts_sent")
+        
+        if fired:
+            print(f"🎯 {len(fired)} {symbol} price level alerts fired at ${current_price:,.2f}")
+    
+    def _daily_report_due(self) -> bool:
+        """Check if a daily report should be sent this hour"""
+        current_hour = datetime.now().hour
+        last_report_date = self.store.get("last_daily_report", "")
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        return (current_hour in self.subscribers.report_hours() and
+                last_report_date != f"{today_str}-{current_hour}")
     
     def send_daily_report(self):
         """Send daily price report"""
         current_hour = datetime.now().hour
-        last_report_date = self.store.get("last_daily_report", "")
         today_str = datetime.now().strftime("%Y-%m-%d")
         
         # Check if we should send a daily report
-        if (current_hour in self.config.daily_report_hours and 
-            last_report_date != f"{today_str}-{current_hour}"):
+        if self._daily_report_due():
             
             current_price = self.get_eth_price()
             if current_price is None:
@@ -224,6 +446,14 @@ class EthereumBot:
                 direction = "📈" if change_24h > 0 else "📉"
                 change_text = f"\n📊 24h Change: <b>{change_24h_percent:+.2f}%</b> (${change_24h:+.2f}) {direction}"
             
+            # Range and volatility only when local history covers the whole day
+            stats = self.get_price_stats("ethereum", "24h")
+            if stats and self.get_local_24h_data("ethereum"):
+                change_text += (
+                    f"\n📏 24h Range: ${stats['low']:,.2f} – ${stats['high']:,.2f}"
+                    f"\n〰️ 24h Volatility: {stats['volatility_percent']:.2f}%"
+                )
+            
             time_emoji = {8: "🌅", 12: "☀️", 16: "🌇", 20: "🌙"}.get(current_hour, "⏰")
             
             message = (
@@ -233,10 +463,11 @@ class EthereumBot:
                 f"⏰ Report Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             )
             
-            if self.send_telegram_message(message):
-                self.store.set("last_daily_report", f"{today_str}-{current_hour}")
-                print(f"📊 Daily report sent for {current_hour}:00")
-
+            chat_ids = self.subscribers.for_report_hour(current_hour, "ethereum")
+            self.broadcast(message, chat_ids, PRIORITY_REPORT)
+            self.store.set("last_daily_report", f"{today_str}-{current_hour}")
+            print(f"📊 Daily report queued for {current_hour}:00 to {len(chat_ids)} chats")
+    
     def send_daily_comparison(self):
         """Send daily price comparison at 8 AM"""
         current_hour = datetime.now().hour
@@ -249,10 +480,18 @@ class EthereumBot:
             
             message_parts = ["🌅 <b>Daily Price Comparison</b>\n"]
             
-            # Get prices for both cryptocurrencies
-            for crypto_id, symbol in [("ethereum", "ETH"), ("chainlink", "LINK")]:
-                current_price = self.get_crypto_price(crypto_id)
+            # Get prices for all cryptocurrencies in one request
+            prices = self.get_prices()
+            for crypto_id, current_price in prices.items():
+                symbol = self.config.symbol_for(crypto_id)
                 yesterday_price = self.store.get(f"yesterday_{crypto_id}_price")
+                if yesterday_price is None:
+                    # Fall back to the locally recorded price from a day ago
+                    yesterday_price = self.history.value_at(
+                        crypto_id,
+                        time.time() - 86400,
+                        tolerance=self.config.price_history_tolerance
+                    )
                 
                 if current_price and yesterday_price:
                     change = current_price - yesterday_price
@@ -275,15 +514,18 @@ class EthereumBot:
             message_parts.append(f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             message = "\n".join(message_parts)
             
-            if self.send_telegram_message(message):
-                self.store.set("last_daily_comparison", today_str)
-                print("📊 Daily comparison sent at 8:00 AM")
-                
+            self.broadcast(message, self.subscribers.chat_ids(), PRIORITY_REPORT)
+            self.store.set("last_daily_comparison", today_str)
+            print("📊 Daily comparison queued at 8:00 AM")
+            
             # Store today's prices as yesterday's for tomorrow's comparison
-            for crypto_id in ["ethereum", "chainlink"]:
-                current_price = self.get_crypto_price(crypto_id)
-                if current_price:
-                    self.store.set(f"yesterday_{crypto_id}_price", current_price)
+            yesterday_prices = {
+                f"yesterday_{crypto_id}_price": current_price
+                for crypto_id, current_price in prices.items()
+                if current_price
+            }
+            if yesterday_prices:
+                self.store.update(yesterday_prices)
     
     def check_news_updates(self):
         """Check for new crypto news and send updates"""
@@ -303,6 +545,7 @@ class EthereumBot:
                     latest_timestamp = item["published_at"]
         
         # Send new news items (limit to 3 most recent)
+        chat_ids = self.subscribers.chat_ids(news_only=True)
         for item in new_items[:3]:
             title = item.get("title", "No title")
             url = item.get("url", "")
@@ -315,10 +558,9 @@ class EthereumBot:
                 f"🔗 {url}"
             )
             
-            if self.send_telegram_message(message):
-                self.store.increment("total_news_sent")
-                print(f"📰 News sent: {title[:50]}...")
-                time.sleep(2)  # Avoid rate limiting
+            # The outbound queue spaces messages out to stay within rate limits
+            self.broadcast(message, chat_ids, PRIORITY_NEWS, counter="total_news_sent")
+            print(f"📰 News queued: {title[:50]}...")
         
         if latest_timestamp > last_news_timestamp:
             self.store.set("last_news_timestamp", latest_timestamp)
@@ -328,19 +570,21 @@ class EthereumBot:
         print(f"\n🔄 Running check cycle at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         try:
-            # Check for price alerts
-            self.check_price_alerts()
-            
-            # Send daily reports if needed
-            self.send_daily_report()
-            
-            # Check for news updates
-            self.check_news_updates()
-            
-            # Clear any previous errors
-            if self.store.get("last_error"):
-                self.store.set("last_error", "")
+            # Land all of the cycle's state changes in a single write
+            with self.store.transaction():
+                # Check for price alerts
+                self.check_price_alerts()
+                
+                # Send daily reports if needed
+                self.send_daily_report()
                 
+                # Check for news updates
+                self.check_news_updates()
+                
+                # Clear any previous errors
+                if self.store.get("last_error"):
+                    self.store.set("last_error", "")
+        
         except Exception as e:
             error_msg = f"Unexpected error in check cycle: {e}"
             print(f"❌ {error_msg}")
@@ -348,6 +592,8 @@ class EthereumBot:
     
     def start_monitoring(self):
         """Start the continuous monitoring loop"""
+        self.get_bot_identity()
+        
         # Send startup message
         startup_msg = (
             f"✅ <b>ETH Monitoring Bot Started</b>\n\n"
@@ -375,8 +621,118 @@ class EthereumBot:
             except Exception as e:
                 print(f"❌ Critical error: {e}")
                 time.sleep(60)  # Wait longer on critical errors
-                
+    
+    def catch_up(self, budget: Optional[float] = None):
+        """Replay prices since the last CLI run through the alert logic and send one digest
+        
+        A per-asset cursor in the store marks the last replayed point. Each asset
+        costs one market_chart/range request for the span after it, made outside
+        the market_chart cache so the gap never stands in for a day of history.
+        Requests and their retries are cut off at the end of the time budget;
+        assets not replayed by then keep their cursor for the next run.
+        """
+        deadline = time.monotonic() + (self.config.backfill_time_budget if budget is None else budget)
+        cursors = dict(self.store.get("backfill_cursor") or {})
+        now = time.time()
+        since_overall = None
+        digests: Dict[str, List[str]] = {}
+        
+        for crypto_id in self.config.cryptocurrencies:
+            cursor = cursors.get(crypto_id)
+            if cursor is None:
+                # First run: nothing known to replay from
+                cursors[crypto_id] = now
+                continue
+            if now - cursor < self.config.backfill_min_gap:
+                continue
+            if time.monotonic() >= deadline:
+                print(f"⏳ Catch-up budget used up; {crypto_id} is left for the next run")
+                continue
+            
+            since = max(cursor, now - self.config.backfill_max_span)
+            # Kept out of the market_chart cache, which must hold whole days for the 24h change
+            points = self.market_chart.download(crypto_id, since, now, deadline=deadline)
+            if not points:
+                continue
+            
+            for chat_id, lines in self._replay_gap(crypto_id, points).items():
+                digests.setdefault(chat_id, []).extend(lines)
+            cursors[crypto_id] = points[-1][0]
+            self.store.set("backfill_cursor", cursors)
+            since_overall = since if since_overall is None else min(since_overall, since)
+            print(f"🕰️ Replayed {len(points)} {crypto_id} points since {datetime.fromtimestamp(since):%Y-%m-%d %H:%M}")
+        
+        self.store.set("backfill_cursor", cursors)
+        
+        for chat_id, lines in digests.items():
+            message = (
+                f"🕰️ <b>Catch-up since {datetime.fromtimestamp(since_overall):%Y-%m-%d %H:%M}</b>\n\n"
+                + "\n".join(lines)
+            )
+            self.outbox.enqueue(chat_id, message, PRIORITY_ALERT, counter="total_alerts_sent")
+        if digests:
+            print(f"🕰️ Catch-up digest queued for {len(digests)} chats")
+    
+    def _replay_gap(self, crypto_id: str, points: List[Tuple[float, float]]) -> Dict[str, List[str]]:
+        """Run missed points through the threshold and level alerts; digest lines per chat"""
+        symbol = self.config.symbol_for(crypto_id)
+        last_price_key = f"last_{crypto_id}_price"
+        reference = self.store.get(last_price_key)
+        moves: Dict[str, List[Tuple[float, float, float]]] = {}  # chat -> (change %, time, price)
+        levels: Dict[str, List[str]] = {}
+        
+        for timestamp, price in points:
+            # Like streamed ticks, the reference only moves when a move alerts
+            if reference:
+                change_percent = (price - reference) / reference * 100
+                chat_ids = self.subscribers.for_alert(crypto_id, change_percent)
+                for chat_id in chat_ids:
+                    moves.setdefault(chat_id, []).append((change_percent, timestamp, price))
+                if chat_ids:
+                    reference = price
+            else:
+                reference = price
+            
+            for alert, level in self.price_alerts.evaluate(crypto_id, price):
+                if alert.kind == "cross":
+                    what = f"crossed ${level:,.2f}"
+                else:
+                    what = f"moved {'+' if price >= level else '-'}{alert.value:.2f}%"
+                levels.setdefault(alert.chat_id, []).append(
+                    f"🎯 {what} at {datetime.fromtimestamp(timestamp):%H:%M} (${price:,.2f})"
+                )
+        
+        if reference is not None:
+            self.store.set(last_price_key, reference)
+        
+        high = max(points, key=lambda point: point[1])
+        low = min(points, key=lambda point: point[1])
+        header = (
+            f"<b>{symbol}</b>: high ${high[1]:,.2f} ({datetime.fromtimestamp(high[0]):%H:%M}), "
+            f"low ${low[1]:,.2f} ({datetime.fromtimestamp(low[0]):%H:%M})"
+        )
+        
+        digests = {}
+        for chat_id in set(moves) | set(levels):
+            extreme = sorted(moves.get(chat_id, []), key=lambda move: -abs(move[0]))
+            lines = [header]
+            for change_percent, timestamp, price in sorted(
+                    extreme[:self.config.backfill_digest_moves], key=lambda move: move[1]):
+                direction = "📈" if change_percent > 0 else "📉"
+                lines.append(
+                    f"{direction} {change_percent:+.2f}% to ${price:,.2f} at {datetime.fromtimestamp(timestamp):%H:%M}"
+                )
+            lines.extend(levels.get(chat_id, []))
+            digests[chat_id] = lines
+        return digests
+    
     def run_once(self):
         """Run single-cycle check for GitHub Actions"""
         print("🚀 Running single-cycle ETH check (GitHub Actions)")
+        self.catch_up()
         self.run_check_cycle()
+        if not self.outbox.drain(self.config.telegram_drain_timeout):
+            print(f"📬 {len(self.outbox)} Telegram messages left for the next run")
+        self.outbox.stop()
+        self.price_cache.flush()
+        self.store.flush()
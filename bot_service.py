@@ -0,0 +1,486 @@
+import hashlib
+import itertools
+import json
+import threading
+import time
+import uuid
+from multiprocessing.managers import BaseManager
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from scheduler import TaskScheduler
+from config import Config
+from events import EventBus
+from metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from bot import EthereumBot
+
+def price_change_data(crypto_id: str, price_data: Tuple[float, float]) -> Dict:
+    """Shape a (current, 24h ago) pair the way /api/price-history returns it"""
+    current, price_24h_ago = price_data
+    change = current - price_24h_ago
+    return {
+        "id": crypto_id,
+        "current_price": current,
+        "price_24h_ago": price_24h_ago,
+        "change": change,
+        "change_percent": (change / price_24h_ago) * 100
+    }
+
+class BotService:
+    """The bot, its scheduler and every operation the dashboard performs on them
+    
+    Methods take and return plain JSON-ready values, so web_app can call them
+    in-process or, in multi-worker mode, from HTTP worker processes through a
+    BotServiceManager connected to the one process that owns the bot.
+    """
+    
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or Config()
+        self.bot: Optional["EthereumBot"] = None
+        self.scheduler: Optional[TaskScheduler] = None
+        self.event_bus = EventBus()
+        
+        self._bot_lock = threading.Lock()
+        # (key, etag, body) of the serialized status, replaced whole when status_key changes
+        self._status_snapshot: Tuple[Any, Optional[str], Optional[bytes]] = (None, None, None)
+        self._status_lock = threading.Lock()
+        self._store_changes = itertools.count(1)
+        self._store_version = 0  # Bumped on every store write so any stored value invalidates the status
+        self._boot_id = uuid.uuid4().hex[:8]  # Keeps ETags from a previous process from matching
+        self._profilers: List[Any] = []  # RunProfilers from /api/profile, newest last
+        self._scheduler_published = 0.0
+        self._scheduler_timer: Optional[threading.Timer] = None
+        self._scheduler_lock = threading.Lock()
+    
+    def get_bot(self) -> "EthereumBot":
+        """Create the bot on first use"""
+        with self._bot_lock:
+            if self.bot is None:
+                # Imported here so HTTP worker processes, which never build a bot, skip NumPy and requests
+                if self.config.use_async_engine:
+                    from async_bot import AsyncEthereumBot as bot_class
+                else:
+                    from bot import EthereumBot as bot_class
+                bot = bot_class(self.config)
+                bot.price_cache.add_listener(self._publish_prices)
+                bot.store.add_listener(self._publish_store_changes)
+                self.bot = bot
+            return self.bot
+    
+    def _publish_prices(self, updated: Dict[str, float]):
+        """Push current prices and locally known 24h changes to dashboards"""
+        bot = self.bot
+        if bot is None:
+            return
+        prices = {
+            crypto_id: bot.price_cache.peek(crypto_id)
+            for crypto_id in self.config.cryptocurrencies
+        }
+        changes = {}
+        for crypto_id in self.config.cryptocurrencies:
+            # Local history only, so publishing never waits on the network
+            price_data = bot.get_local_24h_data(crypto_id)
+            if price_data:
+                changes[crypto_id] = price_change_data(crypto_id, price_data)
+        self.event_bus.publish("prices", {
+            "current_price": prices.get("ethereum"),
+            "prices": prices,
+            "change_24h": changes
+        })
+    
+    def _publish_store_changes(self, changes: Dict[str, Any]):
+        """Push counter and error changes to dashboards"""
+        self._store_version = next(self._store_changes)
+        bot = self.bot
+        if bot is None:
+            return
+        if "total_alerts_sent" in changes or "total_news_sent" in changes:
+            self.event_bus.publish("counters", {
+                "total_alerts_sent": bot.store.get("total_alerts_sent", 0),
+                "total_news_sent": bot.store.get("total_news_sent", 0)
+            })
+        if "last_error" in changes:
+            self.event_bus.publish("last_error", {"last_error": changes["last_error"]})
+    
+    def _scheduler_changed(self):
+        """Scheduler listener: publish at most once per scheduler_event_interval
+        
+        Building the status walks every task, so a burst of task starts and
+        finishes is coalesced into one trailing update.
+        """
+        with self._scheduler_lock:
+            if self._scheduler_timer is not None:
+                return
+            wait = self._scheduler_published + self.config.scheduler_event_interval - time.monotonic()
+            if wait > 0:
+                self._scheduler_timer = threading.Timer(wait, self._publish_scheduler)
+                self._scheduler_timer.daemon = True
+                self._scheduler_timer.start()
+                return
+        self._publish_scheduler()
+    
+    def _publish_scheduler(self):
+        """Push scheduler and task state to dashboards"""
+        with self._scheduler_lock:
+            if self._scheduler_timer is not None:
+                self._scheduler_timer.cancel()
+                self._scheduler_timer = None
+            self._scheduler_published = time.monotonic()
+        scheduler = self.scheduler
+        self.event_bus.publish("scheduler", {
+            "bot_running": scheduler.running if scheduler else False,
+            "scheduler": scheduler.get_status() if scheduler else None
+        })
+    
+    def start_monitoring(self):
+        """Start bot monitoring in background"""
+        if self.scheduler and self.scheduler.running:
+            return
+        
+        bot = self.get_bot()
+        config = self.config
+        scheduler = TaskScheduler(
+            max_workers=config.task_workers,
+            store=bot.store,
+            startup_jitter=config.scheduler_startup_jitter,
+            state_save_interval=config.store_flush_interval
+        )
+        scheduler.add_listener(self._scheduler_changed)
+        
+        # Add scheduled tasks; the async engine bounds the price fetch by async_fetch_timeout
+        scheduler.add_periodic_task(
+            bot.run_price_check if config.use_async_engine else bot.check_price_alerts,
+            config.check_interval,
+            "Price Monitoring",
+            timeout=config.task_timeout
+        )
+        
+        # Runs every hour; send_daily_report picks the subscribers who want this hour, so
+        # subscriptions added or changed after startup are honoured without rescheduling
+        scheduler.add_hourly_task(
+            bot.send_daily_report,
+            list(range(24)),
+            0,
+            "Daily Reports",
+            timeout=config.task_timeout,
+            overlap="queue"
+        )
+        
+        scheduler.add_periodic_task(
+            bot.check_news_updates,
+            300,  # Check news every 5 minutes
+            "News Updates",
+            timeout=config.task_timeout
+        )
+        
+        # Add daily comparison task (8 AM only)
+        scheduler.add_daily_task(
+            bot.send_daily_comparison,
+            hour=config.daily_comparison_hour,
+            name="Daily Comparison",
+            timeout=config.task_timeout,
+            overlap="queue"
+        )
+        
+        self.scheduler = scheduler
+        scheduler.start()
+        
+        # Streamed ticks keep the price cache fresh, so scheduled checks only hit REST while the stream is down
+        bot.start_price_stream()
+    
+    def stop_monitoring(self):
+        """Stop the scheduler and save state"""
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = None
+            self._publish_scheduler()
+        if self.bot:
+            self.bot.stop_price_stream()
+            self.bot.price_cache.flush()
+            self.bot.store.flush()
+    
+    def _status_key(self, bot: "EthereumBot") -> tuple:
+        """Cheap fingerprint of everything the status snapshot is built from"""
+        stream = bot.price_stream
+        outbox = bot.outbox
+        return (
+            self.event_bus.version,
+            self._store_version,
+            id(self.scheduler),
+            outbox.sent,
+            outbox.failed,
+            len(outbox),
+            len(bot.subscribers),
+            stream.healthy if stream else None
+        )
+    
+    def _build_status(self, bot: "EthereumBot") -> Dict:
+        """Assemble the status payload from in-memory state, without network calls"""
+        config = self.config
+        scheduler = self.scheduler
+        prices = {
+            crypto_id: bot.price_cache.peek(crypto_id)
+            for crypto_id in config.cryptocurrencies
+        }
+        # Only a cold start with no price known at all goes to the network
+        missing = [crypto_id for crypto_id, price in prices.items() if price is None]
+        if missing:
+            prices.update(bot.get_prices(missing))
+        store = bot.store
+        
+        status = {
+            "bot_running": scheduler.running if scheduler else False,
+            "current_price": prices.get("ethereum"),
+            "prices": prices,
+            "last_price": store.get("last_price"),
+            "bot_start_time": store.get("bot_start_time"),
+            "total_alerts_sent": store.get("total_alerts_sent", 0),
+            "total_news_sent": store.get("total_news_sent", 0),
+            "total_subscribers": len(bot.subscribers),
+            "last_error": store.get("last_error", ""),
+            "config": {
+                "price_threshold": config.price_change_threshold,
+                "check_interval": config.check_interval,
+                "daily_report_hours": config.daily_report_hours,
+                "news_enabled": config.has_cryptopanic_key
+            }
+        }
+        
+        status["telegram_queue"] = bot.outbox.get_status()
+        if bot.price_stream:
+            status["price_stream"] = bot.price_stream.get_status()
+        
+        if scheduler:
+            status["scheduler"] = scheduler.get_status()
+        
+        return status
+    
+    def status_snapshot(self, known_etag: Optional[str] = None) -> Tuple[str, Optional[bytes]]:
+        """Return (etag, body) for the current status, with body None if it still matches known_etag"""
+        bot = self.get_bot()
+        snapshot = self._status_snapshot
+        if snapshot[0] != self._status_key(bot):
+            with self._status_lock:
+                # Another request may have rebuilt it while we waited
+                key = self._status_key(bot)
+                if self._status_snapshot[0] != key:
+                    # A cold-start price fetch changes the key mid-build; build once more
+                    for _ in range(2):
+                        body = json.dumps(self._build_status(bot), default=str).encode()
+                        built_key, key = key, self._status_key(bot)
+                        if built_key == key:
+                            break
+                    digest = hashlib.sha1(repr(built_key).encode()).hexdigest()[:16]
+                    self._status_snapshot = (built_key, f"{self._boot_id}-{digest}", body)
+                snapshot = self._status_snapshot
+        
+        if known_etag == snapshot[1]:
+            return snapshot[1], None
+        return snapshot[1], snapshot[2]
+    
+    def wait_events(self, since: int, timeout: Optional[float] = None) -> List[Tuple[int, str, Any]]:
+        """Dashboard events newer than since, waiting up to timeout for one"""
+        return self.event_bus.wait(since, timeout)
+    
+    def metrics_text(self) -> str:
+        """Task, upstream, Telegram and store metrics in Prometheus text format"""
+        return REGISTRY.render()
+    
+    def metrics_snapshot(self) -> Dict:
+        """The same metrics as JSON, with per-bucket histogram counts"""
+        return REGISTRY.snapshot()
+    
+    def profile_task(self, data: Dict) -> Dict:
+        """Profile the next runs of a scheduled task"""
+        from profiling import RunProfiler
+        
+        if not self.scheduler or not self.scheduler.running:
+            return {"success": False, "message": "Bot is not running"}
+        name = data.get("task")
+        names = [task["name"] for task in self.scheduler.tasks]
+        if name not in names:
+            return {"success": False, "message": f"Unknown task; expected one of: {', '.join(names)}"}
+        try:
+            runs = int(data.get("runs", 1))
+        except (TypeError, ValueError):
+            return {"success": False, "message": "runs must be a number"}
+        if not 1 <= runs <= self.config.profile_max_runs:
+            return {"success": False, "message": f"runs must be between 1 and {self.config.profile_max_runs}"}
+        
+        profiler = RunProfiler(name, runs, self.config.profile_dir)
+        self.scheduler.profile_task(name, profiler)
+        self._profilers = (self._profilers + [profiler])[-20:]
+        self._publish_scheduler()
+        return {"success": True, "message": f"Profiling the next {runs} run(s) of {name}",
+                "profile": profiler.get_status()}
+    
+    def list_profiles(self) -> Dict:
+        """Profile requests made since start and the saved profile files"""
+        from profiling import list_profiles
+        
+        return {
+            "directory": self.config.profile_dir,
+            "requests": [profiler.get_status() for profiler in reversed(self._profilers)],
+            "files": list_profiles(self.config.profile_dir)
+        }
+    
+    def test_telegram(self) -> Dict:
+        """Send a test message"""
+        try:
+            bot = self.get_bot()
+            identity = bot.get_bot_identity(refresh=True)
+            if identity is None:
+                return {"success": False, "message": "Telegram getMe failed; check TELEGRAM_TOKEN"}
+            success = bot.send_telegram_message(
+                "🧪 <b>Test Message</b>\n\nTelegram connection is working!"
+            )
+            if success:
+                return {"success": True, "message": "Test message sent successfully"}
+            else:
+                return {"success": False, "message": "Failed to send test message"}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+    
+    def manual_check(self) -> Dict:
+        """Run a check cycle now"""
+        try:
+            self.get_bot().run_check_cycle()
+            return {"success": True, "message": "Manual check completed"}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+    
+    def price_history(self, crypto_id: str = "ethereum") -> Dict:
+        """24h change and rolling statistics for an asset"""
+        try:
+            bot = self.get_bot()
+            price_data = bot.get_crypto_24h_data(crypto_id)
+            
+            if price_data:
+                data = price_change_data(crypto_id, price_data)
+                data["stats"] = {
+                    window: bot.get_price_stats(crypto_id, window)
+                    for window in bot.stats.windows
+                }
+                return data
+            else:
+                return {"error": "Unable to fetch price history"}
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def price_series(self, crypto_id: str = "ethereum", since: Optional[float] = None,
+                     limit: int = 500) -> Dict:
+        """Locally recorded price points for charts"""
+        try:
+            bot = self.get_bot()
+            if since is not None:
+                points = bot.history.range(crypto_id, since)[-limit:]
+            else:
+                points = bot.history.latest(crypto_id, limit)
+            
+            return {
+                "id": crypto_id,
+                "points": [{"time": ts, "price": price} for ts, price in points]
+            }
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def list_subscribers(self) -> Dict:
+        subscribers = self.get_bot().subscribers
+        return {
+            "total": len(subscribers),
+            "subscribers": [subscriber.to_dict() for subscriber in subscribers]
+        }
+    
+    def add_subscriber(self, data: Dict) -> Dict:
+        """Add or update a subscriber"""
+        try:
+            if not data.get("chat_id"):
+                return {"success": False, "message": "chat_id is required"}
+            
+            config = self.config
+            subscriber = self.get_bot().subscribers.add(
+                data["chat_id"],
+                data.get("assets", config.cryptocurrencies),
+                data.get("threshold", config.price_change_threshold),
+                data.get("report_hours", config.daily_report_hours),
+                data.get("news", True)
+            )
+            return {"success": True, "subscriber": subscriber.to_dict()}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+    
+    def remove_subscriber(self, chat_id: str) -> Dict:
+        if self.get_bot().subscribers.remove(chat_id):
+            return {"success": True, "message": "Subscriber removed"}
+        return {"success": False, "message": "Subscriber not found"}
+    
+    def list_alerts(self, chat_id: Optional[str] = None) -> Dict:
+        alerts = self.get_bot().price_alerts.list(chat_id)
+        return {
+            "total": len(alerts),
+            "alerts": [alert.to_dict() for alert in alerts]
+        }
+    
+    def add_alert(self, data: Dict) -> Dict:
+        """Add a price level ("cross") or percent move ("percent") alert"""
+        try:
+            bot = self.get_bot()
+            asset = data.get("asset", "ethereum")
+            chat_id = data.get("chat_id") or self.config.telegram_user_id
+            
+            current_price = bot.get_prices([asset])[asset]
+            if current_price is None:
+                return {"success": False, "message": f"No price available for {asset}"}
+            
+            kind = data.get("kind", "cross")
+            if kind == "cross":
+                alert = bot.price_alerts.add_cross(
+                    asset, chat_id, float(data["level"]), current_price, data.get("repeat", False)
+                )
+            elif kind == "percent":
+                alert = bot.price_alerts.add_percent(
+                    asset, chat_id, float(data["percent"]), current_price, data.get("repeat", True)
+                )
+            else:
+                return {"success": False, "message": f"Unknown alert kind: {kind}"}
+            return {"success": True, "alert": alert.to_dict()}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+    
+    def remove_alert(self, alert_id: int) -> Dict:
+        if self.get_bot().price_alerts.remove(alert_id):
+            return {"success": True, "message": "Alert removed"}
+        return {"success": False, "message": "Alert not found"}
+    
+    def chat_updates(self) -> Dict:
+        """Recent chat updates to help find user chat ID"""
+        try:
+            bot = self.get_bot()
+            response = bot.http.get(f"{bot.telegram_api_url}/getUpdates")
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("ok") and data.get("result"):
+                    updates = []
+                    for update in data["result"][-5:]:  # Last 5 updates
+                        if "message" in update:
+                            msg = update["message"]
+                            chat = msg["chat"]
+                            updates.append({
+                                "chat_id": chat["id"],
+                                "username": chat.get("username", ""),
+                                "first_name": chat.get("first_name", ""),
+                                "text": msg.get("text", ""),
+                                "date": msg["date"]
+                            })
+                    return {"success": True, "updates": updates}
+                else:
+                    return {"success": False, "message": "No updates found"}
+            else:
+                return {"success": False, "message": f"HTTP error: {response.status_code}"}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+class BotServiceManager(BaseManager):
+    """Serves the owner process's BotService to HTTP worker processes"""
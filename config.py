@@ -19,11 +19,65 @@ class Config:
         self.daily_report_hours = [8, 12, 16, 20]  # Hours for daily reports
         self.daily_comparison_hour = 8  # Hour for daily price comparison
         self.cryptocurrencies = ["ethereum", "chainlink"]  # ETH and LINK
+        self.crypto_symbols = {"ethereum": "ETH", "chainlink": "LINK"}
+        self.price_cache_ttl = 60  # Seconds a fetched price is served without refetching
+        self.price_cache_persist_interval = 300  # Seconds between cached price writes to disk
+        self.store_flush_interval = 5  # Seconds between coalesced bot_data.json writes
+        self.store_backend = os.getenv("STORE_BACKEND", "json").lower()  # "json" file or "sqlite" WAL database
+        self.store_database = "bot_data.db"  # SQLite database for bot state and price history
+        self.price_history_dir = "price_history"  # Local per-asset price time series
+        self.price_history_capacity = 10080  # Points kept per asset (a week of minutely prices)
+        self.price_history_tolerance = 5400  # Max seconds between a lookup time and the point used
+        self.market_chart_dir = "market_chart"  # Cached CoinGecko market_chart series per asset
+        self.market_chart_capacity = 2016  # Points kept per asset (a week of 5-minute points)
+        self.market_chart_refresh = 300  # Seconds before a cached market_chart tail is refetched
+        self.backfill_min_gap = 900  # Seconds since the last CLI run before its gap is replayed
+        self.backfill_max_span = 86400  # Longest gap replayed; anything older is skipped
+        self.backfill_time_budget = 30  # Seconds a CLI run may spend catching up
+        self.backfill_digest_moves = 5  # Largest moves per asset listed in a catch-up digest
+        self.task_workers = 4  # Scheduler worker threads running tasks concurrently
+        self.task_timeout = 120  # Seconds before a running task is reported as overrunning
+        self.scheduler_startup_jitter = 30  # Seconds over which tasks due at startup are spread
+        self.scheduler_event_interval = 1  # Min seconds between scheduler updates pushed to dashboards
+        self.profile_dir = "profiles"  # pstats files from --profile and /api/profile
+        self.profile_max_runs = 10  # Most task runs one /api/profile request may profile
         
-        # API endpoints
-        self.coingecko_price_url = "https://api.coingecko.com/api/v3/simple/price"
-        self.coingecko_history_url = "https://api.coingecko.com/api/v3/coins/ethereum/market_chart"
-        self.cryptopanic_url = "https://cryptopanic.com/api/v1/posts/"
+        # Outbound HTTP client
+        self.http_timeout = 10  # Seconds per request attempt
+        self.http_retries = 3  # Retries for transient failures and 429s
+        self.http_backoff_factor = 0.5  # Base seconds for exponential backoff
+        self.http_max_backoff = 30  # Longest wait before a retry, including Retry-After
+        self.http_pool_size = 10  # Keep-alive connections per host
+        
+        # Outbound Telegram queue
+        self.telegram_outbox_file = "telegram_outbox.json"  # Undelivered messages kept across restarts
+        self.telegram_global_rate = 30  # Messages per second across all chats
+        self.telegram_chat_rate = 1  # Messages per second to one private chat
+        self.telegram_group_rate = 20 / 60  # Messages per second to one group chat
+        self.telegram_max_attempts = 5  # Delivery attempts before a message is dropped
+        self.telegram_drain_timeout = 60  # Seconds a CLI run waits for queued messages
+        self.telegram_send_workers = 4  # Concurrent sends to different chats
+        self.subscribers_file = "subscribers.json"  # Chats with their own assets, thresholds and report hours
+        self.price_alerts_file = "price_alerts.json"  # User-defined price level and percent move alerts
+        
+        # Async check cycle engine
+        self.use_async_engine = os.getenv("ASYNC_ENGINE", "").lower() in ("1", "true", "yes")
+        self.async_fetch_timeout = 20  # Seconds allowed for each concurrent fetch
+        
+        # Streaming price ingestion
+        self.price_stream_url = os.getenv("PRICE_STREAM_URL", "")  # NDJSON tick stream; empty disables streaming
+        self.price_stream_stale_after = 60  # Seconds without a tick before the stream counts as down
+        self.price_stream_gap = 30  # Outage length after which a reconnect backfills over REST
+        self.price_stream_fallback_interval = 60  # Seconds between REST price checks while the stream is down
+        self.price_stream_history_interval = 60  # Min seconds between streamed ticks recorded in history
+        
+        # API endpoints; the base URLs can point at local stand-ins (benchmarks/standins.py)
+        coingecko_api = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3").rstrip("/")
+        cryptopanic_api = os.getenv("CRYPTOPANIC_API_URL", "https://cryptopanic.com/api/v1").rstrip("/")
+        self.coingecko_price_url = f"{coingecko_api}/simple/price"
+        self.coingecko_history_url = f"{coingecko_api}/coins/{{id}}/market_chart/range"
+        self.cryptopanic_url = f"{cryptopanic_api}/posts/"
+        self.telegram_api_base_url = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
         
         # Validate required environment variables
         self._validate()
@@ -37,6 +91,10 @@ class Config:
         if not self.cryptopanic_api_key:
             print("Warning: CRYPTOPANIC_API_KEY not set, news features will be disabled")
     
+    def symbol_for(self, crypto_id: str) -> str:
+        """Get the ticker symbol used in messages for a CoinGecko coin id"""
+        return self.crypto_symbols.get(crypto_id, crypto_id.upper())
+    
     @property
     def has_cryptopanic_key(self) -> bool:
         """Check if CryptoPanic API key is available"""
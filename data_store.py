@@ -1,14 +1,88 @@
+import atexit
 import json
 import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Iterator, List, Mapping, Optional, Set
 
-class DataStore:
-    """Simple file-based data store for bot state"""
+from listeners import ListenerMixin
+from metrics import STORE_FLUSH
+
+def atomic_write_json(filename: str, data: Any, indent: Optional[int] = 2):
+    """Write JSON to a temp file and rename it over the target so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        mode = os.stat(filename).st_mode & 0o777 if os.path.exists(filename) else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def default_data() -> Dict[str, Any]:
+    """Initial bot state for a fresh store"""
+    return {
+        "last_price": None,
+        "last_24h_price": None,
+        "last_news_timestamp": "",
+        "last_daily_report": "",
+        "bot_start_time": datetime.now().isoformat(),
+        "total_alerts_sent": 0,
+        "total_news_sent": 0,
+        "last_error": ""
+    }
+
+class DataStore(ListenerMixin):
+    """Simple file-based data store for bot state
+    
+    With flush_interval=None every change is written immediately (write-through).
+    With a flush_interval, changed keys are marked dirty and the file is written
+    at most once per interval, on flush() or at interpreter shutdown (write-behind).
     
-    def __init__(self, filename: str = "bot_data.json"):
+    Writers are serialized by a lock and publish each change as a new read-only
+    snapshot (copy-on-write), so readers never take the lock and never see a
+    half-applied update, and the file is written from a snapshot outside the
+    lock instead of blocking writers on disk I/O.
+    """
+    
+    listener_label = "data store"
+    
+    def __init__(self, filename: str = "bot_data.json", flush_interval: Optional[float] = None):
         self.filename = filename
-        self.data = self._load_data()
+        self.flush_interval = flush_interval
+        self._data: Mapping[str, Any] = MappingProxyType(self._load_data())
+        
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # Orders file writes; taken before _lock, never inside it
+        self._dirty: Set[str] = set()
+        self._last_flush = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._transaction_depth = 0
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []  # Called with changed keys and their new values
+        
+        if self.flush_interval is not None:
+            atexit.register(self.flush)
+    
+    @property
+    def data(self) -> Mapping[str, Any]:
+        """Current read-only snapshot of all values"""
+        return self._data
+    
+    def snapshot(self) -> Mapping[str, Any]:
+        """Consistent read-only view of all values; later changes do not affect it"""
+        return self._data
     
     def _load_data(self) -> Dict[str, Any]:
         """Load data from file"""
@@ -19,42 +93,118 @@ class DataStore:
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Error loading data file: {e}")
         
-        # Return default data structure
-        return {
-            "last_price": None,
-            "last_24h_price": None,
-            "last_news_timestamp": "",
-            "last_daily_report": "",
-            "bot_start_time": datetime.now().isoformat(),
-            "total_alerts_sent": 0,
-            "total_news_sent": 0,
-            "last_error": ""
-        }
-    
-    def _save_data(self):
-        """Save data to file"""
+        return default_data()
+    
+    def _save_data(self, data: Mapping[str, Any]) -> bool:
+        """Save data to file; False when the write failed"""
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            atomic_write_json(self.filename, dict(data))
+            return True
+        except (IOError, OSError) as e:
             print(f"Error saving data file: {e}")
+            return False
+    
+    def _mark_dirty(self, *keys: str) -> bool:
+        """Record changed keys; True when the caller should flush now, once the lock is released"""
+        with self._lock:
+            self._dirty.update(keys)
+            if self._transaction_depth or not self._dirty:
+                return False
+            
+            if self.flush_interval is None:
+                return True
+            
+            elapsed = time.monotonic() - self._last_flush
+            if elapsed >= self.flush_interval:
+                return True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval - elapsed, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            return False
+    
+    def flush(self):
+        """Write pending changes to disk"""
+        with self._flush_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                data = self._data
+                written = self._dirty
+                self._dirty = set()
+                self._last_flush = time.monotonic()
+            started = time.perf_counter()
+            saved = self._save_data(data)
+            STORE_FLUSH.observe(time.perf_counter() - started)
+            if saved:
+                return
+            
+            with self._lock:
+                # Keep the keys pending so the next change, flush or timer retries the write
+                self._dirty |= written
+                if self.flush_interval is not None:
+                    self._mark_dirty()
+    
+    @contextmanager
+    def transaction(self) -> Iterator["DataStore"]:
+        """Group several changes so they land in a single write"""
+        with self._lock:
+            self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._transaction_depth -= 1
+                flush_now = not self._transaction_depth and self._mark_dirty()
+            if flush_now:
+                self.flush()
+    
+    def _publish(self, changes: Dict[str, Any]) -> bool:
+        """Swap in a new snapshot with changes applied; call with the lock held"""
+        data = dict(self._data)
+        data.update(changes)
+        self._data = MappingProxyType(data)
+        return self._mark_dirty(*changes.keys())
+    
+    def _committed(self, changes: Dict[str, Any], flush_now: bool):
+        """Flush and notify after a change, outside the lock"""
+        if flush_now:
+            self.flush()
+        self._notify(changes)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get value by key"""
-        return self.data.get(key, default)
+        return self._data.get(key, default)
     
     def set(self, key: str, value: Any):
         """Set value by key and save"""
-        self.data[key] = value
-        self._save_data()
+        with self._lock:
+            flush_now = self._publish({key: value})
+        self._committed({key: value}, flush_now)
     
     def update(self, updates: Dict[str, Any]):
         """Update multiple values at once"""
-        self.data.update(updates)
-        self._save_data()
-    
-    def increment(self, key: str, amount: int = 1):
-        """Increment a numeric value"""
-        current = self.data.get(key, 0)
-        self.data[key] = current + amount
-        self._save_data()
+        changes = dict(updates)
+        with self._lock:
+            flush_now = self._publish(changes)
+        self._committed(changes, flush_now)
+    
+    def increment(self, key: str, amount: int = 1) -> Any:
+        """Increment a numeric value atomically and return the new value"""
+        with self._lock:
+            value = self._data.get(key, 0) + amount
+            flush_now = self._publish({key: value})
+        self._committed({key: value}, flush_now)
+        return value
+    
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        """Set key to value only if it currently equals expected (a missing key equals None)"""
+        with self._lock:
+            if self._data.get(key) != expected:
+                return False
+            flush_now = self._publish({key: value})
+        self._committed({key: value}, flush_now)
+        return True
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+class EventBus:
+    """In-process publish/subscribe hub for dashboard updates
+    
+    Only the latest payload per topic is kept, tagged with a global version
+    number. Subscribers ask for everything newer than the version they last
+    saw, so a slow client skips straight to the current state instead of
+    queueing every intermediate update, and an idle subscriber just sleeps on
+    a condition variable.
+    """
+    
+    def __init__(self):
+        self.version = 0
+        self._latest: Dict[str, Tuple[int, Any]] = {}  # topic -> (version, data)
+        self._condition = threading.Condition()
+    
+    def publish(self, topic: str, data: Any, version: Optional[int] = None):
+        """Replace a topic's payload and wake subscribers; version mirrors another bus's numbering"""
+        with self._condition:
+            self.version = self.version + 1 if version is None else version
+            self._latest[topic] = (self.version, data)
+            self._condition.notify_all()
+    
+    def changes(self, since: int) -> List[Tuple[int, str, Any]]:
+        """(version, topic, data) for every topic updated after since, oldest first"""
+        with self._condition:
+            return sorted(
+                (version, topic, data)
+                for topic, (version, data) in self._latest.items()
+                if version > since
+            )
+    
+    def wait(self, since: int, timeout: Optional[float] = None) -> List[Tuple[int, str, Any]]:
+        """Block until something newer than since is published, or timeout"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version > since, timeout)
+        return self.changes(since)
+    
+    def stream(self, since: int = 0, keepalive: float = 15) -> Iterator[str]:
+        """Server-Sent Events for every update after since, with comment keepalives"""
+        if since > self.version:
+            # The client's last id comes from before a restart
+            since = 0
+        yield "retry: 5000\n\n"
+        while True:
+            events = self.wait(since, keepalive)
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for version, topic, data in events:
+                yield f"id: {version}\nevent: {topic}\ndata: {json.dumps(data, default=str)}\n\n"
+                since = version
+
+class EventRelay:
+    """Mirrors a remote EventBus into a local one on a background thread
+    
+    HTTP worker processes use it so that every SSE client shares one
+    connection to the owner process. Versions are kept as the owner numbers
+    them, so Last-Event-ID works whichever worker a client reconnects to.
+    """
+    
+    def __init__(self, wait: Callable[[int, Optional[float]], List[Tuple[int, str, Any]]],
+                 bus: EventBus, timeout: float = 15):
+        self.wait = wait
+        self.bus = bus
+        self.timeout = timeout
+        self.thread = None
+    
+    def _run(self):
+        since = 0
+        while True:
+            try:
+                events = self.wait(since, self.timeout)
+            except Exception as e:
+                print(f"❌ Event relay error: {e}")
+                time.sleep(5)
+                continue
+            for version, topic, data in events:
+                self.bus.publish(topic, data, version)
+                since = version
+    
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
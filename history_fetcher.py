@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from http_client import HttpClient
+from timeseries import TimeSeriesStore
+
+class MarketChartFetcher:
+    """Per-asset CoinGecko market_chart cache that only downloads the missing tail
+    
+    Points are kept in a TimeSeriesStore, so they persist between runs. Each
+    fetch asks market_chart/range for the span after the newest cached point
+    and appends what comes back; a cache that is empty or too old is refilled
+    for the whole requested span.
+    """
+    
+    def __init__(self, http: HttpClient, url: str, directory: str = "market_chart",
+                 capacity: int = 10080, refresh_interval: float = 300):
+        self.http = http
+        self.url = url  # Template with an {id} placeholder
+        self.refresh_interval = refresh_interval
+        self.store = TimeSeriesStore(directory, capacity=capacity)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+    
+    def _lock(self, crypto_id: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._locks.get(crypto_id)
+            if lock is None:
+                lock = self._locks[crypto_id] = threading.Lock()
+            return lock
+    
+    def fetch(self, crypto_id: str, days: float = 1, max_age: Optional[float] = None,
+              deadline: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Get an asset's points for the last days, downloading only what is not cached
+        
+        A cached tail younger than max_age (default refresh_interval) is used as
+        is; max_age=0 always asks for the newest points. A deadline, as a
+        time.monotonic() value, bounds the download including its retries.
+        """
+        start = time.time() - days * 86400
+        max_age = self.refresh_interval if max_age is None else max_age
+        
+        # One download per asset at a time; concurrent callers reuse its result
+        with self._lock(crypto_id):
+            now = time.time()
+            last = self.store.series(crypto_id).last_timestamp
+            since = start if last is None or last < start else last
+            if now - since >= max_age:
+                self._download(crypto_id, since, now, deadline)
+        
+        return self.store.range(crypto_id, start)
+    
+    def download(self, crypto_id: str, since: float, until: float,
+                 deadline: Optional[float] = None) -> Optional[List[Tuple[float, float]]]:
+        """Fetch market_chart/range points after since, up to until, without caching them; None on error
+        
+        For spans that must not enter the cache: fetch() treats the cache as
+        covering everything from its first point, so an arbitrary span stored
+        there would later pass for a full day of history.
+        """
+        params = {
+            "vs_currency": "usd",
+            "from": int(since),
+            "to": int(until)
+        }
+        try:
+            response = self.http.get(self.url.format(id=crypto_id), params=params, deadline=deadline)
+            response.raise_for_status()
+            points = response.json().get("prices", [])
+        except Exception as e:
+            print(f"Error fetching {crypto_id} market chart: {e}")
+            return None
+        return [
+            (timestamp_ms / 1000, float(price))
+            for timestamp_ms, price in points
+            if timestamp_ms / 1000 > since
+        ]
+    
+    def _download(self, crypto_id: str, since: float, until: float, deadline: Optional[float] = None):
+        """Fetch market_chart/range for since..until and merge it into the cache"""
+        # The series rejects points older than its newest, so overlap is dropped
+        for timestamp, price in self.download(crypto_id, since, until, deadline) or []:
+            self.store.append(crypto_id, timestamp, price)
+    
+    def change(self, crypto_id: str, days: float = 1) -> Optional[Tuple[float, float]]:
+        """Latest price and the price days ago"""
+        points = self.fetch(crypto_id, days)
+        if len(points) < 2:
+            return None
+        return points[-1][1], points[0][1]
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import HTTP_DURATION, HTTP_RESPONSES, HTTP_RETRIES, upstream_for
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+class HttpClient:
+    """Shared HTTP client with per-host keep-alive connection pools and retries
+    
+    Failed requests are retried with exponential backoff and full jitter.
+    A 429 waits for the server's Retry-After (or Telegram's retry_after) when
+    that fits within max_backoff, otherwise the response is returned so the
+    caller can fall back to cached data. Non-idempotent requests such as
+    Telegram sendMessage are only retried when they cannot have been
+    delivered: on 429 or a connect timeout.
+    """
+    
+    def __init__(self, retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30,
+                 pool_size: int = 10, timeout: float = 10):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        
+        # requests keeps one pool per host; pool_size bounds hosts and connections per host
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def request(self, method: str, url: str, retries: Optional[int] = None,
+                deadline: Optional[float] = None, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures up to retries times
+        
+        With a deadline (a time.monotonic() value), each attempt's timeout is cut
+        to the time left and a retry that could not start before it is not made.
+        """
+        retries = self.retries if retries is None else retries
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        timeout = kwargs.pop("timeout", self.timeout)
+        upstream = upstream_for(url)
+        
+        attempt = 0
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Deadline passed before requesting {urlsplit(url).netloc}")
+                kwargs["timeout"] = min(timeout, remaining)
+            else:
+                kwargs["timeout"] = timeout
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                HTTP_DURATION.observe(time.perf_counter() - started, upstream)
+                HTTP_RESPONSES.inc(upstream, type(e).__name__)
+                retryable = idempotent or isinstance(e, requests.ConnectTimeout)
+                if attempt >= retries or not retryable:
+                    raise
+                delay = self._backoff(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                reason = type(e).__name__
+            else:
+                HTTP_DURATION.observe(time.perf_counter() - started, upstream)
+                status = response.status_code
+                HTTP_RESPONSES.inc(upstream, str(status))
+                if attempt >= retries or status not in RETRY_STATUSES:
+                    return response
+                if not idempotent and status != 429:
+                    return response
+                
+                retry_after = self.retry_after(response)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if delay > self.max_backoff:
+                    return response
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    return response
+                response.close()
+                reason = f"HTTP {status}"
+            
+            attempt += 1
+            HTTP_RETRIES.inc(upstream, reason)
+            print(f"🔁 {reason} from {urlsplit(url).netloc}, retry {attempt}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+    
+    @staticmethod
+    def retry_after(response: requests.Response) -> Optional[float]:
+        """Get the server-requested delay from Retry-After or a Telegram retry_after"""
+        header = response.headers.get("Retry-After")
+        if header:
+            try:
+                return max(0.0, float(header))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(header)
+                    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+_shared_client: Optional[HttpClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_http_client(**settings) -> HttpClient:
+    """Get the process-wide HTTP client, creating it with settings on first use"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient(**settings)
+        return _shared_client
@@ -0,0 +1,71 @@
+import json
+import os
+from typing import Any, Callable, List, Sequence, Tuple
+
+from data_store import atomic_write_json
+
+class Journal:
+    """A JSON snapshot plus an append-only log of the changes made after it
+    
+    The log sits next to the snapshot (filename + ".log"), one JSON [op, value]
+    line per change, so saving a change costs O(changed items). Once the log
+    holds more lines than there are live items (and at least compact_min),
+    the snapshot is rewritten and the log emptied, which amortizes the rewrite
+    over at least as many changes as there are items. Callers serialize
+    access with their own lock.
+    """
+    
+    def __init__(self, filename: str, label: str, compact_min: int = 1000):
+        self.filename = filename
+        self.log_filename = filename + ".log"
+        self.label = label  # Names the data in error messages
+        self.compact_min = compact_min  # Log lines always allowed before compacting
+        self.lines = 0
+    
+    def load(self) -> Tuple[list, List[Tuple[str, Any]]]:
+        """Snapshot items and the (op, value) changes logged after it, oldest first"""
+        snapshot = []
+        if os.path.exists(self.filename):
+            try:
+                with open(self.filename, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Error loading {self.label} file: {e}")
+        
+        changes = []
+        if os.path.exists(self.log_filename):
+            try:
+                with open(self.log_filename, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        self.lines += 1
+                        try:
+                            op, value = json.loads(line)
+                        except ValueError:
+                            continue  # A line cut short by a crash
+                        changes.append((op, value))
+            except IOError as e:
+                print(f"Error loading {self.label} journal: {e}")
+        return snapshot, changes
+    
+    def append(self, changes: Sequence[Tuple[str, Any]], live: int, snapshot: Callable[[], list]):
+        """Log changes, or compact to snapshot() instead once the log outgrows the live items"""
+        if self.lines + len(changes) > max(self.compact_min, live):
+            self.compact(snapshot())
+            return
+        try:
+            with open(self.log_filename, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps([op, value], ensure_ascii=False) + "\n" for op, value in changes))
+            self.lines += len(changes)
+        except (IOError, OSError) as e:
+            print(f"Error saving {self.label} journal: {e}")
+    
+    def compact(self, items: list):
+        """Write items as the new snapshot and empty the log"""
+        try:
+            atomic_write_json(self.filename, items, indent=None)
+            # A crash before the truncate only replays changes the snapshot already holds
+            with open(self.log_filename, 'w', encoding='utf-8'):
+                pass
+            self.lines = 0
+        except (IOError, OSError) as e:
+            print(f"Error saving {self.label} file: {e}")
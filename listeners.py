@@ -0,0 +1,23 @@
+from typing import Callable, List
+
+class ListenerMixin:
+    """add_listener() and _notify() for classes that report changes to callbacks
+    
+    The class creates self._listeners in __init__, typed with the callback
+    signature it notifies with, and names itself in listener_label for error
+    messages. A failing callback is reported and does not stop the others.
+    """
+    
+    listener_label = "listener"
+    _listeners: List[Callable[..., None]]
+    
+    def add_listener(self, callback: Callable[..., None]):
+        """Call callback with the same arguments as every notification"""
+        self._listeners.append(callback)
+    
+    def _notify(self, *args):
+        for callback in self._listeners:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in {self.listener_label} listener: {e}")
@@ -10,44 +10,74 @@ This bot monitors Ethereum prices and sends Telegram notifications for:
 Usage:
     python main.py          # Start with web dashboard
     python main.py --cli    # Run in CLI mode only
+    python main.py --cli --async  # CLI mode with concurrent fetches
+    python main.py --cli --profile  # CLI mode, saving a cProfile of the run
+    python main.py --workers 4  # Web dashboard served by 4 worker processes
     python main.py --help   # Show help
 """
 
 import sys
 import argparse
-from bot import EthereumBot
-from web_app import app, start_bot_monitoring
+from config import Config
 
-def run_cli_mode():
+# The bot, Flask and their dependencies are imported by the mode that needs them
+
+def run_cli_mode(config: Config, use_async: bool = False, profile: bool = False):
     """Run bot in CLI-only mode"""
     print("🤖 Starting Ethereum Monitoring Bot (CLI Mode)")
     print("=" * 50)
     
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
     try:
-        bot = EthereumBot()
+        if use_async:
+            from async_bot import AsyncEthereumBot
+            bot = AsyncEthereumBot(config)
+        else:
+            from bot import EthereumBot
+            bot = EthereumBot(config)
         bot.run_once()
     except KeyboardInterrupt:
         print("\n👋 Bot stopped by user")
     except Exception as e:
         print(f"❌ Fatal error: {e}")
         sys.exit(1)
+    finally:
+        if profiler:
+            profiler.disable()
+            from profiling import save_profile
+            path = save_profile(profiler, config.profile_dir, "cli run")
+            print(f"🔬 Profile saved to {path} (summary in {path[:-len('.prof')]}.txt)")
 
-def run_web_mode():
+def run_web_mode(config: Config, workers: int = 1):
     """Run bot with web dashboard"""
     print("🌐 Starting Ethereum Monitoring Bot with Web Dashboard")
     print("=" * 50)
     
+    import web_app
+    web_app.configure(config)
+    
+    if workers > 1:
+        # One process owns the bot and scheduler; the workers only serve HTTP
+        from web_server import serve
+        serve(workers, host='0.0.0.0', port=5000)
+        return
+    
     try:
         # Auto-start bot monitoring
-        start_bot_monitoring()
+        web_app.start_bot_monitoring()
         print("🚀 Bot monitoring started in background")
         print("🌐 Web dashboard available at: http://localhost:5000")
         print("📊 Access the dashboard to monitor bot status and control operations")
         print("⏹️  Press Ctrl+C to stop")
         
         # Start Flask web server
-        app.run(host='0.0.0.0', port=5000, debug=False)
-        
+        web_app.app.run(host='0.0.0.0', port=5000, debug=False)
+    
     except KeyboardInterrupt:
         print("\n👋 Shutting down...")
     except Exception as e:
@@ -63,7 +93,10 @@ def main():
 Examples:
     python main.py              # Start with web dashboard (default)
     python main.py --cli        # Run in command-line mode only
-    
+    python main.py --cli --async  # Fetch prices, 24h data and news concurrently
+    python main.py --cli --profile  # Save a cProfile of the run to profiles/
+    python main.py --workers 4  # Serve the dashboard from 4 processes
+
 The bot will:
     • Monitor ETH price every 60 minutes
     • Send alerts for 3%+ price changes
@@ -78,6 +111,26 @@ The bot will:
         help='Run in CLI mode without web dashboard'
     )
     
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Use the asyncio engine that runs check cycle fetches concurrently'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='With --cli, profile the run and save pstats files to the profile directory'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Web worker processes; above 1, one extra process owns the bot and scheduler'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -85,10 +138,11 @@ The bot will:
     )
     
     args = parser.parse_args()
+    if args.profile and not args.cli:
+        parser.error("--profile applies to --cli runs; use /api/profile for the dashboard's tasks")
     
     # Check environment variables
     try:
-        from config import Config
         config = Config()
         print(f"✅ Configuration loaded successfully")
         print(f"📱 Telegram User: @{config.telegram_user_id}")
@@ -104,9 +158,9 @@ The bot will:
     
     # Run in appropriate mode
     if args.cli:
-        run_cli_mode()
+        run_cli_mode(config, args.use_async or config.use_async_engine, args.profile)
     else:
-        run_web_mode()
+        run_web_mode(config, args.workers)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,168 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# Seconds; spans a fast local call up to a slow retried upstream request
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic count per label combination"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+    
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [{"labels": dict(zip(self.labelnames, labels)), "value": value} for labels, value in values]
+
+class Histogram:
+    """Bucketed distribution per label combination, Prometheus style
+    
+    observe() is a binary search and three additions under a lock; buckets
+    are only made cumulative when rendered.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def _copy(self) -> List[Tuple[Tuple[str, ...], List[int], float, int]]:
+        with self._lock:
+            return [(labels, list(counts), total, count)
+                    for labels, (counts, total, count) in sorted(self._series.items())]
+    
+    def render(self) -> List[str]:
+        lines = []
+        for labels, counts, total, count in self._copy():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+    
+    def snapshot(self) -> List[Dict]:
+        return [
+            {
+                "labels": dict(zip(self.labelnames, labels)),
+                "buckets": list(self.buckets),
+                "counts": counts,  # Per bucket, not cumulative; the last is above every bound
+                "sum": total,
+                "count": count
+            }
+            for labels, counts, total, count in self._copy()
+        ]
+
+class Registry:
+    """Named metrics rendered together"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+    
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text, labelnames))
+    
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, labelnames, buckets))
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """All metrics as JSON-ready values for the dashboard"""
+        return {
+            metric.name: {"type": metric.kind, "help": metric.help, "series": metric.snapshot()}
+            for metric in self._metrics.values()
+        }
+
+REGISTRY = Registry()
+
+TASK_DURATION = REGISTRY.histogram(
+    "ethbot_task_duration_seconds", "Scheduler task run time", ("task",))
+TASK_RUNS = REGISTRY.counter(
+    "ethbot_task_runs_total", "Scheduler task runs by outcome (ok, error, skipped)", ("task", "outcome"))
+TASK_OVERRUNS = REGISTRY.counter(
+    "ethbot_task_overruns_total", "Scheduler task runs that exceeded their timeout", ("task",))
+HTTP_DURATION = REGISTRY.histogram(
+    "ethbot_http_request_duration_seconds", "Upstream HTTP attempt latency", ("upstream",))
+HTTP_RESPONSES = REGISTRY.counter(
+    "ethbot_http_responses_total", "Upstream HTTP attempts by status code or error", ("upstream", "status"))
+HTTP_RETRIES = REGISTRY.counter(
+    "ethbot_http_retries_total", "Upstream HTTP retries by reason", ("upstream", "reason"))
+TELEGRAM_SENDS = REGISTRY.counter(
+    "ethbot_telegram_sends_total", "Telegram send attempts by outcome (delivered, retry, failed)", ("outcome",))
+TELEGRAM_DELIVERY = REGISTRY.histogram(
+    "ethbot_telegram_delivery_seconds", "Time from queueing a Telegram message to its delivery",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900))
+STORE_FLUSH = REGISTRY.histogram(
+    "ethbot_store_flush_seconds", "Time to write the data store file",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1))
+
+def upstream_for(url: str) -> str:
+    """Upstream label for a request URL; never includes the Telegram token"""
+    parts = urlsplit(url)
+    path = parts.path
+    if path.endswith("/simple/price"):
+        return "coingecko_price"
+    if "/market_chart" in path:
+        return "coingecko_market_chart"
+    if path.rstrip("/").endswith("/posts"):
+        return "cryptopanic"
+    if path.startswith("/bot"):
+        return "telegram"
+    return parts.hostname or "other"
@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from data_store import DataStore
+from listeners import ListenerMixin
+
+class PriceCache(ListenerMixin):
+    """In-process TTL cache for prices with single-flight fetch coalescing"""
+    
+    listener_label = "price cache"
+    
+    def __init__(self, fetcher: Callable[[List[str]], Dict[str, float]], ttl: float = 60,
+                 store: Optional[DataStore] = None, persist_interval: float = 300,
+                 wait_timeout: float = 30):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.store = store
+        self.persist_interval = persist_interval
+        self.wait_timeout = wait_timeout
+        
+        self._entries: Dict[str, Tuple[float, float]] = {}  # id -> (price, fetched_at)
+        self._inflight: Dict[str, threading.Event] = {}
+        self._unpersisted: Set[str] = set()
+        self._last_persist = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, float]], None]] = []  # Called with newly fetched or received prices
+    
+    def get_many(self, crypto_ids: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Get prices, fetching only stale ids and sharing fetches already in flight"""
+        crypto_ids = list(crypto_ids)
+        prices: Dict[str, Optional[float]] = {}
+        waits: List[threading.Event] = []
+        to_fetch: List[str] = []
+        
+        with self._lock:
+            now = time.monotonic()
+            for crypto_id in crypto_ids:
+                entry = self._entries.get(crypto_id)
+                if entry and now - entry[1] < self.ttl:
+                    prices[crypto_id] = entry[0]
+                elif crypto_id in self._inflight:
+                    waits.append(self._inflight[crypto_id])
+                else:
+                    to_fetch.append(crypto_id)
+            
+            # This caller leads the fetch; everyone else waits on its event
+            flight = threading.Event()
+            for crypto_id in to_fetch:
+                self._inflight[crypto_id] = flight
+        
+        if to_fetch:
+            fetched: Dict[str, float] = {}
+            try:
+                fetched = self.fetcher(to_fetch)
+            except Exception as e:
+                print(f"Error fetching prices for {', '.join(to_fetch)}: {e}")
+            finally:
+                with self._lock:
+                    now = time.monotonic()
+                    for crypto_id, price in fetched.items():
+                        self._entries[crypto_id] = (price, now)
+                        self._unpersisted.add(crypto_id)
+                    for crypto_id in to_fetch:
+                        self._inflight.pop(crypto_id, None)
+                flight.set()
+            self._persist()
+            if fetched:
+                self._notify(fetched)
+        
+        for event in waits:
+            event.wait(self.wait_timeout)
+        
+        # Anything not fresh falls back to the last known price
+        for crypto_id in crypto_ids:
+            if crypto_id not in prices:
+                prices[crypto_id] = self.peek(crypto_id)
+        return prices
+    
+    def get(self, crypto_id: str) -> Optional[float]:
+        """Get a single price"""
+        return self.get_many([crypto_id])[crypto_id]
+    
+    def peek(self, crypto_id: str) -> Optional[float]:
+        """Get the last known price without fetching, regardless of age"""
+        entry = self._entries.get(crypto_id)
+        if entry:
+            return entry[0]
+        if self.store:
+            return self.store.get(f"cached_{crypto_id}_price")
+        return None
+    
+    def put(self, crypto_id: str, price: float):
+        """Store a price received from elsewhere, such as a streaming feed"""
+        with self._lock:
+            self._entries[crypto_id] = (price, time.monotonic())
+            self._unpersisted.add(crypto_id)
+        self._persist()
+        self._notify({crypto_id: price})
+    
+    def expire(self):
+        """Mark every cached price stale so the next read fetches, keeping them for peek"""
+        with self._lock:
+            self._entries = {
+                crypto_id: (price, float("-inf"))
+                for crypto_id, (price, _) in self._entries.items()
+            }
+    
+    def flush(self):
+        """Persist all unsaved prices to the data store"""
+        self._persist(force=True)
+    
+    def _persist(self, force: bool = False):
+        """Write unsaved prices to the data store at most once per persist_interval"""
+        if not self.store:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            if not self._unpersisted:
+                return
+            if not force and self._last_persist and now - self._last_persist < self.persist_interval:
+                return
+            updates = {
+                f"cached_{crypto_id}_price": self._entries[crypto_id][0]
+                for crypto_id in self._unpersisted
+            }
+            self._unpersisted.clear()
+            self._last_persist = now
+        
+        self.store.update(updates)
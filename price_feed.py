@@ -0,0 +1,235 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional, Tuple
+
+import requests
+
+from http_client import get_http_client
+
+# (crypto_id, price, unix timestamp)
+PriceTick = Tuple[str, float, float]
+
+class PriceFeed:
+    """Source of streaming price ticks
+    
+    Implementations connect to a stream and yield ticks until it ends or
+    fails; StreamIngestor takes care of reconnecting.
+    """
+    
+    def connect(self):
+        """Open the stream, raising if it is unavailable"""
+        raise NotImplementedError
+    
+    def ticks(self) -> Iterator[PriceTick]:
+        """Yield ticks until the stream closes"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Release the stream"""
+
+class NDJSONFeed(PriceFeed):
+    """Line-delimited JSON ticks read from a streaming HTTP response
+    
+    Each line is either {"id": "ethereum", "price": 3000.0, "ts": 1700000000}
+    or the CoinGecko simple/price shape {"ethereum": {"usd": 3000.0}}. Blank
+    lines are treated as heartbeats.
+    """
+    
+    def __init__(self, url: str, read_timeout: float = 60):
+        self.url = url
+        self.read_timeout = read_timeout
+        self._response: Optional[requests.Response] = None
+    
+    def connect(self):
+        # Through the shared client for its connection pool, retries and upstream metrics
+        self._response = get_http_client().get(self.url, stream=True, timeout=(10, self.read_timeout))
+        self._response.raise_for_status()
+    
+    def ticks(self) -> Iterator[PriceTick]:
+        for line in self._response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if "price" in data:
+                yield data["id"], float(data["price"]), float(data.get("ts", time.time()))
+            else:
+                now = time.time()
+                for crypto_id, quote in data.items():
+                    yield crypto_id, float(quote["usd"]), now
+    
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+class StreamIngestor:
+    """Runs a PriceFeed in the background and pushes its ticks into the bot
+    
+    Ticks go straight to on_tick. When the stream drops it reconnects with
+    jittered exponential backoff; while it is down, poll (the regular REST
+    price check) runs every fallback_interval, and after a reconnect that
+    follows a gap longer than gap_threshold, poll runs once to backfill the
+    move that happened in between.
+    """
+    
+    def __init__(self, feed: PriceFeed, on_tick: Callable[[str, float, float], None],
+                 poll: Callable[[], None], stale_after: float = 60, gap_threshold: float = 30,
+                 fallback_interval: float = 60, max_backoff: float = 60):
+        self.feed = feed
+        self.on_tick = on_tick
+        self.poll = poll
+        self.stale_after = stale_after
+        self.gap_threshold = gap_threshold
+        self.fallback_interval = fallback_interval
+        self.max_backoff = max_backoff
+        
+        self.running = False
+        self.thread = None
+        self.connected = False
+        self.ticks_received = 0
+        self.reconnects = 0
+        self.last_tick_at: Optional[float] = None
+        self._last_poll = 0.0
+        self._stop_event = threading.Event()
+    
+    @property
+    def healthy(self) -> bool:
+        """Connected and receiving ticks recently"""
+        return (self.connected and self.last_tick_at is not None and
+                time.monotonic() - self.last_tick_at < self.stale_after)
+    
+    def _run_poll(self, reason: str):
+        print(f"📡 Price stream {reason}, checking prices over REST")
+        self._last_poll = time.monotonic()
+        try:
+            self.poll()
+        except Exception as e:
+            print(f"❌ REST fallback error: {e}")
+    
+    def _consume(self):
+        """Connect once and process ticks until the stream ends"""
+        self.feed.connect()
+        self.connected = True
+        
+        gap = None if self.last_tick_at is None else time.monotonic() - self.last_tick_at
+        if gap is not None and gap > self.gap_threshold:
+            self._run_poll(f"was down for {gap:.0f}s")
+        
+        for crypto_id, price, timestamp in self.feed.ticks():
+            if not self.running:
+                break
+            self.last_tick_at = time.monotonic()
+            self.ticks_received += 1
+            try:
+                self.on_tick(crypto_id, price, timestamp)
+            except Exception as e:
+                print(f"❌ Error handling {crypto_id} tick: {e}")
+    
+    def _run(self):
+        attempt = 0
+        while self.running:
+            try:
+                self._consume()
+                attempt = 0
+            except Exception as e:
+                print(f"❌ Price stream error: {e}")
+            finally:
+                self.connected = False
+                self.feed.close()
+            
+            if not self.running:
+                break
+            
+            if time.monotonic() - self._last_poll >= self.fallback_interval:
+                self._run_poll("is down")
+            
+            delay = random.uniform(0, min(self.max_backoff, 2 ** attempt))
+            attempt += 1
+            self.reconnects += 1
+            self._stop_event.wait(delay)
+    
+    def start(self):
+        """Start consuming the stream in the background"""
+        if self.running:
+            return
+        self.running = True
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print("📡 Price stream started")
+    
+    def stop(self):
+        """Stop consuming the stream"""
+        self.running = False
+        self._stop_event.set()
+        self.feed.close()
+        if self.thread:
+            self.thread.join(timeout=5)
+        print("📡 Price stream stopped")
+    
+    def get_status(self) -> dict:
+        """Get stream status"""
+        return {
+            "connected": self.connected,
+            "healthy": self.healthy,
+            "ticks_received": self.ticks_received,
+            "reconnects": self.reconnects,
+            "seconds_since_tick": (
+                round(time.monotonic() - self.last_tick_at, 1)
+                if self.last_tick_at is not None else None
+            )
+        }
+
+def make_standin_server(host: str = "127.0.0.1", port: int = 8765, prices: Optional[dict] = None,
+                        interval: float = 1.0, volatility: float = 0.002) -> ThreadingHTTPServer:
+    """Local NDJSON price stream for trying out and testing the streaming mode
+    
+    Every client gets one random-walk tick per asset each interval, starting
+    from prices. Point Config.price_stream_url at http://host:port/.
+    """
+    prices = dict(prices or {"ethereum": 3000.0, "chainlink": 15.0})
+    lock = threading.Lock()
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            try:
+                while True:
+                    with lock:
+                        for crypto_id in prices:
+                            prices[crypto_id] *= 1 + random.gauss(0, volatility)
+                        ticks = [
+                            {"id": crypto_id, "price": round(price, 4), "ts": time.time()}
+                            for crypto_id, price in prices.items()
+                        ]
+                    for tick in ticks:
+                        self.wfile.write(json.dumps(tick).encode() + b"\n")
+                    self.wfile.flush()
+                    time.sleep(interval)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return ThreadingHTTPServer((host, port), Handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in price stream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between ticks")
+    args = parser.parse_args()
+    
+    server = make_standin_server(args.host, args.port, interval=args.interval)
+    print(f"📡 Stand-in price stream on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,121 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+SUMMARY_LINES = 40  # Functions listed in the text summary next to each profile
+
+# Python 3.12+ allows one active profiler per process, so profiled runs take turns
+_profile_lock = threading.Lock()
+
+def save_profile(profiler: cProfile.Profile, directory: str, label: str) -> str:
+    """Write a profile as a .prof pstats file plus a .txt summary and return the .prof path
+    
+    The .prof file loads with pstats, snakeviz or flameprof for a flame graph.
+    """
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-").lower() or "profile"
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(directory, f"{slug}-{stamp}.prof")
+    profiler.dump_stats(path)
+    
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+    with open(path[:-len(".prof")] + ".txt", "w") as f:
+        f.write(f"{label}\n{summary.getvalue()}")
+    return path
+
+def list_profiles(directory: str, limit: int = 50) -> List[Dict]:
+    """Saved profiles, newest first"""
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".prof")]
+    except FileNotFoundError:
+        return []
+    
+    profiles = []
+    for name in names:
+        stat = os.stat(os.path.join(directory, name))
+        profiles.append({
+            "file": name,
+            "summary": name[:-len(".prof")] + ".txt",
+            "size": stat.st_size,
+            "created": datetime.fromtimestamp(stat.st_mtime).isoformat()
+        })
+    profiles.sort(key=lambda p: p["created"], reverse=True)
+    return profiles[:limit]
+
+class RunProfiler:
+    """Profiles the next runs of one scheduler task, one file per run
+    
+    The scheduler only calls run() while a profiler is attached to a task,
+    so tasks that are not being profiled pay nothing. A profile records the
+    calls made on the thread it was enabled on: the run's own HTTP waits and
+    store writes, but not work handed to other threads such as queued
+    Telegram sends. Only one profile is taken at a time; a run that starts
+    while another is being profiled runs unprofiled and leaves its slot to
+    a later run.
+    """
+    
+    def __init__(self, task_name: str, runs: int, directory: str):
+        self.task_name = task_name
+        self.runs = runs
+        self.directory = directory
+        self.requested = time.time()
+        self.files: List[str] = []
+        self._started = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def done(self) -> bool:
+        """Whether every requested run has started"""
+        return self._started >= self.runs
+    
+    def run(self, func: Callable):
+        """Run func, profiling it if runs are still wanted and no other profile is being taken"""
+        if not _profile_lock.acquire(blocking=False):
+            func()
+            return
+        
+        profiler = None
+        try:
+            with self._lock:
+                if self._started < self.runs:
+                    profiler = cProfile.Profile()
+                    profiler.enable()
+                    self._started += 1
+                    run_number = self._started
+        except ValueError as e:
+            # Another profiling tool, such as a debugger or coverage, is active
+            print(f"❌ Cannot profile {self.task_name}: {e}")
+            profiler = None
+        if profiler is None:
+            _profile_lock.release()
+            func()
+            return
+        
+        try:
+            func()
+        finally:
+            profiler.disable()
+            _profile_lock.release()
+            label = f"{self.task_name} run {run_number} of {self.runs}"
+            path = save_profile(profiler, self.directory, label)
+            with self._lock:
+                self.files.append(os.path.basename(path))
+            print(f"🔬 Saved profile of {label} to {path}")
+    
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "task": self.task_name,
+                "runs": self.runs,
+                "started": self._started,
+                "files": list(self.files),
+                "requested": datetime.fromtimestamp(self.requested).isoformat()
+            }
@@ -0,0 +1,222 @@
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+class RollingWindow:
+    """Price statistics over a sliding time window, kept up to date as points arrive
+    
+    Points live in NumPy ring buffers. Running sums for the time-weighted
+    average and squared log returns are adjusted on every append and
+    eviction, and monotonic deques track the high and low, so each append is
+    amortized O(1) and every query is O(1). The sums are recomputed from the
+    buffers with vectorized NumPy once per capacity appends to shed
+    floating point drift.
+    """
+    
+    def __init__(self, span: float, capacity: int = 10080):
+        self.span = span
+        self.capacity = capacity
+        
+        self._ts = np.empty(capacity)
+        self._px = np.empty(capacity)
+        self._weighted = np.empty(capacity)  # prev price * seconds since prev point
+        self._dt = np.empty(capacity)  # Seconds since prev point
+        self._r2 = np.empty(capacity)  # Squared log return since prev point
+        self._head = 0  # Index of the oldest point
+        self._size = 0
+        
+        # Sums over every point except the oldest, whose interval lies outside the window
+        self._sum_weighted = 0.0
+        self._sum_dt = 0.0
+        self._sum_r2 = 0.0
+        self._sum_px = 0.0
+        self._appends = 0
+        
+        self._highs: deque = deque()  # (timestamp, price), prices decreasing
+        self._lows: deque = deque()  # (timestamp, price), prices increasing
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _index(self, offset: int) -> int:
+        return (self._head + offset) % self.capacity
+    
+    def append(self, timestamp: float, price: float) -> bool:
+        """Add a point, evicting those that fall out of the window; older points are ignored"""
+        if self._size:
+            last = self._index(self._size - 1)
+            prev_ts, prev_px = self._ts[last], self._px[last]
+            if timestamp <= prev_ts:
+                return False
+            dt = timestamp - prev_ts
+            weighted = prev_px * dt
+            r2 = float(np.log(price / prev_px)) ** 2 if prev_px > 0 and price > 0 else 0.0
+        else:
+            dt = weighted = r2 = 0.0
+        
+        if self._size == self.capacity:
+            self._evict()
+        
+        i = self._index(self._size)
+        self._ts[i], self._px[i] = timestamp, price
+        self._weighted[i], self._dt[i], self._r2[i] = weighted, dt, r2
+        self._size += 1
+        if self._size > 1:
+            self._sum_weighted += weighted
+            self._sum_dt += dt
+            self._sum_r2 += r2
+        self._sum_px += price
+        
+        while self._highs and self._highs[-1][1] <= price:
+            self._highs.pop()
+        self._highs.append((timestamp, price))
+        while self._lows and self._lows[-1][1] >= price:
+            self._lows.pop()
+        self._lows.append((timestamp, price))
+        
+        start = timestamp - self.span
+        while self._size > 1 and self._ts[self._head] < start:
+            self._evict()
+        
+        self._appends += 1
+        if self._appends >= self.capacity:
+            self._resum()
+        return True
+    
+    def _evict(self):
+        """Drop the oldest point"""
+        oldest_ts = self._ts[self._head]
+        self._sum_px -= self._px[self._head]
+        self._head = self._index(1)
+        self._size -= 1
+        
+        # The new oldest point's interval now starts outside the window
+        if self._size:
+            self._sum_weighted -= self._weighted[self._head]
+            self._sum_dt -= self._dt[self._head]
+            self._sum_r2 -= self._r2[self._head]
+        
+        while self._highs and self._highs[0][0] <= oldest_ts:
+            self._highs.popleft()
+        while self._lows and self._lows[0][0] <= oldest_ts:
+            self._lows.popleft()
+    
+    def _ordered(self, values: np.ndarray) -> np.ndarray:
+        """Buffer contents oldest first"""
+        end = self._head + self._size
+        if end <= self.capacity:
+            return values[self._head:end]
+        return np.concatenate((values[self._head:], values[:end - self.capacity]))
+    
+    def _resum(self):
+        """Recompute the running sums from the buffers"""
+        self._appends = 0
+        if not self._size:
+            self._sum_weighted = self._sum_dt = self._sum_r2 = self._sum_px = 0.0
+            return
+        self._sum_weighted = float(self._ordered(self._weighted)[1:].sum())
+        self._sum_dt = float(self._ordered(self._dt)[1:].sum())
+        self._sum_r2 = float(self._ordered(self._r2)[1:].sum())
+        self._sum_px = float(self._ordered(self._px).sum())
+    
+    def seed(self, timestamps: np.ndarray, prices: np.ndarray):
+        """Replace the contents with the window's share of a sorted series, computed in one pass"""
+        timestamps = np.asarray(timestamps, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        if len(timestamps):
+            keep = max(
+                int(np.searchsorted(timestamps, timestamps[-1] - self.span)),
+                len(timestamps) - self.capacity
+            )
+            timestamps, prices = timestamps[keep:], prices[keep:]
+        
+        n = len(timestamps)
+        self._head, self._size = 0, n
+        self._ts[:n], self._px[:n] = timestamps, prices
+        self._dt[:n] = np.diff(timestamps, prepend=timestamps[:1])
+        self._weighted[:n] = np.concatenate((prices[:1] * 0, prices[:-1])) * self._dt[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(prices), prepend=np.log(prices[:1]))
+        self._r2[:n] = np.nan_to_num(returns) ** 2
+        self._resum()
+        
+        # Monotonic deques only need the suffix maxima and minima
+        self._highs.clear()
+        self._lows.clear()
+        if n:
+            suffix_max = np.maximum.accumulate(prices[::-1])[::-1]
+            suffix_min = np.minimum.accumulate(prices[::-1])[::-1]
+            for i in np.flatnonzero(prices > np.append(suffix_max[1:], -np.inf)):
+                self._highs.append((timestamps[i], prices[i]))
+            for i in np.flatnonzero(prices < np.append(suffix_min[1:], np.inf)):
+                self._lows.append((timestamps[i], prices[i]))
+    
+    def summary(self) -> Optional[Dict]:
+        """Statistics over the window, or None if it holds no points"""
+        if not self._size:
+            return None
+        
+        first = self._head
+        last = self._index(self._size - 1)
+        start_price = float(self._px[first])
+        price = float(self._px[last])
+        change = price - start_price
+        twap = self._sum_weighted / self._sum_dt if self._sum_dt > 0 else price
+        return {
+            "start_time": float(self._ts[first]),
+            "end_time": float(self._ts[last]),
+            "start_price": start_price,
+            "price": price,
+            "change": change,
+            "change_percent": change / start_price * 100 if start_price else 0.0,
+            "high": float(self._highs[0][1]),
+            "low": float(self._lows[0][1]),
+            "mean": float(self._sum_px / self._size),
+            "twap": float(twap),
+            "volatility_percent": float(np.sqrt(max(self._sum_r2, 0.0))) * 100,
+            "samples": self._size
+        }
+
+class RollingStats:
+    """Rolling 24h and 7d statistics per asset, fed by recorded price points"""
+    
+    WINDOWS = {"24h": 86400, "7d": 7 * 86400}
+    
+    def __init__(self, capacity: int = 10080, windows: Optional[Dict[str, float]] = None):
+        self.capacity = capacity
+        self.windows = dict(windows or self.WINDOWS)
+        self._assets: Dict[str, Dict[str, RollingWindow]] = {}
+        self._lock = threading.Lock()
+    
+    def ensure(self, asset: str, loader: Callable[[], Tuple[np.ndarray, np.ndarray]]):
+        """Seed an asset from loader() the first time it is used"""
+        with self._lock:
+            if asset not in self._assets:
+                timestamps, prices = loader()
+                for window in self._windows(asset).values():
+                    window.seed(timestamps, prices)
+    
+    def _windows(self, asset: str) -> Dict[str, RollingWindow]:
+        windows = self._assets.get(asset)
+        if windows is None:
+            windows = self._assets[asset] = {
+                name: RollingWindow(span, self.capacity)
+                for name, span in self.windows.items()
+            }
+        return windows
+    
+    def add(self, asset: str, timestamp: float, price: float):
+        """Record a new price point"""
+        with self._lock:
+            for window in self._windows(asset).values():
+                window.append(timestamp, price)
+    
+    def summary(self, asset: str, window: str = "24h") -> Optional[Dict]:
+        """Statistics for one asset over one window"""
+        with self._lock:
+            windows = self._assets.get(asset)
+            if windows is None or window not in windows:
+                return None
+            return windows[window].summary()
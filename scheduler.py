@@ -1,17 +1,77 @@
+import heapq
+import itertools
+import random
 import threading
 import time
-from datetime import datetime, timedelta
-from typing import Callable, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-class TaskScheduler:
-    """Simple task scheduler for the bot"""
+from listeners import ListenerMixin
+from metrics import TASK_DURATION, TASK_OVERRUNS, TASK_RUNS
+
+class TaskScheduler(ListenerMixin):
+    """Simple task scheduler for the bot
+    
+    Tasks sit in a priority queue ordered by their next fire time. The scheduler
+    thread sleeps on a condition variable until the earliest one is due, so an
+    idle scheduler costs nothing and each dispatch is O(log n) in the task count.
+    
+    Due tasks run on a bounded worker pool. Each task has an overlap policy for
+    when its previous run is still going: "skip" drops the new run, "queue"
+    runs it once the previous one finishes (pending runs coalesce into one),
+    and "allow" starts it alongside, up to max_concurrency runs at once.
+    A run that exceeds its timeout is reported as an overrun once its deadline
+    passes. Python threads cannot be killed, so it keeps counting against the
+    task's limits until it actually returns; a hung task holds at most
+    max_concurrency workers instead of piling up new runs. Run deadlines sit
+    in their own heap, so checking them is O(log n) as well.
+    
+    Given a store, each task's run history is saved there and restored on
+    start, so a restart keeps the schedule: periodic tasks
+    wait out the rest of their interval and report slots already run are not
+    repeated. A dispatch only updates its own task's entry; the history is
+    written at most once per state_save_interval and on stop. Runs that are
+    due at start are spread over startup_jitter seconds instead of all firing
+    at once.
     
-    def __init__(self):
+    A profiler attached with profile_task() wraps the task's next runs;
+    tasks without one run their function directly.
+    """
+    
+    OVERLAP_POLICIES = ("skip", "queue", "allow")
+    listener_label = "scheduler"
+    
+    def __init__(self, max_workers: int = 4, max_wait: float = 60, store: Any = None,
+                 state_key: str = "scheduler_state", startup_jitter: float = 0,
+                 state_save_interval: float = 5):
         self.tasks: List[Dict] = []
         self.running = False
         self.thread = None
+        self.max_workers = max_workers
+        # Upper bound on a single sleep so wall-clock changes are noticed
+        self.max_wait = max_wait
+        self.store = store  # DataStore or SQLiteDataStore holding run history between restarts
+        self.state_key = state_key
+        self.state_save_interval = state_save_interval
+        self.startup_jitter = startup_jitter
+        
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._run_ids = itertools.count()
+        
+        self._queue: List[Tuple[float, int, Dict]] = []
+        self._deadlines: List[Tuple[float, int, Dict]] = []  # (deadline, run id, task) of timed runs
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._listeners: List[Callable[[], None]] = []  # Called when a task starts or finishes, or the scheduler starts or stops
+        
+        self._state: Dict[str, Dict] = {}  # Task name -> entry as written to the store
+        self._state_dirty = False
+        self._state_saved = 0.0
+        self._state_timer: Optional[threading.Timer] = None
     
-    def add_periodic_task(self, func: Callable, interval_seconds: int, name: str = ""):
+    def add_periodic_task(self, func: Callable, interval_seconds: int, name: str = "",
+                          timeout: Optional[float] = None, overlap: str = "skip", max_concurrency: int = 1):
         """Add a periodic task that runs every interval_seconds"""
         task = {
             "func": func,
@@ -20,9 +80,10 @@ class TaskScheduler:
             "last_run": None,
             "name": name or func.__name__
         }
-        self.tasks.append(task)
+        self._add_task(task, timeout, overlap, max_concurrency)
     
-    def add_daily_task(self, func: Callable, hour: int, minute: int = 0, name: str = ""):
+    def add_daily_task(self, func: Callable, hour: int, minute: int = 0, name: str = "",
+                       timeout: Optional[float] = None, overlap: str = "skip", max_concurrency: int = 1):
         """Add a task that runs daily at specified time"""
         task = {
             "func": func,
@@ -32,98 +93,288 @@ class TaskScheduler:
             "last_run_date": None,
             "name": name or func.__name__
         }
-        self.tasks.append(task)
+        self._add_task(task, timeout, overlap, max_concurrency)
     
-    def add_hourly_task(self, func: Callable, hours: List[int], minute: int = 0, name: str = ""):
+    def add_hourly_task(self, func: Callable, hours: List[int], minute: int = 0, name: str = "",
+                        timeout: Optional[float] = None, overlap: str = "skip", max_concurrency: int = 1):
         """Add a task that runs at specific hours each day"""
         task = {
             "func": func,
             "type": "hourly",
-            "hours": hours,
+            "hours": sorted(hours),
             "minute": minute,
             "last_runs": {},
             "name": name or func.__name__
         }
-        self.tasks.append(task)
+        self._add_task(task, timeout, overlap, max_concurrency)
     
-    def _should_run_periodic(self, task: Dict) -> bool:
-        """Check if periodic task should run"""
-        if task["last_run"] is None:
-            return True
+    def profile_task(self, name: str, profiler: Any) -> bool:
+        """Hand the task's next runs to profiler.run() until profiler.done"""
+        with self._condition:
+            for task in self.tasks:
+                if task["name"] == name:
+                    task["profiler"] = profiler
+                    return True
+        return False
+    
+    def _add_task(self, task: Dict, timeout: Optional[float], overlap: str, max_concurrency: int):
+        """Register a task and queue its first run"""
+        if overlap not in self.OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy: {overlap}")
+        
+        task.update({
+            "timeout": timeout,
+            "overlap": overlap,
+            "max_concurrency": max(1, max_concurrency),
+            "active_runs": {},  # run id -> start time
+            "overdue": set(),  # Active run ids already reported as overruns
+            "queued": 0,
+            "skipped": 0,
+            "overruns": 0,
+            "profiler": None  # Set by profile_task() until its runs have started
+        })
         
-        elapsed = time.time() - task["last_run"]
-        return elapsed >= task["interval"]
+        with self._condition:
+            self.tasks.append(task)
+            self._schedule(task, time.time())
+            self._condition.notify()
     
-    def _should_run_daily(self, task: Dict) -> bool:
-        """Check if daily task should run"""
-        now = datetime.now()
-        today = now.date()
+    def _schedule(self, task: Dict, now: float, jitter: float = 0):
+        """Compute a task's next fire time and push it onto the queue"""
+        task["next_run"] = self._next_run_time(task, now)
+        if jitter and task["next_run"] <= now:
+            task["next_run"] = now + random.uniform(0, jitter)
+        heapq.heappush(self._queue, (task["next_run"], next(self._sequence), task))
+    
+    def _next_run_time(self, task: Dict, now: float) -> float:
+        """Get the timestamp of a task's next run at or after now"""
+        if task["type"] == "periodic":
+            if task["last_run"] is None:
+                return now
+            return task["last_run"] + task["interval"]
         
-        # Check if it's the right time
-        if now.hour != task["hour"] or now.minute != task["minute"]:
-            return False
+        # Slots within the current minute still count, like the old minute match
+        current_minute = datetime.fromtimestamp(now).replace(second=0, microsecond=0)
+        for day_offset in range(3):
+            day = current_minute.date() + timedelta(days=day_offset)
+            if task["type"] == "daily":
+                hours = [task["hour"]]
+            else:
+                hours = task["hours"]
+            
+            for hour in hours:
+                slot = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=task["minute"])
+                if slot < current_minute:
+                    continue
+                if task["type"] == "daily" and task["last_run_date"] == day:
+                    continue
+                if task["type"] == "hourly" and f"{day}-{hour}" in task["last_runs"]:
+                    continue
+                return slot.timestamp()
         
-        # Check if already run today
-        return task["last_run_date"] != today
+        return now + 86400
     
-    def _should_run_hourly(self, task: Dict) -> bool:
-        """Check if hourly task should run"""
-        now = datetime.now()
-        current_hour = now.hour
+    def _record_run(self, task: Dict):
+        """Update a task's last run bookkeeping for the slot being run"""
+        # Late runs are credited to the slot they were scheduled for
+        slot = datetime.fromtimestamp(task["next_run"])
         
-        # Check if it's the right time
-        if current_hour not in task["hours"] or now.minute != task["minute"]:
-            return False
+        # Update last run time
+        if task["type"] == "periodic":
+            task["last_run"] = time.time()
+        elif task["type"] == "daily":
+            task["last_run_date"] = slot.date()
+        elif task["type"] == "hourly":
+            today_hour_key = f"{slot.date()}-{slot.hour}"
+            task["last_runs"][today_hour_key] = slot
+            
+            # Clean old entries (keep only last 7 days)
+            cutoff_date = slot.date() - timedelta(days=7)
+            task["last_runs"] = {
+                k: v for k, v in task["last_runs"].items()
+                if v.date() >= cutoff_date
+            }
+    
+    @staticmethod
+    def _task_state(task: Dict) -> Dict[str, Any]:
+        """One task's run history as JSON-friendly values"""
+        entry: Dict[str, Any] = {}
+        if task["type"] == "periodic":
+            entry["last_run"] = task["last_run"]
+        elif task["type"] == "daily":
+            entry["last_run_date"] = task["last_run_date"].isoformat() if task["last_run_date"] else None
+        elif task["type"] == "hourly":
+            entry["last_runs"] = {key: slot.isoformat() for key, slot in task["last_runs"].items()}
+        return entry
+    
+    def export_state(self) -> Dict[str, Dict]:
+        """Run history of every task by name, as JSON-friendly values"""
+        return {task["name"]: self._task_state(task) for task in self.tasks}
+    
+    def restore_state(self, state: Dict[str, Dict]):
+        """Apply run history saved by export_state to the tasks with matching names"""
+        for task in self.tasks:
+            entry = state.get(task["name"])
+            if not entry:
+                continue
+            try:
+                if task["type"] == "periodic" and entry.get("last_run"):
+                    task["last_run"] = float(entry["last_run"])
+                elif task["type"] == "daily" and entry.get("last_run_date"):
+                    task["last_run_date"] = date.fromisoformat(entry["last_run_date"])
+                elif task["type"] == "hourly" and entry.get("last_runs"):
+                    task["last_runs"] = {
+                        key: datetime.fromisoformat(slot) for key, slot in entry["last_runs"].items()
+                    }
+            except (TypeError, ValueError) as e:
+                print(f"❌ Ignoring saved state for task {task['name']}: {e}")
+    
+    def _save_state(self, force: bool = False):
+        """Write changed run history to the store, at most once per state_save_interval unless forced"""
+        if self.store is None:
+            return
+        with self._condition:
+            if not self._state_dirty:
+                return
+            
+            wait = self._state_saved + self.state_save_interval - time.monotonic()
+            if wait > 0 and not force:
+                if self._state_timer is None:
+                    self._state_timer = threading.Timer(wait, self._save_state, kwargs={"force": True})
+                    self._state_timer.daemon = True
+                    self._state_timer.start()
+                return
+            
+            if self._state_timer is not None:
+                self._state_timer.cancel()
+                self._state_timer = None
+            # The store keeps the dict it is given, so it gets a copy
+            state = dict(self._state)
+            self._state_dirty = False
+            self._state_saved = time.monotonic()
+        try:
+            self.store.set(self.state_key, state)
+        except Exception as e:
+            print(f"❌ Error saving scheduler state: {e}")
+    
+    def _dispatch(self, task: Dict):
+        """Hand a due task to the worker pool according to its overlap policy"""
+        # The slot is used up whether the run starts, waits or is skipped
+        self._record_run(task)
+        
+        active = len(task["active_runs"])
+        if active and (task["overlap"] != "allow" or active >= task["max_concurrency"]):
+            if task["overlap"] == "skip":
+                task["skipped"] += 1
+                TASK_RUNS.inc(task["name"], "skipped")
+                print(f"⏭️ Skipping task {task['name']}: previous run still in progress")
+            else:
+                # Pending runs coalesce into a single follow-up run
+                task["queued"] = 1
+            return
         
-        # Check if already run this hour today
-        today_hour_key = f"{now.date()}-{current_hour}"
-        return today_hour_key not in task["last_runs"]
+        self._submit(task)
+    
+    def _submit(self, task: Dict):
+        """Start a run of a task on the worker pool"""
+        run_id = next(self._run_ids)
+        started = time.time()
+        task["active_runs"][run_id] = started
+        if task["timeout"]:
+            heapq.heappush(self._deadlines, (started + task["timeout"], run_id, task))
+        self._executor.submit(self._run_task, task, run_id)
     
-    def _run_task(self, task: Dict):
+    def _run_task(self, task: Dict, run_id: int):
         """Execute a task safely"""
+        outcome = "ok"
+        started = time.perf_counter()
         try:
             print(f"⚡ Running task: {task['name']}")
-            task["func"]()
+            self._notify()
+            profiler = task["profiler"]
+            if profiler is None:
+                task["func"]()
+            else:
+                try:
+                    profiler.run(task["func"])
+                finally:
+                    if profiler.done and task["profiler"] is profiler:
+                        task["profiler"] = None
+        except Exception as e:
+            outcome = "error"
+            print(f"❌ Error running task {task['name']}: {e}")
+        finally:
+            TASK_DURATION.observe(time.perf_counter() - started, task["name"])
+            TASK_RUNS.inc(task["name"], outcome)
+            self._finish_run(task, run_id)
+            self._notify()
+    
+    def _finish_run(self, task: Dict, run_id: int):
+        """Release a finished run and start a queued one if any"""
+        with self._condition:
+            started = task["active_runs"].pop(run_id, None)
+            if run_id in task["overdue"]:
+                task["overdue"].discard(run_id)
+            elif started is not None and task["timeout"] and time.time() - started > task["timeout"]:
+                # Finished past its deadline before the scheduler thread noticed
+                task["overruns"] += 1
+                TASK_OVERRUNS.inc(task["name"])
             
-            # Update last run time
-            now = datetime.now()
-            if task["type"] == "periodic":
-                task["last_run"] = time.time()
-            elif task["type"] == "daily":
-                task["last_run_date"] = now.date()
-            elif task["type"] == "hourly":
-                today_hour_key = f"{now.date()}-{now.hour}"
-                task["last_runs"][today_hour_key] = now
+            if task["queued"] and self.running:
+                task["queued"] = 0
+                self._submit(task)
+            self._condition.notify()
+    
+    def _reap_overruns(self) -> Optional[float]:
+        """Report runs past their timeout and return the earliest pending deadline"""
+        now = time.time()
+        while self._deadlines:
+            deadline, run_id, task = self._deadlines[0]
+            if run_id in task["active_runs"] and deadline > now:
+                return deadline
+            heapq.heappop(self._deadlines)
+            if run_id in task["active_runs"]:
+                # Still counted as active: no new run starts until this one returns
+                task["overdue"].add(run_id)
+                task["overruns"] += 1
+                TASK_OVERRUNS.inc(task["name"])
+                print(f"⏱️ Task {task['name']} exceeded its {task['timeout']}s timeout")
+        return None
+    
+    def _next_due_task(self) -> Optional[Dict]:
+        """Sleep until the earliest task is due and pop it, or return None once stopped"""
+        with self._condition:
+            while self.running:
+                wake_at = self._reap_overruns()
                 
-                # Clean old entries (keep only last 7 days)
-                cutoff_date = now.date() - timedelta(days=7)
-                task["last_runs"] = {
-                    k: v for k, v in task["last_runs"].items()
-                    if v.date() >= cutoff_date
-                }
+                if self._queue:
+                    next_run, _, task = self._queue[0]
+                    if next_run <= time.time():
+                        heapq.heappop(self._queue)
+                        return task
+                    wake_at = next_run if wake_at is None else min(wake_at, next_run)
                 
-        except Exception as e:
-            print(f"❌ Error running task {task['name']}: {e}")
+                delay = self.max_wait if wake_at is None else wake_at - time.time()
+                self._condition.wait(max(0, min(delay, self.max_wait)))
+        return None
     
     def _scheduler_loop(self):
         """Main scheduler loop"""
         while self.running:
             try:
-                for task in self.tasks:
-                    should_run = False
-                    
-                    if task["type"] == "periodic":
-                        should_run = self._should_run_periodic(task)
-                    elif task["type"] == "daily":
-                        should_run = self._should_run_daily(task)
-                    elif task["type"] == "hourly":
-                        should_run = self._should_run_hourly(task)
-                    
-                    if should_run:
-                        self._run_task(task)
-                
-                time.sleep(1)  # Check every second
+                task = self._next_due_task()
+                if task is None:
+                    break
                 
+                with self._condition:
+                    self._dispatch(task)
+                    
+                    # Missed slots collapse into the run that was just dispatched
+                    self._schedule(task, time.time())
+                    self._state[task["name"]] = self._task_state(task)
+                    self._state_dirty = True
+                self._save_state()
+            
             except Exception as e:
                 print(f"❌ Scheduler error: {e}")
                 time.sleep(10)
@@ -133,17 +384,50 @@ class TaskScheduler:
         if self.running:
             return
         
-        self.running = True
+        saved = None
+        if self.store is not None:
+            try:
+                saved = self.store.get(self.state_key)
+            except Exception as e:
+                print(f"❌ Error loading scheduler state: {e}")
+        
+        with self._condition:
+            if saved:
+                self.restore_state(saved)
+            self._state = self.export_state()
+            self._state_dirty = False
+            
+            # Slots that passed while stopped are not caught up
+            now = time.time()
+            self._queue = []
+            self._deadlines = []
+            for task in self.tasks:
+                self._schedule(task, now, self.startup_jitter)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="scheduler-task"
+            )
+            self.running = True
+        
         self.thread = threading.Thread(target=self._scheduler_loop, daemon=True)
         self.thread.start()
         print("⏰ Task scheduler started")
+        self._notify()
     
     def stop(self):
         """Stop the scheduler"""
-        self.running = False
+        with self._condition:
+            self.running = False
+            self._condition.notify_all()
         if self.thread:
             self.thread.join(timeout=5)
+        if self._executor:
+            # Runs already started finish in the background
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._save_state(force=True)
         print("⏰ Task scheduler stopped")
+        self._notify()
     
     def get_status(self) -> Dict:
         """Get scheduler status"""
@@ -151,21 +435,38 @@ class TaskScheduler:
         status = {
             "running": self.running,
             "total_tasks": len(self.tasks),
+            "running_tasks": [],
+            "queued_tasks": [],
             "tasks": []
         }
         
-        for task in self.tasks:
+        for task in list(self.tasks):
             task_info = {
                 "name": task["name"],
-                "type": task["type"]
+                "type": task["type"],
+                "running": len(task["active_runs"]),
+                "queued": task["queued"],
+                "overlap": task["overlap"],
+                "skipped": task["skipped"],
+                "overruns": task["overruns"],
+                "overdue": len(task["overdue"])
             }
+            if task["profiler"] is not None:
+                task_info["profiling"] = task["profiler"].get_status()
+            if task["timeout"]:
+                task_info["timeout"] = f"{task['timeout']}s"
+            if task_info["running"]:
+                status["running_tasks"].append(task["name"])
+            if task_info["queued"]:
+                status["queued_tasks"].append(task["name"])
+            
+            if task.get("next_run"):
+                task_info["next_run"] = datetime.fromtimestamp(task["next_run"]).strftime("%Y-%m-%d %H:%M:%S")
             
             if task["type"] == "periodic":
                 if task["last_run"]:
                     last_run = datetime.fromtimestamp(task["last_run"])
-                    next_run = last_run + timedelta(seconds=task["interval"])
                     task_info["last_run"] = last_run.strftime("%Y-%m-%d %H:%M:%S")
-                    task_info["next_run"] = next_run.strftime("%Y-%m-%d %H:%M:%S")
                     task_info["interval"] = f"{task['interval']}s"
             elif task["type"] == "daily":
                 task_info["time"] = f"{task['hour']:02d}:{task['minute']:02d}"
@@ -0,0 +1,289 @@
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from data_store import default_data
+from listeners import ListenerMixin
+from timeseries import PriceSeries, TimeSeriesStore
+
+# Keys migrated from bot_data.json into the counters table; any other key moves there on its first increment
+COUNTER_KEYS = ("total_alerts_sent", "total_news_sent")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value NUMERIC NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS price_history (
+    asset TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (asset, ts)
+) WITHOUT ROWID;
+"""
+
+class SQLiteDataStore(ListenerMixin):
+    """DataStore backed by a SQLite database in WAL mode
+    
+    Same get/set/update/increment interface as DataStore, but every change is
+    a small indexed write instead of a rewrite of the whole file, so readers
+    in any thread or process see committed values while the bot writes.
+    Counters live in their own table and are incremented in SQL, so
+    concurrent increments are never lost. Each thread gets its own connection.
+    On first use the database is seeded from the JSON store, if one exists.
+    """
+    
+    listener_label = "data store"
+    
+    def __init__(self, filename: str = "bot_data.db", json_filename: Optional[str] = "bot_data.json",
+                 busy_timeout: float = 5.0):
+        self.filename = filename
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []  # Called with changed keys and their new values
+        
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._migrate(json_filename)
+    
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; writes open their own transactions in _write
+            conn = sqlite3.connect(self.filename, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pending = None
+        return conn
+    
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in a single write transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _migrate(self, json_filename: Optional[str]):
+        """Seed an empty database from the JSON store, or with the default state"""
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM kv UNION ALL SELECT 1 FROM counters LIMIT 1").fetchone():
+                return
+            
+            data = None
+            if json_filename and os.path.exists(json_filename):
+                try:
+                    with open(json_filename, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    print(f"📦 Importing {json_filename} into {self.filename}")
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"Error loading data file: {e}")
+            if data is None:
+                data = default_data()
+            
+            for key, value in data.items():
+                if key in COUNTER_KEYS and isinstance(value, (int, float)):
+                    conn.execute("INSERT INTO counters (name, value) VALUES (?, ?)", (key, value))
+                else:
+                    self._put(conn, key, value)
+    
+    def _put(self, conn: sqlite3.Connection, key: str, value: Any):
+        """Write one key, keeping counters in the counters table"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if conn.execute("UPDATE counters SET value = ? WHERE name = ?", (value, key)).rowcount:
+                return
+        conn.execute("DELETE FROM counters WHERE name = ?", (key,))
+        conn.execute(
+            "INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+    
+    def flush(self):
+        """Nothing to do: every change is committed as it is made"""
+    
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteDataStore"]:
+        """Group this thread's changes so they land in a single commit
+        
+        Changes are held back until the outermost block exits, so no database
+        lock is held while the block runs; this thread reads its own pending
+        values meanwhile. Increments are still applied immediately.
+        """
+        self._conn()
+        outermost = self._local.pending is None
+        if outermost:
+            self._local.pending = {}
+        try:
+            yield self
+        finally:
+            if outermost:
+                pending, self._local.pending = self._local.pending, None
+                if pending:
+                    self._store(pending)
+    
+    def _store(self, updates: Dict[str, Any]):
+        """Write keys now, or hold them for the thread's open transaction"""
+        self._conn()
+        if self._local.pending is not None:
+            self._local.pending.update(updates)
+            return
+        with self._write() as conn:
+            for key, value in updates.items():
+                self._put(conn, key, value)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get value by key"""
+        conn = self._conn()
+        pending = self._local.pending
+        if pending and key in pending:
+            return pending[key]
+        
+        return self._read(conn, key, default)
+    
+    def _read(self, conn: sqlite3.Connection, key: str, default: Any = None) -> Any:
+        """Committed value of one key"""
+        row = conn.execute(
+            "SELECT 1, value FROM counters WHERE name = ? UNION ALL SELECT 0, value FROM kv WHERE key = ? LIMIT 1",
+            (key, key)
+        ).fetchone()
+        if row is None:
+            return default
+        is_counter, value = row
+        return value if is_counter else json.loads(value)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of all values, read in a single statement"""
+        conn = self._conn()
+        rows = conn.execute("SELECT 1, name, value FROM counters UNION ALL SELECT 0, key, value FROM kv").fetchall()
+        data = {key: value if is_counter else json.loads(value) for is_counter, key, value in rows}
+        data.update(self._local.pending or {})
+        return data
+    
+    def set(self, key: str, value: Any):
+        """Set value by key and save"""
+        self._store({key: value})
+        self._notify({key: value})
+    
+    def update(self, updates: Dict[str, Any]):
+        """Update multiple values at once"""
+        self._store(dict(updates))
+        self._notify(dict(updates))
+    
+    def increment(self, key: str, amount: int = 1) -> Any:
+        """Increment a numeric value atomically and return the new value"""
+        with self._write() as conn:
+            # A plain numeric key becomes a counter, keeping its current value
+            conn.execute(
+                "INSERT OR IGNORE INTO counters (name, value) "
+                "SELECT key, json_extract(value, '$') FROM kv "
+                "WHERE key = ? AND json_type(value) IN ('integer', 'real')",
+                (key,)
+            )
+            conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            value = conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value RETURNING value",
+                (key, amount)
+            ).fetchone()[0]
+        self._notify({key: value})
+        return value
+    
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        """Set key to value only if it currently equals expected (a missing key equals None)"""
+        self._conn()
+        pending = self._local.pending
+        with self._write() as conn:
+            current = pending[key] if pending and key in pending else self._read(conn, key)
+            if current != expected:
+                return False
+            self._put(conn, key, value)
+            if pending:
+                pending.pop(key, None)
+        self._notify({key: value})
+        return True
+
+class SQLiteTimeSeriesStore(TimeSeriesStore):
+    """TimeSeriesStore kept in a SQLiteDataStore's indexed price_history table
+    
+    Points are still served from the in-memory series; the table replaces the
+    append-only files, and old rows are pruned with a range delete instead of
+    a file rewrite. An asset with no rows yet is imported from its .bin file
+    in directory, if there is one.
+    """
+    
+    def __init__(self, db: SQLiteDataStore, directory: str = "price_history", capacity: int = 10080):
+        super().__init__(directory, capacity)
+        self.db = db
+        self._inserted: Dict[str, int] = {}
+    
+    def _load(self, asset: str) -> PriceSeries:
+        series = self._series.get(asset)
+        if series is not None:
+            return series
+        
+        rows = self.db._conn().execute(
+            "SELECT ts, price FROM price_history WHERE asset = ? ORDER BY ts DESC LIMIT ?",
+            (asset, self.capacity)
+        ).fetchall()
+        if not rows:
+            return self._import(asset)
+        
+        series = PriceSeries(self.capacity)
+        rows.reverse()
+        series.timestamps = array('d', (ts for ts, _ in rows))
+        series.prices = array('d', (price for _, price in rows))
+        self._series[asset] = series
+        self._inserted[asset] = 0
+        return series
+    
+    def _import(self, asset: str) -> PriceSeries:
+        """Load an asset's legacy history file and copy it into the table"""
+        series = super()._load(asset)
+        self._inserted[asset] = 0
+        if len(series):
+            with self.db._write() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO price_history (asset, ts, price) VALUES (?, ?, ?)",
+                    ((asset, ts, price) for ts, price in zip(series.timestamps, series.prices))
+                )
+            print(f"📦 Imported {len(series)} {asset} price points into {self.db.filename}")
+        return series
+    
+    def append(self, asset: str, timestamp: float, price: float):
+        """Record a price point in memory and in the price_history table"""
+        with self._lock:
+            series = self._load(asset)
+            if not series.append(timestamp, price):
+                return
+            
+            try:
+                with self.db._write() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO price_history (asset, ts, price) VALUES (?, ?, ?)",
+                        (asset, timestamp, price)
+                    )
+                    self._inserted[asset] += 1
+                    
+                    # Prune rows the in-memory series has already dropped
+                    if self._inserted[asset] > self.capacity:
+                        conn.execute(
+                            "DELETE FROM price_history WHERE asset = ? AND ts < ?",
+                            (asset, series.first_timestamp)
+                        )
+                        self._inserted[asset] = 0
+            except sqlite3.Error as e:
+                print(f"Error saving price history for {asset}: {e}")
@@ -3,7 +3,11 @@
 class EthBotDashboard {
     constructor() {
         this.updateInterval = null;
+        this.eventSource = null;
         this.priceChart = null;
+        this.latencyChart = null;
+        this.metrics = null;
+        this.metricsInterval = null;
         this.isUpdating = false;
         
         this.init();
@@ -18,12 +22,16 @@ class EthBotDashboard {
         // Set up event listeners
         this.setupEventListeners();
         
-        // Start periodic updates
-        this.startPeriodicUpdates();
+        // Subscribe to live updates, polling only if the stream is unavailable
+        this.startLiveUpdates();
         
         // Initial data load
         this.updateDashboard();
         
+        // Metrics are not streamed; refresh them every 30 seconds
+        this.updateMetrics();
+        this.metricsInterval = setInterval(() => this.updateMetrics(), 30000);
+        
         console.log('ETH Bot Dashboard initialized');
     }
     
@@ -33,6 +41,7 @@ class EthBotDashboard {
         document.getElementById('stopBtn').addEventListener('click', () => this.stopBot());
         document.getElementById('testBtn').addEventListener('click', () => this.testTelegram());
         document.getElementById('manualCheckBtn').addEventListener('click', () => this.manualCheck());
+        document.getElementById('metricsSeries').addEventListener('change', () => this.renderLatencyChart());
         
         // Auto-refresh when page becomes visible
         document.addEventListener('visibilitychange', () => {
@@ -42,7 +51,61 @@ class EthBotDashboard {
         });
     }
     
+    startLiveUpdates() {
+        if (typeof EventSource === 'undefined') {
+            this.startPeriodicUpdates();
+            return;
+        }
+        
+        this.eventSource = new EventSource('/api/stream');
+        
+        this.eventSource.addEventListener('open', () => {
+            // Resync once, then rely on pushed updates
+            this.stopPeriodicUpdates();
+            this.updateDashboard();
+        });
+        
+        // The browser reconnects by itself; poll in the meantime
+        this.eventSource.addEventListener('error', () => this.startPeriodicUpdates());
+        
+        this.eventSource.addEventListener('prices', (event) => {
+            const data = JSON.parse(event.data);
+            this.updatePriceDisplay(data.current_price);
+            if (data.change_24h && data.change_24h.ethereum) {
+                this.renderPriceHistory(data.change_24h.ethereum);
+            }
+            this.markUpdated();
+        });
+        
+        this.eventSource.addEventListener('counters', (event) => {
+            const data = JSON.parse(event.data);
+            this.updateCounters(data.total_alerts_sent, data.total_news_sent);
+            this.markUpdated();
+        });
+        
+        this.eventSource.addEventListener('last_error', (event) => {
+            const errorElement = document.getElementById('lastError');
+            const data = JSON.parse(event.data);
+            errorElement.textContent = data.last_error || 'None';
+            errorElement.className = data.last_error ? 'text-danger' : 'text-success';
+            this.markUpdated();
+        });
+        
+        this.eventSource.addEventListener('scheduler', (event) => {
+            const data = JSON.parse(event.data);
+            this.updateBotStatus(data.bot_running);
+            this.updateScheduledTasks(data.scheduler);
+            this.markUpdated();
+        });
+    }
+    
+    markUpdated() {
+        document.getElementById('lastUpdate').textContent = new Date().toLocaleString();
+    }
+    
     startPeriodicUpdates() {
+        if (this.updateInterval) return;
+        
         // Update every 10 seconds
         this.updateInterval = setInterval(() => {
             if (!this.isUpdating) {
@@ -71,7 +134,7 @@ class EthBotDashboard {
             await this.updatePriceHistory();
             
             // Update last update time
-            document.getElementById('lastUpdate').textContent = new Date().toLocaleString();
+            this.markUpdated();
             
         } catch (error) {
             console.error('Error updating dashboard:', error);
@@ -213,24 +276,28 @@ class EthBotDashboard {
                 return;
             }
             
-            // Update 24h change display
-            const changeElement = document.getElementById('priceChange');
-            if (changeElement && data.change_percent !== undefined) {
-                const isPositive = data.change_percent >= 0;
-                const sign = isPositive ? '+' : '';
-                
-                changeElement.textContent = `${sign}${data.change_percent.toFixed(2)}%`;
-                changeElement.className = `price-change ${isPositive ? 'positive' : 'negative'}`;
-            }
-            
-            // Update simple chart if available
-            this.updatePriceChart(data);
+            this.renderPriceHistory(data);
             
         } catch (error) {
             console.error('Error fetching price history:', error);
         }
     }
     
+    renderPriceHistory(data) {
+        // Update 24h change display
+        const changeElement = document.getElementById('priceChange');
+        if (changeElement && data.change_percent !== undefined) {
+            const isPositive = data.change_percent >= 0;
+            const sign = isPositive ? '+' : '';
+            
+            changeElement.textContent = `${sign}${data.change_percent.toFixed(2)}%`;
+            changeElement.className = `price-change ${isPositive ? 'positive' : 'negative'}`;
+        }
+        
+        // Update simple chart if available
+        this.updatePriceChart(data);
+    }
+    
     updatePriceChart(data) {
         const ctx = document.getElementById('priceChart');
         if (!ctx) return;
@@ -304,6 +371,166 @@ class EthBotDashboard {
         });
     }
     
+    async updateMetrics() {
+        try {
+            const response = await fetch('/api/metrics?format=json');
+            this.metrics = await response.json();
+            this.updateMetricsSeries();
+            this.renderLatencyChart();
+            this.renderMetricsSummary();
+        } catch (error) {
+            console.error('Error fetching metrics:', error);
+        }
+    }
+    
+    latencySeries() {
+        // One entry per task and per upstream, keyed for the series picker
+        const series = {};
+        const sources = [
+            ['ethbot_task_duration_seconds', 'task', 'Task'],
+            ['ethbot_http_request_duration_seconds', 'upstream', 'Upstream']
+        ];
+        sources.forEach(([name, label, prefix]) => {
+            const metric = this.metrics[name];
+            if (!metric) return;
+            metric.series.forEach(s => {
+                series[`${name}|${s.labels[label]}`] = {
+                    title: `${prefix}: ${s.labels[label]}`,
+                    unit: prefix === 'Task' ? 'runs' : 'requests',
+                    data: s
+                };
+            });
+        });
+        return series;
+    }
+    
+    updateMetricsSeries() {
+        const select = document.getElementById('metricsSeries');
+        const selected = select.value;
+        const series = this.latencySeries();
+        
+        select.innerHTML = Object.entries(series)
+            .map(([key, s]) => `<option value="${key}">${s.title}</option>`)
+            .join('');
+        if (selected in series) {
+            select.value = selected;
+        }
+    }
+    
+    static quantile(series, q) {
+        // Upper bound of the bucket holding the q-th observation
+        if (!series.count) return null;
+        const target = q * series.count;
+        let seen = 0;
+        for (let i = 0; i < series.buckets.length; i++) {
+            seen += series.counts[i];
+            if (seen >= target) return series.buckets[i];
+        }
+        return Infinity;
+    }
+    
+    static formatSeconds(value) {
+        if (value === null) return '-';
+        if (value === Infinity) return '∞';
+        return value < 1 ? `${Math.round(value * 1000)}ms` : `${value}s`;
+    }
+    
+    renderLatencyChart() {
+        const ctx = document.getElementById('latencyChart');
+        const key = document.getElementById('metricsSeries').value;
+        if (!ctx || !this.metrics || !key) return;
+        
+        const series = this.latencySeries()[key].data;
+        const bounds = series.buckets.map(b => `≤${EthBotDashboard.formatSeconds(b)}`);
+        bounds.push(`>${EthBotDashboard.formatSeconds(series.buckets[series.buckets.length - 1])}`);
+        
+        if (this.latencyChart) {
+            this.latencyChart.destroy();
+        }
+        
+        this.latencyChart = new Chart(ctx, {
+            type: 'bar',
+            data: {
+                labels: bounds,
+                datasets: [{
+                    label: 'Count',
+                    data: series.counts,
+                    backgroundColor: '#627eea'
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                animation: false,
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: {
+                            precision: 0
+                        }
+                    },
+                    x: {
+                        grid: {
+                            display: false
+                        }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                }
+            }
+        });
+    }
+    
+    renderMetricsSummary() {
+        const container = document.getElementById('metricsSummary');
+        const total = (name, label) => {
+            const totals = {};
+            ((this.metrics[name] || {}).series || []).forEach(s => {
+                const key = s.labels[label];
+                totals[key] = (totals[key] || 0) + s.value;
+            });
+            return totals;
+        };
+        const format = (totals) => Object.entries(totals).map(([k, v]) => `${k} ${v}`).join(', ') || 'None';
+        
+        let html = '';
+        Object.values(this.latencySeries()).forEach(s => {
+            const p50 = EthBotDashboard.quantile(s.data, 0.5);
+            const p95 = EthBotDashboard.quantile(s.data, 0.95);
+            html += `
+                <div class="status-item">
+                    <label>${s.title}</label>
+                    <span>p50 ${EthBotDashboard.formatSeconds(p50)} · p95 ${EthBotDashboard.formatSeconds(p95)} · ${s.data.count} ${s.unit}</span>
+                </div>
+            `;
+        });
+        
+        const rows = [
+            ['Task failures', total('ethbot_task_runs_total', 'outcome').error || 0],
+            ['Task overruns', Object.values(total('ethbot_task_overruns_total', 'task')).reduce((a, b) => a + b, 0)],
+            ['HTTP statuses', format(total('ethbot_http_responses_total', 'status'))],
+            ['HTTP retries', format(total('ethbot_http_retries_total', 'reason'))],
+            ['Telegram sends', format(total('ethbot_telegram_sends_total', 'outcome'))]
+        ];
+        const flush = ((this.metrics.ethbot_store_flush_seconds || {}).series || [])[0];
+        if (flush) {
+            rows.push(['Store flush', `p95 ${EthBotDashboard.formatSeconds(EthBotDashboard.quantile(flush, 0.95))} · ${flush.count} flushes`]);
+        }
+        rows.forEach(([label, value]) => {
+            html += `
+                <div class="status-item">
+                    <label>${label}</label>
+                    <span>${value}</span>
+                </div>
+            `;
+        });
+        
+        container.innerHTML = html;
+    }
+    
     // Bot control methods
     async startBot() {
         await this.apiCall('/api/start', 'POST', 'Starting bot...');
@@ -382,6 +609,15 @@ class EthBotDashboard {
     // Cleanup method
     destroy() {
         this.stopPeriodicUpdates();
+        if (this.metricsInterval) {
+            clearInterval(this.metricsInterval);
+        }
+        if (this.latencyChart) {
+            this.latencyChart.destroy();
+        }
+        if (this.eventSource) {
+            this.eventSource.close();
+        }
         if (this.priceChart) {
             this.priceChart.destroy();
         }
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from bisect import bisect_right, insort
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from data_store import atomic_write_json
+
+class Subscriber:
+    """A chat that receives notifications, with its own assets, threshold and report hours"""
+    
+    __slots__ = ("chat_id", "assets", "threshold", "report_hours", "news")
+    
+    def __init__(self, chat_id: str, assets: List[str], threshold: float,
+                 report_hours: List[int], news: bool = True):
+        self.chat_id = str(chat_id)
+        self.assets = list(assets)
+        self.threshold = float(threshold)
+        self.report_hours = sorted(report_hours)
+        self.news = bool(news)
+    
+    def to_row(self) -> list:
+        """Compact list form used on disk"""
+        return [self.chat_id, self.assets, self.threshold, self.report_hours, int(self.news)]
+    
+    @classmethod
+    def from_row(cls, row: list) -> "Subscriber":
+        return cls(*row)
+    
+    def to_dict(self) -> Dict:
+        return {
+            "chat_id": self.chat_id,
+            "assets": self.assets,
+            "threshold": self.threshold,
+            "report_hours": self.report_hours,
+            "news": self.news
+        }
+
+class SubscriberRegistry:
+    """File-backed registry of subscribers with indexes for fan-out
+    
+    Subscribers are stored as one compact row each and indexed on load, so
+    finding the recipients of an alert is a bisect over that asset's sorted
+    thresholds rather than a scan of every subscriber.
+    """
+    
+    def __init__(self, filename: str = "subscribers.json"):
+        self.filename = filename
+        self._subscribers: Dict[str, Subscriber] = {}
+        self._thresholds: Dict[str, List[Tuple[float, str]]] = {}  # asset -> sorted (threshold, chat_id)
+        self._by_hour: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        """Load subscribers from disk"""
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading subscribers file: {e}")
+            return
+        
+        for row in rows:
+            subscriber = Subscriber.from_row(row)
+            self._subscribers[subscriber.chat_id] = subscriber
+        self._rebuild_indexes()
+    
+    def _save(self):
+        """Save subscribers to disk"""
+        try:
+            atomic_write_json(
+                self.filename,
+                [subscriber.to_row() for subscriber in self._subscribers.values()],
+                indent=None
+            )
+        except (IOError, OSError) as e:
+            print(f"Error saving subscribers file: {e}")
+    
+    def _rebuild_indexes(self):
+        thresholds: Dict[str, List[Tuple[float, str]]] = {}
+        by_hour: Dict[int, Set[str]] = {}
+        for subscriber in self._subscribers.values():
+            for asset in subscriber.assets:
+                thresholds.setdefault(asset, []).append((subscriber.threshold, subscriber.chat_id))
+            for hour in subscriber.report_hours:
+                by_hour.setdefault(hour, set()).add(subscriber.chat_id)
+        for entries in thresholds.values():
+            entries.sort()
+        self._thresholds = thresholds
+        self._by_hour = by_hour
+    
+    def _index(self, subscriber: Subscriber):
+        for asset in subscriber.assets:
+            insort(self._thresholds.setdefault(asset, []), (subscriber.threshold, subscriber.chat_id))
+        for hour in subscriber.report_hours:
+            self._by_hour.setdefault(hour, set()).add(subscriber.chat_id)
+    
+    def _unindex(self, subscriber: Subscriber):
+        for asset in subscriber.assets:
+            entries = self._thresholds.get(asset, [])
+            key = (subscriber.threshold, subscriber.chat_id)
+            i = bisect_right(entries, key) - 1
+            if i >= 0 and entries[i] == key:
+                del entries[i]
+        for hour in subscriber.report_hours:
+            self._by_hour.get(hour, set()).discard(subscriber.chat_id)
+    
+    def add(self, chat_id: str, assets: List[str], threshold: float, report_hours: List[int],
+            news: bool = True) -> Subscriber:
+        """Add a subscriber, replacing any existing one for the same chat"""
+        subscriber = Subscriber(chat_id, assets, threshold, report_hours, news)
+        with self._lock:
+            existing = self._subscribers.get(subscriber.chat_id)
+            if existing:
+                self._unindex(existing)
+            self._subscribers[subscriber.chat_id] = subscriber
+            self._index(subscriber)
+            self._save()
+        return subscriber
+    
+    def remove(self, chat_id: str) -> bool:
+        """Remove a subscriber"""
+        with self._lock:
+            subscriber = self._subscribers.pop(str(chat_id), None)
+            if subscriber is None:
+                return False
+            self._unindex(subscriber)
+            self._save()
+            return True
+    
+    def ensure_default(self, chat_id: str, assets: List[str], threshold: float, report_hours: List[int]):
+        """Register the configured chat when nobody has subscribed yet"""
+        if chat_id and not self._subscribers:
+            self.add(chat_id, assets, threshold, report_hours)
+    
+    def get(self, chat_id: str) -> Optional[Subscriber]:
+        return self._subscribers.get(str(chat_id))
+    
+    def __len__(self) -> int:
+        return len(self._subscribers)
+    
+    def __iter__(self) -> Iterator[Subscriber]:
+        return iter(list(self._subscribers.values()))
+    
+    def for_alert(self, asset: str, change_percent: float) -> List[str]:
+        """Chats watching asset whose threshold is met by a move of change_percent"""
+        with self._lock:
+            entries = self._thresholds.get(asset, [])
+            end = bisect_right(entries, (abs(change_percent), chr(0x10FFFF)))
+            return [chat_id for _, chat_id in entries[:end]]
+    
+    def for_report_hour(self, hour: int, asset: Optional[str] = None) -> List[str]:
+        """Chats that want a report at hour, optionally only those watching asset"""
+        with self._lock:
+            chat_ids = self._by_hour.get(hour, set())
+            return [
+                chat_id for chat_id in chat_ids
+                if asset is None or asset in self._subscribers[chat_id].assets
+            ]
+    
+    def report_hours(self) -> List[int]:
+        """Every hour at which at least one subscriber wants a report"""
+        with self._lock:
+            return sorted(hour for hour, chat_ids in self._by_hour.items() if chat_ids)
+    
+    def chat_ids(self, news_only: bool = False) -> List[str]:
+        """All subscribed chats, or only those that want news"""
+        with self._lock:
+            return [
+                subscriber.chat_id for subscriber in self._subscribers.values()
+                if subscriber.news or not news_only
+            ]
@@ -0,0 +1,379 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from journal import Journal
+from metrics import TELEGRAM_DELIVERY, TELEGRAM_SENDS
+
+# Lower values are delivered first
+PRIORITY_ALERT = 0
+PRIORITY_REPORT = 1
+PRIORITY_NEWS = 2
+
+class RetryLater(Exception):
+    """Raised by a sender when a message should be retried, optionally after retry_after seconds"""
+    
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket rate limiter"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+    
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class TelegramQueue:
+    """Outbound Telegram message queue with a rate-limited background dispatcher
+    
+    Producers enqueue and return immediately. The dispatcher sends the most
+    urgent message whose chat is within Telegram's limits: a global token
+    bucket and one bucket per chat (groups, with negative ids, get the lower
+    group rate). A retry_after from Telegram pauses all sending for that long.
+    Up to send_workers messages to different chats are sent concurrently.
+    
+    Each chat keeps its own heap of messages. Chats allowed to send sit in a
+    ready heap keyed by their most urgent message, the rest in a waiting heap
+    keyed by when they may send next, so picking a message costs O(log n)
+    however many chats are rate limited. A message being retried holds back
+    its chat until the retry is due.
+    
+    Every message is appended to a journal (filename + ".log") before
+    enqueue returns and stays in the outbox, including while it is being
+    sent, until it is delivered or given up on. The snapshot is rewritten
+    once the journal outgrows the outbox.
+    """
+    
+    def __init__(self, sender: Callable[[str, str], bool], filename: str = "telegram_outbox.json",
+                 on_delivered: Optional[Callable[[Dict], None]] = None,
+                 global_rate: float = 30, chat_rate: float = 1, group_rate: float = 20 / 60,
+                 max_attempts: int = 5, send_workers: int = 4, compact_min: int = 1000):
+        self.sender = sender
+        self.filename = filename
+        self.on_delivered = on_delivered
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_attempts = max_attempts
+        self.send_workers = max(1, send_workers)
+        
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        self.paused_until = 0.0
+        
+        self.running = False
+        self.thread = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.sent = 0
+        self.failed = 0
+        
+        self._chats: Dict[str, List[Tuple[int, int, Dict]]] = {}  # chat_id -> heap of (priority, id, message)
+        self._ready: List[Tuple[int, int, str]] = []  # (priority, id, chat_id) of each sendable chat's head
+        self._waiting: List[Tuple[float, str]] = []  # (ready_at, chat_id) of rate limited chats
+        self._scheduled: Dict[str, Tuple[list, tuple]] = {}  # chat_id -> (heap, entry); other entries are stale
+        self._held_until: Dict[str, float] = {}  # Chats waiting for a retry
+        self._queued = 0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        
+        self._pending: Dict[int, Dict] = {}  # Queued and in-flight messages by id, as saved to disk
+        self._ids = itertools.count(1)
+        self._journal = Journal(filename, "Telegram outbox", compact_min)
+        self._journal_lock = threading.Lock()  # Orders journal writes; taken before _condition, never inside it
+        
+        self._load()
+    
+    def _load(self):
+        """Restore undelivered messages from the snapshot and journal"""
+        messages, changes = self._journal.load()
+        # Outboxes written before messages had ids are numbered in file order
+        ids = itertools.count(max((m.get("id", 0) for m in messages), default=0) + 1)
+        for message in messages:
+            message.setdefault("id", next(ids))
+            self._pending[message["id"]] = message
+        for op, value in changes:
+            if op == "add":
+                self._pending[value["id"]] = value
+            else:
+                self._pending.pop(value, None)
+        
+        now = time.monotonic()
+        for message_id in sorted(self._pending):
+            self._push(self._pending[message_id], now)
+        self._ids = itertools.count(max(self._pending, default=0) + 1)
+        if self._pending:
+            print(f"📬 Restored {len(self._pending)} undelivered Telegram messages")
+    
+    def _log(self, added: List[Dict] = (), acked: List[int] = ()):
+        """Journal changes; call with _journal_lock held"""
+        changes = [("add", message) for message in added]
+        changes.extend(("ack", message_id) for message_id in acked)
+        self._journal.append(changes, len(self._pending), self._pending_messages)
+    
+    def _pending_messages(self) -> List[Dict]:
+        return [self._pending[message_id] for message_id in sorted(self._pending)]
+    
+    def _push(self, message: Dict, now: float, reschedule: bool = False):
+        """Add a message to its chat's heap; call with the condition held"""
+        chat_id = message["chat_id"]
+        chat = self._chats.setdefault(chat_id, [])
+        entry = (message["priority"], message["id"], message)
+        heapq.heappush(chat, entry)
+        self._queued += 1
+        
+        scheduled = self._scheduled.get(chat_id)
+        # A ready chat is re-keyed when the new message jumps ahead of its head
+        if reschedule or scheduled is None or (scheduled[0] is self._ready and chat[0] is entry):
+            self._schedule(chat_id, now)
+    
+    def _schedule(self, chat_id: str, now: float):
+        """Put a chat with queued messages in the ready heap, or the waiting heap until it may send"""
+        ready_at = max(self._held_until.get(chat_id, 0.0), now + self._chat_bucket(chat_id).delay(now))
+        if ready_at <= now:
+            priority, message_id, _ = self._chats[chat_id][0]
+            heap, entry = self._ready, (priority, message_id, chat_id)
+        else:
+            heap, entry = self._waiting, (ready_at, chat_id)
+        heapq.heappush(heap, entry)
+        self._scheduled[chat_id] = (heap, entry)
+    
+    def _is_scheduled(self, entry: tuple) -> bool:
+        """Whether a heap entry is its chat's current one rather than a stale leftover"""
+        scheduled = self._scheduled.get(entry[-1])
+        return scheduled is not None and scheduled[1] is entry
+    
+    def _new_message(self, chat_id: str, text: str, priority: int, counter: Optional[str],
+                     created: float) -> Dict:
+        message = {
+            "id": next(self._ids),
+            "chat_id": chat_id,
+            "text": text,
+            "priority": priority,
+            "counter": counter,
+            "attempts": 0,
+            "created": created
+        }
+        self._pending[message["id"]] = message
+        return message
+    
+    def enqueue(self, chat_id: str, text: str, priority: int = PRIORITY_REPORT,
+                counter: Optional[str] = None):
+        """Queue a message for delivery; counter names a stat to increment once delivered"""
+        self.enqueue_many([chat_id], text, priority, counter)
+    
+    def enqueue_many(self, chat_ids: List[str], text: str, priority: int = PRIORITY_REPORT,
+                     counter: Optional[str] = None):
+        """Queue the same message for many chats in one batch"""
+        created = time.time()
+        with self._journal_lock:
+            messages = [self._new_message(chat_id, text, priority, counter, created) for chat_id in chat_ids]
+            # Journaled before the dispatcher can see them, so an ack is never written ahead of its add
+            self._log(added=messages)
+        with self._condition:
+            now = time.monotonic()
+            for message in messages:
+                self._push(message, now)
+            self._condition.notify()
+    
+    def __len__(self) -> int:
+        with self._condition:
+            return self._queued
+    
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if str(chat_id).startswith("-") else self.chat_rate
+            bucket = TokenBucket(rate, 1)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+    
+    def _next_ready(self) -> Tuple[Optional[Dict], float]:
+        """Pop the most urgent sendable message, or return how long to wait for one"""
+        now = time.monotonic()
+        wait = self.paused_until - now
+        if wait > 0:
+            return None, wait
+        
+        wait = self.global_bucket.delay(now)
+        if wait > 0:
+            return None, wait
+        
+        while self._waiting and self._waiting[0][0] <= now:
+            entry = heapq.heappop(self._waiting)
+            if self._is_scheduled(entry):
+                self._schedule(entry[1], now)
+        
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            if not self._is_scheduled(entry):
+                continue
+            chat_id = entry[2]
+            chat = self._chats[chat_id]
+            message = heapq.heappop(chat)[2]
+            self._queued -= 1
+            self.global_bucket.consume(now)
+            self._chat_bucket(chat_id).consume(now)
+            if chat:
+                self._schedule(chat_id, now)
+            else:
+                del self._chats[chat_id]
+                del self._scheduled[chat_id]
+                self._held_until.pop(chat_id, None)
+            return message, 0.0
+        
+        while self._waiting and not self._is_scheduled(self._waiting[0]):
+            heapq.heappop(self._waiting)
+        return None, self._waiting[0][0] - now if self._waiting else float("inf")
+    
+    def _dispatch_loop(self):
+        """Background loop handing ready messages to the send workers"""
+        while True:
+            with self._condition:
+                message = None
+                while self.running:
+                    wait = None
+                    if self._in_flight < self.send_workers:
+                        message, wait = self._next_ready()
+                        if message is not None:
+                            self._in_flight += 1
+                            break
+                    if wait is None or wait == float("inf"):
+                        # Every worker is busy or nothing is queued; a finished send or enqueue notifies us
+                        self._condition.wait()
+                    else:
+                        self._condition.wait(wait)
+                if message is None:
+                    return
+            
+            self._executor.submit(self._deliver, message)
+    
+    def _deliver(self, message: Dict):
+        """Send one message and requeue it if Telegram asks us to retry"""
+        message["attempts"] += 1
+        try:
+            delivered = self.sender(message["chat_id"], message["text"])
+            requeue_after = None
+        except RetryLater as e:
+            delivered = False
+            requeue_after = e.retry_after if e.retry_after is not None else min(60, 2 ** message["attempts"])
+            if e.retry_after is not None:
+                # A retry_after applies to the whole bot, not just this chat
+                self.paused_until = time.monotonic() + e.retry_after
+                print(f"⏳ Telegram rate limit, pausing sends for {e.retry_after:.0f}s")
+        except Exception as e:
+            print(f"Telegram error: {e}")
+            delivered = False
+            requeue_after = min(60, 2 ** message["attempts"])
+        
+        retry = requeue_after is not None and message["attempts"] < self.max_attempts
+        with self._journal_lock:
+            if retry:
+                self._log(added=[message])  # Keeps the attempt count across restarts
+            else:
+                del self._pending[message["id"]]
+                self._log(acked=[message["id"]])
+        
+        with self._condition:
+            self._in_flight -= 1
+            if retry:
+                now = time.monotonic()
+                chat_id = message["chat_id"]
+                self._held_until[chat_id] = max(self._held_until.get(chat_id, 0.0), now + requeue_after)
+                self._push(message, now, reschedule=True)
+                outcome = "retry"
+            elif delivered:
+                self.sent += 1
+                outcome = "delivered"
+            else:
+                self.failed += 1
+                outcome = "failed"
+            self._prune_buckets()
+            self._condition.notify_all()
+        
+        TELEGRAM_SENDS.inc(outcome)
+        if delivered and "created" in message:
+            TELEGRAM_DELIVERY.observe(time.time() - message["created"])
+        if delivered and self.on_delivered:
+            self.on_delivered(message)
+    
+    def _prune_buckets(self):
+        """Forget idle chats so the bucket map does not grow forever"""
+        if len(self.chat_buckets) < 1000:
+            return
+        now = time.monotonic()
+        self.chat_buckets = {
+            chat_id: bucket for chat_id, bucket in self.chat_buckets.items()
+            if not bucket.is_full(now)
+        }
+    
+    def start(self):
+        """Start the background dispatcher"""
+        if self.running:
+            return
+        self.running = True
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.send_workers,
+            thread_name_prefix="telegram-send"
+        )
+        self.thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop the dispatcher and fold the journal into the snapshot"""
+        with self._condition:
+            self.running = False
+            self._condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=15)
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._journal_lock:
+            if self._journal.lines:
+                self._journal.compact(self._pending_messages())
+    
+    def drain(self, timeout: float = 60) -> bool:
+        """Wait until every queued message is delivered or given up on"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._queued or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return not self._queued and not self._in_flight
+    
+    def get_status(self) -> Dict:
+        """Get queue status"""
+        with self._condition:
+            return {
+                "pending": self._queued,
+                "in_flight": self._in_flight,
+                "sent": self.sent,
+                "failed": self.failed,
+                "paused_for": max(0.0, round(self.paused_until - time.monotonic(), 1))
+            }
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+import requests
+
+import http_client
+
+def canned_response(method, url, params=None, **kwargs) -> requests.Response:
+    """Offline answers for the CoinGecko, CryptoPanic and Telegram calls the bot makes"""
+    response = requests.Response()
+    response.status_code = 200
+    if "simple/price" in url:
+        body = {crypto_id: {"usd": 100.0} for crypto_id in params["ids"].split(",")}
+    elif "market_chart" in url:
+        body = {"prices": [[t * 1000, 100.0] for t in range(params["from"] + 300, params["to"] + 1, 300)]}
+    elif "/posts" in url:
+        body = {"results": []}
+    elif "getMe" in url:
+        body = {"ok": True, "result": {"id": 1, "username": "test_bot"}}
+    else:
+        body = {"ok": True, "result": {"message_id": 1}}
+    response._content = json.dumps(body).encode()
+    return response
+
+@pytest.fixture
+def bot_env(tmp_path, monkeypatch):
+    """Run in an empty directory with dummy credentials and no network access"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TELEGRAM_TOKEN", "1:test")
+    monkeypatch.setenv("TELEGRAM_USER_ID", "1")
+    monkeypatch.setenv("CRYPTOPANIC_API_KEY", "test")
+    monkeypatch.setenv("STORE_BACKEND", "json")
+    monkeypatch.setenv("ASYNC_ENGINE", "")
+    monkeypatch.setenv("PRICE_STREAM_URL", "")
+    monkeypatch.setattr(http_client.HttpClient, "request",
+                        lambda self, method, url, **kwargs: canned_response(method, url, **kwargs))
+    return tmp_path
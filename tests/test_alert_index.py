@@ -0,0 +1,95 @@
+import json
+
+from alert_index import AlertIndex, PriceAlert, PriceAlertBook
+
+def make_book(tmp_path, **kwargs) -> PriceAlertBook:
+    return PriceAlertBook(str(tmp_path / "price_alerts.json"), **kwargs)
+
+def test_index_fires_only_reached_levels():
+    index = AlertIndex()
+    index.arm(PriceAlert(1, "ethereum", "1", "cross", 3100, 3000, direction="up"))
+    index.arm(PriceAlert(2, "ethereum", "1", "cross", 2900, 3000, direction="down"))
+    index.arm(PriceAlert(3, "ethereum", "1", "cross", 3200, 3000, direction="up"))
+    
+    assert index.evaluate(3050) == []
+    assert index.evaluate(3150) == [(1, 3100)]
+    assert index.evaluate(2850) == [(2, 2900)]
+    assert len(index) == 1
+
+def test_cross_alert_fires_once_and_is_removed(tmp_path):
+    book = make_book(tmp_path)
+    alert = book.add_cross("ethereum", "42", 3100, current_price=3000)
+    
+    assert book.evaluate("ethereum", 3050) == []
+    fired = book.evaluate("ethereum", 3120)
+    assert [(a.alert_id, level) for a, level in fired] == [(alert.alert_id, 3100)]
+    assert len(book) == 0
+    assert book.evaluate("ethereum", 3500) == []
+
+def test_repeating_percent_alert_rearms_at_new_reference(tmp_path):
+    book = make_book(tmp_path)
+    alert = book.add_percent("ethereum", "42", 5, reference=3000)
+    
+    assert len(book.evaluate("ethereum", 3160)) == 1
+    assert alert.reference == 3160
+    # Back at the old reference is still within 5% of the new one
+    assert book.evaluate("ethereum", 3010) == []
+    assert len(book.evaluate("ethereum", 2990)) == 1
+    assert len(book) == 1
+
+def test_alerts_only_fire_for_their_asset(tmp_path):
+    book = make_book(tmp_path)
+    book.add_cross("chainlink", "42", 20, current_price=15)
+    assert book.evaluate("ethereum", 25) == []
+    assert len(book.evaluate("chainlink", 25)) == 1
+
+def test_removed_alert_does_not_fire(tmp_path):
+    book = make_book(tmp_path)
+    alert = book.add_cross("ethereum", "42", 3100, current_price=3000)
+    assert book.remove(alert.alert_id)
+    assert not book.remove(alert.alert_id)
+    assert book.evaluate("ethereum", 3200) == []
+
+def test_changes_survive_a_restart(tmp_path):
+    book = make_book(tmp_path)
+    kept = book.add_cross("ethereum", "1", 3100, current_price=3000)
+    removed = book.add_cross("ethereum", "2", 2900, current_price=3000)
+    fired = book.add_cross("ethereum", "3", 3050, current_price=3000)
+    repeating = book.add_percent("ethereum", "4", 1, reference=3000)
+    book.remove(removed.alert_id)
+    book.evaluate("ethereum", 3060)
+    
+    reloaded = make_book(tmp_path)
+    alerts = {alert.alert_id: alert for alert in reloaded.list()}
+    assert set(alerts) == {kept.alert_id, repeating.alert_id}
+    assert alerts[repeating.alert_id].reference == 3060
+    assert reloaded.add_cross("ethereum", "5", 4000, 3000).alert_id > repeating.alert_id
+
+def test_changes_are_journaled_without_rewriting_the_snapshot(tmp_path):
+    book = make_book(tmp_path)
+    for i in range(5):
+        book.add_cross("ethereum", "1", 3100 + i, current_price=3000)
+    book.evaluate("ethereum", 3102)
+    
+    assert not (tmp_path / "price_alerts.json").exists()
+    lines = (tmp_path / "price_alerts.json.log").read_text().splitlines()
+    assert [json.loads(line)[0] for line in lines] == ["put"] * 5 + ["del"] * 3
+
+def test_journal_is_compacted_into_the_snapshot(tmp_path):
+    book = make_book(tmp_path, compact_min=10)
+    kept = [book.add_cross("ethereum", "1", 3100 + i, current_price=3000) for i in range(3)]
+    for i in range(20):
+        book.remove(book.add_cross("ethereum", "2", 2900 - i, current_price=3000).alert_id)
+    
+    snapshot = json.loads((tmp_path / "price_alerts.json").read_text())
+    journal = (tmp_path / "price_alerts.json.log").read_text().splitlines()
+    assert len(snapshot) <= 4
+    assert len(journal) <= 10
+    assert [alert.alert_id for alert in make_book(tmp_path).list()] == [alert.alert_id for alert in kept]
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    book = make_book(tmp_path)
+    book.add_cross("ethereum", "1", 3100, current_price=3000)
+    with open(tmp_path / "price_alerts.json.log", "a") as f:
+        f.write('["put", [9, "ether')
+    assert [alert.alert_id for alert in make_book(tmp_path).list()] == [1]
@@ -0,0 +1,21 @@
+import time
+
+import pytest
+
+from bot import EthereumBot
+from config import Config
+
+@pytest.fixture
+def bot(bot_env):
+    bot = EthereumBot(Config())
+    yield bot
+    bot.outbox.stop()
+    bot.store.flush()  # Before the working directory is restored; the atexit flush would write elsewhere
+
+def test_catch_up_leaves_the_24h_history_whole(bot):
+    bot.store.set("backfill_cursor", {crypto_id: time.time() - 6 * 3600 for crypto_id in bot.config.cryptocurrencies})
+    bot.catch_up(budget=5)
+    assert bot.market_chart.store.latest("ethereum") == []
+    
+    points = bot.market_chart.fetch("ethereum", days=1)
+    assert points[0][0] - (time.time() - 86400) < 600
@@ -0,0 +1,82 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from bot_service import BotService
+from config import Config
+
+@pytest.fixture
+def service(bot_env):
+    service = BotService(Config())
+    yield service
+    service.stop_monitoring()
+    if service.bot:
+        service.bot.outbox.stop()
+
+def test_unchanged_status_keeps_its_etag(service):
+    etag, body = service.status_snapshot()
+    assert body is not None
+    assert service.status_snapshot(etag) == (etag, None)
+
+def test_any_store_write_changes_the_etag(service):
+    etag, _ = service.status_snapshot()
+    store = service.get_bot().store
+    
+    store.set("last_price", 1234.5)
+    new_etag, body = service.status_snapshot(etag)
+    assert new_etag != etag
+    assert json.loads(body)["last_price"] == 1234.5
+    
+    store.set("bot_start_time", "2026-01-01T00:00:00")
+    newer_etag, body = service.status_snapshot(new_etag)
+    assert newer_etag != new_etag
+    assert json.loads(body)["bot_start_time"] == "2026-01-01T00:00:00"
+
+def test_cached_status_has_no_frozen_clock(service):
+    _, body = service.status_snapshot()
+    assert "current_time" not in json.loads(body)
+
+def test_report_hours_added_after_start_are_scheduled(service, monkeypatch):
+    service.start_monitoring()
+    hour = datetime.now().hour
+    service.add_subscriber({"chat_id": "7", "report_hours": [hour]})
+    service.add_subscriber({"chat_id": "8", "report_hours": [(hour + 1) % 24]})
+    
+    task = next(task for task in service.scheduler.tasks if task["name"] == "Daily Reports")
+    assert hour in task["hours"]
+    
+    bot = service.get_bot()
+    sent = []
+    monkeypatch.setattr(bot, "broadcast", lambda message, chat_ids, *args, **kwargs: sent.append(chat_ids))
+    bot.send_daily_report()
+    assert len(sent) == 1 and "7" in sent[0] and "8" not in sent[0]
+
+def test_async_engine_keeps_the_sync_schedule(bot_env, monkeypatch):
+    monkeypatch.setenv("ASYNC_ENGINE", "1")
+    service = BotService(Config())
+    service.start_monitoring()
+    try:
+        tasks = {task["name"]: task for task in service.scheduler.tasks}
+        assert tasks["Price Monitoring"]["func"] == service.bot.run_price_check
+        assert tasks["Daily Reports"]["hours"] == list(range(24))
+        assert tasks["News Updates"]["interval"] == 300
+        
+        service.bot.run_price_check()
+        assert service.bot.store.get("last_ethereum_price") == 100.0
+    finally:
+        service.stop_monitoring()
+        service.bot.outbox.stop()
+
+def test_scheduler_events_are_coalesced(service, monkeypatch):
+    published = []
+    monkeypatch.setattr(service.event_bus, "publish", lambda topic, data: published.append(topic))
+    service.config.scheduler_event_interval = 0.2
+    for _ in range(100):
+        service._scheduler_changed()
+    assert published == ["scheduler"]
+    
+    time.sleep(0.4)
+    # One trailing update carries the state after the burst
+    assert published == ["scheduler", "scheduler"]
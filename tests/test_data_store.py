@@ -0,0 +1,75 @@
+import json
+
+import data_store
+from data_store import DataStore
+
+def read_file(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def fail_writes(monkeypatch, times: int):
+    """Make the next times atomic writes raise OSError"""
+    real_write = data_store.atomic_write_json
+    failures = [times]
+    
+    def flaky_write(filename, data, indent=2):
+        if failures[0]:
+            failures[0] -= 1
+            raise OSError("disk full")
+        real_write(filename, data, indent)
+    
+    monkeypatch.setattr(data_store, "atomic_write_json", flaky_write)
+
+def test_write_through_saves_every_change(tmp_path):
+    path = tmp_path / "bot_data.json"
+    store = DataStore(str(path))
+    store.set("last_price", 3000.0)
+    assert read_file(path)["last_price"] == 3000.0
+
+def test_failed_flush_is_retried_on_next_flush(tmp_path, monkeypatch):
+    path = tmp_path / "bot_data.json"
+    store = DataStore(str(path), flush_interval=3600)
+    store.set("total_news_sent", 0)
+    store.flush()
+    fail_writes(monkeypatch, 1)
+    
+    store.set("last_price", 3000.0)
+    store.flush()
+    assert read_file(path).get("last_price") is None
+    
+    store.flush()
+    assert read_file(path)["last_price"] == 3000.0
+
+def test_failed_write_through_is_retried_on_next_change(tmp_path, monkeypatch):
+    path = tmp_path / "bot_data.json"
+    store = DataStore(str(path))
+    fail_writes(monkeypatch, 1)
+    
+    store.set("last_price", 3000.0)
+    store.set("total_news_sent", 1)
+    saved = read_file(path)
+    assert saved["last_price"] == 3000.0
+    assert saved["total_news_sent"] == 1
+
+def test_write_behind_batches_changes_until_flush(tmp_path):
+    path = tmp_path / "bot_data.json"
+    store = DataStore(str(path), flush_interval=3600)
+    store.set("last_price", 0.0)
+    store.flush()  # Starts the interval
+    store.set("last_price", 1.0)
+    store.set("last_price", 2.0)
+    assert read_file(path)["last_price"] == 0.0
+    store.flush()
+    assert read_file(path)["last_price"] == 2.0
+
+def test_transaction_writes_once(tmp_path, monkeypatch):
+    store = DataStore(str(tmp_path / "bot_data.json"))
+    writes = []
+    real_write = data_store.atomic_write_json
+    monkeypatch.setattr(data_store, "atomic_write_json",
+                        lambda filename, data, indent=2: writes.append(real_write(filename, data, indent)))
+    with store.transaction():
+        store.set("last_price", 1.0)
+        store.set("last_24h_price", 2.0)
+        store.increment("total_alerts_sent")
+    assert len(writes) == 1
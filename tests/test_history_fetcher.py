@@ -0,0 +1,61 @@
+import json
+import time
+
+import requests
+
+from history_fetcher import MarketChartFetcher
+
+class FakeHttp:
+    """Serves one point per minute for the requested range, recording requests"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def get(self, url, params=None, deadline=None):
+        self.requests.append((params, deadline))
+        response = requests.Response()
+        response.status_code = 200
+        start = params["from"] - params["from"] % 60 + 60
+        points = [[t * 1000, 100.0 + t % 7] for t in range(start, params["to"] + 1, 60)]
+        response._content = json.dumps({"prices": points}).encode()
+        return response
+
+def make_fetcher(tmp_path, http) -> MarketChartFetcher:
+    return MarketChartFetcher(http, "https://example.com/coins/{id}/market_chart/range",
+                              str(tmp_path / "market_chart"), refresh_interval=300)
+
+def test_only_the_missing_tail_is_downloaded(tmp_path):
+    http = FakeHttp()
+    fetcher = make_fetcher(tmp_path, http)
+    points = fetcher.fetch("ethereum", days=1 / 24)
+    assert 58 <= len(points) <= 61
+    
+    # Within refresh_interval the cache is used as is
+    fetcher.fetch("ethereum", days=1 / 24)
+    assert len(http.requests) == 1
+
+def test_max_age_zero_bypasses_the_refresh_shortcut(tmp_path):
+    http = FakeHttp()
+    fetcher = make_fetcher(tmp_path, http)
+    fetcher.fetch("ethereum", days=1 / 24)
+    deadline = time.monotonic() + 5
+    fetcher.fetch("ethereum", days=1 / 24, max_age=0, deadline=deadline)
+    
+    assert len(http.requests) == 2
+    params, passed_deadline = http.requests[1]
+    assert passed_deadline == deadline
+    # Asks only for the span after the newest cached point
+    assert params["to"] - params["from"] < 120
+
+def test_downloaded_span_stays_out_of_the_cache(tmp_path):
+    http = FakeHttp()
+    fetcher = make_fetcher(tmp_path, http)
+    now = time.time()
+    points = fetcher.download("ethereum", now - 6 * 3600, now)
+    assert points and all(timestamp > now - 6 * 3600 for timestamp, _ in points)
+    
+    # A later day-long fetch must not take the 6h span for the whole day
+    day = fetcher.fetch("ethereum", days=1)
+    assert len(http.requests) == 2
+    assert http.requests[1][0]["from"] <= now - 86400 + 1
+    assert day[0][0] - (now - 86400) < 120
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+import requests
+
+from http_client import HttpClient
+
+class FakeSession:
+    """Answers with the given statuses in turn, recording each attempt's timeout"""
+    
+    def __init__(self, statuses, delay: float = 0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.timeouts = []
+    
+    def request(self, method, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if status == "timeout":
+            raise requests.ConnectTimeout("connect timed out")
+        response = requests.Response()
+        response.status_code = status
+        response._content = b"{}"
+        return response
+
+def make_client(session: FakeSession, **settings) -> HttpClient:
+    client = HttpClient(**settings)
+    client.session = session
+    return client
+
+def test_retries_transient_statuses():
+    session = FakeSession([503, 502, 200])
+    client = make_client(session, backoff_factor=0.01)
+    assert client.get("https://api.coingecko.com/api/v3/simple/price").status_code == 200
+    assert len(session.timeouts) == 3
+
+def test_gives_up_after_retries():
+    session = FakeSession([503])
+    client = make_client(session, retries=2, backoff_factor=0.01)
+    assert client.get("https://api.coingecko.com/api/v3/simple/price").status_code == 503
+    assert len(session.timeouts) == 3
+
+def test_post_is_not_retried_on_server_error():
+    session = FakeSession([500, 200])
+    client = make_client(session, backoff_factor=0.01)
+    assert client.post("https://api.telegram.org/bot1:x/sendMessage").status_code == 500
+    assert len(session.timeouts) == 1
+
+def test_deadline_cuts_attempt_timeout():
+    session = FakeSession([200])
+    client = make_client(session, timeout=10)
+    client.get("https://api.coingecko.com/api/v3/simple/price", deadline=time.monotonic() + 2)
+    assert session.timeouts[0] <= 2
+
+def test_deadline_stops_retries():
+    session = FakeSession([503], delay=0.05)
+    client = make_client(session, retries=10, backoff_factor=0.1, max_backoff=0.1)
+    start = time.monotonic()
+    response = client.get("https://api.coingecko.com/api/v3/simple/price", deadline=start + 0.3)
+    assert response.status_code == 503
+    assert time.monotonic() - start < 0.4
+    assert len(session.timeouts) < 10
+
+def test_deadline_reraises_connection_errors():
+    session = FakeSession(["timeout"])
+    client = make_client(session, retries=10, backoff_factor=1, max_backoff=1)
+    start = time.monotonic()
+    with pytest.raises(requests.ConnectTimeout):
+        client.get("https://api.coingecko.com/api/v3/simple/price", deadline=start + 0.2)
+    assert time.monotonic() - start < 0.3
+
+def test_passed_deadline_makes_no_request():
+    session = FakeSession([200])
+    client = make_client(session)
+    with pytest.raises(requests.Timeout):
+        client.get("https://api.coingecko.com/api/v3/simple/price", deadline=time.monotonic() - 1)
+    assert session.timeouts == []
@@ -0,0 +1,36 @@
+import json
+
+from journal import Journal
+
+def test_changes_replay_after_the_snapshot(tmp_path):
+    path = str(tmp_path / "items.json")
+    journal = Journal(path, "items")
+    journal.compact([1, 2])
+    journal.append([("add", 3), ("del", 1)], live=2, snapshot=lambda: [])
+    
+    reopened = Journal(path, "items")
+    assert reopened.load() == ([1, 2], [("add", 3), ("del", 1)])
+    assert reopened.lines == 2
+
+def test_torn_line_is_skipped(tmp_path):
+    path = tmp_path / "items.json"
+    (tmp_path / "items.json.log").write_text(json.dumps(["add", 1]) + "\n" + '["add", ')
+    assert Journal(str(path), "items").load() == ([], [("add", 1)])
+
+def test_compacts_once_the_log_outgrows_the_items(tmp_path):
+    path = tmp_path / "items.json"
+    journal = Journal(str(path), "items", compact_min=3)
+    items = []
+    for i in range(5):
+        items.append(i)
+        journal.append([("add", i)], live=len(items), snapshot=lambda: list(items))
+        items.remove(i)
+        journal.append([("del", i)], live=len(items), snapshot=lambda: list(items))
+    
+    assert journal.lines <= 3
+    snapshot, changes = Journal(str(path), "items").load()
+    assert len(changes) == journal.lines
+    live = set(snapshot)
+    for op, value in changes:
+        live.add(value) if op == "add" else live.discard(value)
+    assert live == set(items)
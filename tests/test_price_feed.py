@@ -0,0 +1,26 @@
+import threading
+
+from metrics import HTTP_RESPONSES
+from price_feed import NDJSONFeed, make_standin_server
+
+def responses_from(host: str) -> float:
+    return sum(item["value"] for item in HTTP_RESPONSES.snapshot() if item["labels"]["upstream"] == host)
+
+def test_ndjson_feed_streams_through_shared_client():
+    server = make_standin_server(port=0, prices={"ethereum": 3000.0}, interval=0.05)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    feed = NDJSONFeed(f"http://127.0.0.1:{server.server_address[1]}/", read_timeout=5)
+    before = responses_from("127.0.0.1")
+    try:
+        feed.connect()
+        ticks = feed.ticks()
+        crypto_id, price, _ = next(ticks)
+        next(ticks)
+    finally:
+        feed.close()
+        server.shutdown()
+        server.server_close()
+    
+    assert crypto_id == "ethereum"
+    assert price > 0
+    assert responses_from("127.0.0.1") == before + 1
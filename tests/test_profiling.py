@@ -0,0 +1,59 @@
+import threading
+import time
+
+from profiling import RunProfiler, list_profiles
+
+def test_profiles_the_requested_number_of_runs(tmp_path):
+    profiler = RunProfiler("Price Monitoring", 2, str(tmp_path))
+    calls = []
+    for _ in range(3):
+        profiler.run(lambda: calls.append(1))
+    
+    assert len(calls) == 3
+    assert profiler.done
+    assert len(profiler.files) == 2
+    assert {p["file"] for p in list_profiles(str(tmp_path))} == set(profiler.files)
+    for name in profiler.files:
+        assert (tmp_path / name).exists()
+        assert (tmp_path / name.replace(".prof", ".txt")).exists()
+
+def test_concurrent_runs_still_execute_while_one_is_profiled(tmp_path):
+    first = RunProfiler("slow", 1, str(tmp_path))
+    second = RunProfiler("other", 1, str(tmp_path))
+    started = threading.Event()
+    ran = []
+    
+    def slow():
+        started.set()
+        time.sleep(0.2)
+        ran.append("slow")
+    
+    thread = threading.Thread(target=first.run, args=(slow,))
+    thread.start()
+    started.wait(1)
+    # Runs unprofiled instead of failing, and keeps its slot for a later run
+    second.run(lambda: ran.append("other"))
+    thread.join()
+    
+    assert sorted(ran) == ["other", "slow"]
+    assert len(first.files) == 1
+    assert not second.done and second.files == []
+    
+    second.run(lambda: ran.append("other"))
+    assert second.done and len(second.files) == 1
+
+def test_exception_in_task_still_saves_profile(tmp_path):
+    profiler = RunProfiler("failing", 1, str(tmp_path))
+    
+    def fail():
+        raise RuntimeError("boom")
+    
+    try:
+        profiler.run(fail)
+    except RuntimeError:
+        pass
+    assert len(profiler.files) == 1
+    # The profile lock was released
+    profiler2 = RunProfiler("next", 1, str(tmp_path))
+    profiler2.run(lambda: None)
+    assert len(profiler2.files) == 1
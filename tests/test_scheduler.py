@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import TaskScheduler
+
+def run_for(scheduler: TaskScheduler, seconds: float):
+    scheduler.start()
+    try:
+        time.sleep(seconds)
+    finally:
+        scheduler.stop()
+
+class SlowTask:
+    """Sleeps for duration and records how many runs overlapped"""
+    
+    def __init__(self, duration: float):
+        self.duration = duration
+        self.runs = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self):
+        with self._lock:
+            self.runs += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.duration)
+        with self._lock:
+            self.active -= 1
+
+def task_status(scheduler: TaskScheduler, name: str) -> dict:
+    return next(task for task in scheduler.get_status()["tasks"] if task["name"] == name)
+
+def test_periodic_task_runs_repeatedly():
+    scheduler = TaskScheduler()
+    task = SlowTask(0)
+    scheduler.add_periodic_task(task, 0.1, "fast")
+    run_for(scheduler, 0.55)
+    assert 4 <= task.runs <= 7
+
+def test_skip_policy_drops_runs_while_one_is_active():
+    scheduler = TaskScheduler()
+    task = SlowTask(0.5)
+    scheduler.add_periodic_task(task, 0.1, "slow", overlap="skip")
+    run_for(scheduler, 0.8)
+    assert task.peak == 1
+    assert task_status(scheduler, "slow")["skipped"] >= 3
+
+def test_queue_policy_coalesces_into_one_follow_up_run():
+    scheduler = TaskScheduler()
+    task = SlowTask(0.3)
+    scheduler.add_periodic_task(task, 0.05, "queued", overlap="queue")
+    run_for(scheduler, 0.45)
+    time.sleep(0.4)
+    # The first run plus one follow-up that absorbed every slot missed meanwhile
+    assert task.peak == 1
+    assert task.runs == 2
+
+def test_allow_policy_respects_max_concurrency():
+    scheduler = TaskScheduler(max_workers=8)
+    task = SlowTask(0.5)
+    scheduler.add_periodic_task(task, 0.05, "parallel", overlap="allow", max_concurrency=3)
+    run_for(scheduler, 0.6)
+    assert task.peak == 3
+
+def test_overrunning_run_is_reported_but_blocks_new_runs():
+    scheduler = TaskScheduler()
+    task = SlowTask(1.0)
+    scheduler.add_periodic_task(task, 0.1, "hung", timeout=0.3)
+    scheduler.start()
+    try:
+        time.sleep(0.6)
+        status = task_status(scheduler, "hung")
+        assert status["overruns"] == 1
+        assert status["overdue"] == 1
+        assert status["running"] == 1
+        assert task.runs == 1
+        
+        time.sleep(0.6)
+        # The hung run returned, so the next one could start
+        assert task.runs == 2
+        assert task.peak == 1
+    finally:
+        scheduler.stop()
+
+def test_hung_task_does_not_starve_other_tasks():
+    scheduler = TaskScheduler(max_workers=2)
+    hung = SlowTask(1.0)
+    fast = SlowTask(0)
+    scheduler.add_periodic_task(hung, 0.05, "hung", timeout=0.1, overlap="queue")
+    scheduler.add_periodic_task(fast, 0.1, "fast")
+    run_for(scheduler, 0.6)
+    assert hung.runs == 1
+    assert fast.runs >= 4
+
+def test_unknown_overlap_policy_is_rejected():
+    with pytest.raises(ValueError):
+        TaskScheduler().add_periodic_task(lambda: None, 1, "bad", overlap="sometimes")
+
+class Store(dict):
+    """Minimal store that counts writes"""
+    
+    writes = 0
+    
+    def set(self, key, value):
+        self.writes += 1
+        self[key] = value
+
+def test_restart_keeps_periodic_schedule():
+    store = Store()
+    first = TaskScheduler(store=store)
+    task = SlowTask(0)
+    first.add_periodic_task(task, 60, "hourly-ish")
+    run_for(first, 0.2)
+    assert task.runs == 1
+    
+    second = TaskScheduler(store=store)
+    second.add_periodic_task(task, 60, "hourly-ish")
+    run_for(second, 0.2)
+    # The saved last run keeps the restarted scheduler from firing again
+    assert task.runs == 1
+
+def test_run_history_writes_are_throttled():
+    store = Store()
+    scheduler = TaskScheduler(store=store, state_save_interval=0.3)
+    task = SlowTask(0)
+    scheduler.add_periodic_task(task, 0.02, "fast")
+    scheduler.start()
+    try:
+        time.sleep(0.5)
+        assert task.runs >= 10
+        assert 1 <= store.writes <= 3
+    finally:
+        scheduler.stop()
+    
+    # Stopping writes the history of the last runs
+    assert store["scheduler_state"]["fast"]["last_run"] == scheduler.tasks[0]["last_run"]
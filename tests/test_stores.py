@@ -0,0 +1,113 @@
+import json
+import threading
+
+import pytest
+
+from data_store import DataStore
+from sqlite_store import SQLiteDataStore
+
+def open_json(tmp_path):
+    return DataStore(str(tmp_path / "bot_data.json"))
+
+def open_sqlite(tmp_path):
+    return SQLiteDataStore(str(tmp_path / "bot_data.db"), json_filename=str(tmp_path / "bot_data.json"))
+
+@pytest.fixture(params=[open_json, open_sqlite], ids=["json", "sqlite"])
+def reopen(request, tmp_path):
+    """Opens the backend under test on the same files each time it is called"""
+    return lambda: request.param(tmp_path)
+
+def test_fresh_store_has_default_state(reopen):
+    store = reopen()
+    assert store.get("total_alerts_sent") == 0
+    assert store.get("last_price") is None
+    assert store.get("missing", "fallback") == "fallback"
+
+def test_values_round_trip_and_survive_reopening(reopen):
+    store = reopen()
+    store.set("last_price", 3012.5)
+    store.update({"last_error": "boom", "telegram_bot_identity": {"id": 1, "username": "bot"}})
+    
+    for current in (store, reopen()):
+        assert current.get("last_price") == 3012.5
+        assert current.get("last_error") == "boom"
+        assert current.get("telegram_bot_identity") == {"id": 1, "username": "bot"}
+
+def test_increment(reopen):
+    store = reopen()
+    assert store.increment("total_alerts_sent") == 1
+    assert store.increment("total_alerts_sent", 2) == 3
+    assert store.increment("new_counter") == 1
+    store.set("plain_number", 10)
+    assert store.increment("plain_number", 5) == 15
+    assert reopen().get("total_alerts_sent") == 3
+
+def test_concurrent_increments_are_not_lost(reopen):
+    store = reopen()
+    
+    def bump():
+        for _ in range(50):
+            store.increment("total_news_sent")
+    
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.get("total_news_sent") == 200
+
+def test_compare_and_set(reopen):
+    store = reopen()
+    assert store.compare_and_set("lock_owner", None, "a")
+    assert not store.compare_and_set("lock_owner", None, "b")
+    assert store.compare_and_set("lock_owner", "a", "b")
+    assert reopen().get("lock_owner") == "b"
+
+def test_transaction_reads_its_own_writes_and_commits_on_exit(reopen):
+    store = reopen()
+    with store.transaction():
+        store.set("last_price", 1.0)
+        store.update({"last_24h_price": 2.0})
+        assert store.get("last_price") == 1.0
+    
+    reopened = reopen()
+    assert reopened.get("last_price") == 1.0
+    assert reopened.get("last_24h_price") == 2.0
+
+def test_snapshot_holds_every_value(reopen):
+    store = reopen()
+    store.set("last_price", 5.0)
+    store.increment("total_alerts_sent")
+    snapshot = dict(store.snapshot())
+    
+    assert snapshot["last_price"] == 5.0
+    assert snapshot["total_alerts_sent"] == 1
+    assert "bot_start_time" in snapshot
+    json.dumps(snapshot)
+
+def test_listeners_see_each_change(reopen):
+    store = reopen()
+    seen = []
+    store.add_listener(seen.append)
+    store.set("last_price", 1.0)
+    store.increment("total_alerts_sent")
+    store.compare_and_set("last_error", "", "oops")
+    assert seen == [{"last_price": 1.0}, {"total_alerts_sent": 1}, {"last_error": "oops"}]
+
+def test_sqlite_store_imports_existing_json_state(tmp_path):
+    json_store = open_json(tmp_path)
+    json_store.set("last_price", 2500.0)
+    json_store.increment("total_news_sent", 7)
+    
+    store = open_sqlite(tmp_path)
+    assert store.get("last_price") == 2500.0
+    assert store.get("total_news_sent") == 7
+    assert store.increment("total_news_sent") == 8
+
+def test_failing_listener_does_not_block_the_others(reopen):
+    store = reopen()
+    seen = []
+    store.add_listener(lambda changes: 1 / 0)
+    store.add_listener(seen.append)
+    store.set("last_price", 1.0)
+    assert seen == [{"last_price": 1.0}]
@@ -0,0 +1,150 @@
+import threading
+import time
+
+from telegram_queue import PRIORITY_ALERT, PRIORITY_NEWS, RetryLater, TelegramQueue
+
+class RecordingSender:
+    """Records (chat_id, text, time) per send; can block or fail on demand"""
+    
+    def __init__(self):
+        self.sent = []
+        self.fail_next = []
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+    
+    def __call__(self, chat_id: str, text: str) -> bool:
+        self.release.wait()
+        with self._lock:
+            if self.fail_next:
+                raise self.fail_next.pop(0)
+            self.sent.append((chat_id, text, time.monotonic()))
+        return True
+
+def make_queue(tmp_path, sender, **kwargs) -> TelegramQueue:
+    return TelegramQueue(sender, filename=str(tmp_path / "telegram_outbox.json"), **kwargs)
+
+def test_chat_rate_spaces_messages_to_one_chat(tmp_path):
+    sender = RecordingSender()
+    queue = make_queue(tmp_path, sender, chat_rate=10)
+    for i in range(4):
+        queue.enqueue("1", f"m{i}")
+    queue.start()
+    try:
+        assert queue.drain(5)
+    finally:
+        queue.stop()
+    
+    assert [text for _, text, _ in sender.sent] == ["m0", "m1", "m2", "m3"]
+    gaps = [b[2] - a[2] for a, b in zip(sender.sent, sender.sent[1:])]
+    assert min(gaps) >= 0.09
+
+def test_limited_chat_does_not_hold_up_other_chats(tmp_path):
+    sender = RecordingSender()
+    queue = make_queue(tmp_path, sender, chat_rate=2)
+    for i in range(3):
+        queue.enqueue("busy", f"busy{i}")
+    queue.enqueue("quiet", "quiet0")
+    queue.start()
+    try:
+        assert queue.drain(5)
+    finally:
+        queue.stop()
+    
+    texts = [text for _, text, _ in sender.sent]
+    assert texts.index("quiet0") < texts.index("busy1")
+
+def test_most_urgent_ready_message_goes_first(tmp_path):
+    sender = RecordingSender()
+    queue = make_queue(tmp_path, sender, send_workers=1)
+    queue.enqueue("1", "news", PRIORITY_NEWS)
+    queue.enqueue("2", "alert", PRIORITY_ALERT)
+    queue.enqueue("3", "report")
+    queue.start()
+    try:
+        assert queue.drain(5)
+    finally:
+        queue.stop()
+    
+    assert [text for _, text, _ in sender.sent] == ["alert", "report", "news"]
+
+def test_retry_later_requeues_message(tmp_path):
+    sender = RecordingSender()
+    sender.fail_next.append(RetryLater("flood", retry_after=0.2))
+    queue = make_queue(tmp_path, sender)
+    queue.enqueue("1", "hello")
+    started = time.monotonic()
+    queue.start()
+    try:
+        assert queue.drain(5)
+    finally:
+        queue.stop()
+    
+    assert [text for _, text, _ in sender.sent] == ["hello"]
+    assert sender.sent[0][2] - started >= 0.2
+    assert queue.get_status()["sent"] == 1
+
+def test_gives_up_after_max_attempts(tmp_path):
+    sender = RecordingSender()
+    sender.fail_next.extend([RetryLater("down", retry_after=0), RetryLater("down", retry_after=0)])
+    queue = make_queue(tmp_path, sender, max_attempts=2, chat_rate=100)
+    queue.enqueue("1", "hello")
+    queue.start()
+    try:
+        assert queue.drain(5)
+    finally:
+        queue.stop()
+    
+    assert sender.sent == []
+    assert queue.get_status()["failed"] == 1
+    assert len(make_queue(tmp_path, sender)) == 0
+
+def test_enqueued_messages_survive_a_crash(tmp_path):
+    sender = RecordingSender()
+    queue = make_queue(tmp_path, sender)
+    queue.enqueue("1", "first")
+    queue.enqueue_many(["2", "3"], "second")
+    # No stop(): the process dies with everything still queued
+    
+    restored = make_queue(tmp_path, sender)
+    assert len(restored) == 3
+    restored.start()
+    try:
+        assert restored.drain(5)
+    finally:
+        restored.stop()
+    assert sorted(text for _, text, _ in sender.sent) == ["first", "second", "second"]
+    assert len(make_queue(tmp_path, sender)) == 0
+
+def test_in_flight_message_survives_a_crash(tmp_path):
+    sender = RecordingSender()
+    sender.release.clear()
+    queue = make_queue(tmp_path, sender)
+    queue.enqueue("1", "stuck")
+    queue.start()
+    deadline = time.monotonic() + 5
+    while queue.get_status()["in_flight"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue.get_status()["in_flight"] == 1
+    
+    # The send never finished, so a restart must still have the message
+    restored = make_queue(tmp_path, RecordingSender())
+    assert len(restored) == 1
+    sender.release.set()
+    queue.stop()
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    sender = RecordingSender()
+    queue = make_queue(tmp_path, sender, compact_min=5, chat_rate=100)
+    queue.start()
+    try:
+        for i in range(20):
+            queue.enqueue("1", f"m{i}")
+            assert queue.drain(5)
+    finally:
+        queue.stop()
+    
+    with open(tmp_path / "telegram_outbox.json.log") as f:
+        assert len(f.readlines()) <= 5
+    assert len(sender.sent) == 20
+    assert len(make_queue(tmp_path, sender)) == 0
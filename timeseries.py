@@ -0,0 +1,174 @@
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+RECORD_SIZE = array('d').itemsize * 2  # One (timestamp, price) pair
+
+class PriceSeries:
+    """Append-only, array-backed price series for a single asset
+    
+    Timestamps are kept sorted so range and point lookups are binary searches.
+    Memory is bounded: once the series grows past capacity plus some slack the
+    oldest points are dropped in one chunk, keeping appends amortized O(1).
+    """
+    
+    def __init__(self, capacity: int = 10080):
+        self.capacity = capacity
+        self.timestamps = array('d')
+        self.prices = array('d')
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def append(self, timestamp: float, price: float) -> bool:
+        """Append a point; points older than the latest one are rejected"""
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            return False
+        
+        self.timestamps.append(timestamp)
+        self.prices.append(price)
+        
+        if len(self.timestamps) > self.capacity + max(1, self.capacity // 4):
+            self._trim()
+        return True
+    
+    def _trim(self):
+        """Drop the oldest points so at most capacity remain"""
+        excess = len(self.timestamps) - self.capacity
+        if excess > 0:
+            del self.timestamps[:excess]
+            del self.prices[:excess]
+    
+    def range(self, start: float, end: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Get all points with start <= timestamp <= end"""
+        lo = bisect_left(self.timestamps, start)
+        hi = len(self.timestamps) if end is None else bisect_right(self.timestamps, end)
+        return list(zip(self.timestamps[lo:hi], self.prices[lo:hi]))
+    
+    def latest(self, n: int = 1) -> List[Tuple[float, float]]:
+        """Get the n most recent points, oldest first"""
+        if n <= 0:
+            return []
+        return list(zip(self.timestamps[-n:], self.prices[-n:]))
+    
+    def value_at(self, timestamp: float, tolerance: Optional[float] = None) -> Optional[float]:
+        """Get the price at or just before timestamp, optionally no older than tolerance seconds"""
+        i = bisect_right(self.timestamps, timestamp)
+        if i == 0:
+            return None
+        if tolerance is not None and timestamp - self.timestamps[i - 1] > tolerance:
+            return None
+        return self.prices[i - 1]
+    
+    @property
+    def first_timestamp(self) -> Optional[float]:
+        return self.timestamps[0] if self.timestamps else None
+    
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        return self.timestamps[-1] if self.timestamps else None
+    
+    def to_bytes(self) -> bytes:
+        """Serialize as interleaved (timestamp, price) doubles"""
+        packed = array('d', [0.0]) * (2 * len(self.timestamps))
+        packed[0::2] = self.timestamps
+        packed[1::2] = self.prices
+        return packed.tobytes()
+    
+    def load_bytes(self, data: bytes):
+        """Replace contents with interleaved (timestamp, price) doubles, keeping the newest capacity points"""
+        usable = len(data) - len(data) % RECORD_SIZE
+        packed = array('d')
+        packed.frombytes(data[max(0, usable - self.capacity * RECORD_SIZE):usable])
+        self.timestamps = packed[0::2]
+        self.prices = packed[1::2]
+
+class TimeSeriesStore:
+    """Per-asset price history backed by append-only binary files"""
+    
+    def __init__(self, directory: str = "price_history", capacity: int = 10080):
+        self.directory = directory
+        self.capacity = capacity
+        self._series: Dict[str, PriceSeries] = {}
+        self._file_records: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, asset: str) -> str:
+        return os.path.join(self.directory, f"{asset}.bin")
+    
+    def series(self, asset: str) -> PriceSeries:
+        """Get the series for an asset, loading it from disk on first use"""
+        with self._lock:
+            return self._load(asset)
+    
+    def _load(self, asset: str) -> PriceSeries:
+        series = self._series.get(asset)
+        if series is not None:
+            return series
+        
+        series = PriceSeries(self.capacity)
+        records = 0
+        path = self._path(asset)
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                series.load_bytes(data)
+                records = len(data) // RECORD_SIZE
+            except IOError as e:
+                print(f"Error loading price history for {asset}: {e}")
+        
+        self._series[asset] = series
+        self._file_records[asset] = records
+        return series
+    
+    def append(self, asset: str, timestamp: float, price: float):
+        """Record a price point in memory and append it to the asset's file"""
+        with self._lock:
+            series = self._load(asset)
+            if not series.append(timestamp, price):
+                return
+            
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._path(asset), 'ab') as f:
+                    f.write(array('d', [timestamp, price]).tobytes())
+                self._file_records[asset] += 1
+                
+                # Rewrite the file once it holds far more than we keep in memory
+                if self._file_records[asset] > 2 * self.capacity:
+                    self._compact(asset, series)
+            except (IOError, OSError) as e:
+                print(f"Error saving price history for {asset}: {e}")
+    
+    def _compact(self, asset: str, series: PriceSeries):
+        """Replace an asset's file with just the points held in memory"""
+        path = self._path(asset)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(series.to_bytes())
+        os.replace(tmp_path, path)
+        self._file_records[asset] = len(series)
+    
+    def range(self, asset: str, start: float, end: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Get an asset's points between start and end"""
+        with self._lock:
+            return self._load(asset).range(start, end)
+    
+    def latest(self, asset: str, n: int = 1) -> List[Tuple[float, float]]:
+        """Get an asset's n most recent points"""
+        with self._lock:
+            return self._load(asset).latest(n)
+    
+    def arrays(self, asset: str) -> Tuple[array, array]:
+        """Copies of an asset's timestamps and prices, ready for NumPy"""
+        with self._lock:
+            series = self._load(asset)
+            return array('d', series.timestamps), array('d', series.prices)
+    
+    def value_at(self, asset: str, timestamp: float, tolerance: Optional[float] = None) -> Optional[float]:
+        """Get an asset's price at or just before timestamp"""
+        with self._lock:
+            return self._load(asset).value_at(timestamp, tolerance)
@@ -1,64 +1,65 @@
-from flask import Flask, render_template, jsonify, request
-import threading
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory
+import os
 import time
-import requests
-from datetime import datetime
-from bot import EthereumBot
-from scheduler import TaskScheduler
-from data_store import DataStore
+from bot_service import BotService, BotServiceManager
 from config import Config
+from events import EventBus, EventRelay
 
 app = Flask(__name__)
-bot = None
-scheduler = None
-data_store = DataStore()
-config = Config()
-
-def create_bot_instance():
-    """Create and return bot instance"""
-    global bot
-    if bot is None:
-        bot = EthereumBot()
-    return bot
+service = None  # BotService, or in multi-worker mode a proxy to the owner process's
+event_bus = None  # Set in multi-worker mode to a local mirror of the owner's events
+config = None  # Config, read on first use unless main.py hands over its own
 
-def start_bot_monitoring():
-    """Start bot monitoring in background"""
-    global scheduler
-    
-    if scheduler and scheduler.running:
-        return
-    
-    bot_instance = create_bot_instance()
-    scheduler = TaskScheduler()
-    
-    # Add scheduled tasks
-    scheduler.add_periodic_task(
-        bot_instance.check_price_alerts,
-        config.check_interval,
-        "Price Monitoring"
-    )
-    
-    scheduler.add_hourly_task(
-        bot_instance.send_daily_report,
-        config.daily_report_hours,
-        0,
-        "Daily Reports"
-    )
-    
-    scheduler.add_periodic_task(
-        bot_instance.check_news_updates,
-        300,  # Check news every 5 minutes
-        "News Updates"
-    )
+# (etag, body) of the last status received from the service
+status_cache = (None, None)
+
+def configure(app_config: Config):
+    """Use an already loaded Config instead of reading it again"""
+    global config
+    config = app_config
+
+def get_config() -> Config:
+    """Get the Config, loading it on first use"""
+    global config
+    if config is None:
+        config = Config()
+    return config
+
+def get_service():
+    """Get the bot service, creating it in this process unless connected to an owner"""
+    global service
+    if service is None:
+        service = BotService(get_config())
+    return service
+
+def get_event_bus():
+    """Event bus the SSE endpoint streams from"""
+    return event_bus if event_bus is not None else get_service().event_bus
+
+def connect_to_owner(address, authkey, timeout=30):
+    """Use the BotService of the owner process at address instead of a local one"""
+    global service, event_bus
+    BotServiceManager.register("service")
+    manager = BotServiceManager(address=address, authkey=authkey)
     
-    # Add daily comparison task (8 AM only)
-    scheduler.add_daily_task(
-        bot_instance.send_daily_comparison,
-        hour=config.daily_comparison_hour,
-        name="Daily Comparison"
-    )
+    # The owner starts listening just after forking its workers
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            manager.connect()
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
     
-    scheduler.start()
+    service = manager.service()
+    event_bus = EventBus()
+    EventRelay(service.wait_events, event_bus).start()
+
+def start_bot_monitoring():
+    """Start bot monitoring in background"""
+    get_service().start_monitoring()
 
 @app.route('/')
 def index():
@@ -70,34 +71,61 @@ def advanced():
     """Advanced dashboard page"""
     return render_template('index.html')
 
+def get_status_snapshot():
+    """Return (etag, body) for the current status, fetching the body only when it changed"""
+    global status_cache
+    cached = status_cache
+    etag, body = get_service().status_snapshot(cached[0])
+    if body is None:
+        return cached
+    status_cache = (etag, body)
+    return etag, body
+
 @app.route('/api/status')
 def api_status():
-    """Get bot status"""
-    bot_instance = create_bot_instance()
-    current_price = bot_instance.get_eth_price()
-    link_price = bot_instance.get_link_price()
-    
-    status = {
-        "bot_running": scheduler.running if scheduler else False,
-        "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "current_price": current_price,
-        "last_price": data_store.get("last_price"),
-        "bot_start_time": data_store.get("bot_start_time"),
-        "total_alerts_sent": data_store.get("total_alerts_sent", 0),
-        "total_news_sent": data_store.get("total_news_sent", 0),
-        "last_error": data_store.get("last_error", ""),
-        "config": {
-            "price_threshold": config.price_change_threshold,
-            "check_interval": config.check_interval,
-            "daily_report_hours": config.daily_report_hours,
-            "news_enabled": config.has_cryptopanic_key
-        }
-    }
+    """Get bot status, answering If-None-Match with 304 while nothing has changed"""
+    etag, body = get_status_snapshot()
     
-    if scheduler:
-        status["scheduler"] = scheduler.get_status()
-    
-    return jsonify(status)
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype="application/json", headers=headers)
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of price, counter, error and scheduler updates"""
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", 0, type=int)
+    return Response(
+        get_event_bus().stream(since),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/api/metrics')
+def api_metrics():
+    """Metrics in Prometheus text format, or as JSON with ?format=json"""
+    if request.args.get("format") == "json":
+        return jsonify(get_service().metrics_snapshot())
+    return Response(get_service().metrics_text(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/profile', methods=['GET'])
+def api_profiles():
+    """List profile requests and saved profiles"""
+    return jsonify(get_service().list_profiles())
+
+@app.route('/api/profile', methods=['POST'])
+def api_profile_task():
+    """Profile the next runs of a scheduled task: {"task": "Price Monitoring", "runs": 3}"""
+    return jsonify(get_service().profile_task(request.get_json(force=True) or {}))
+
+@app.route('/api/profile/<path:filename>')
+def api_profile_file(filename):
+    """Download a saved .prof file or its .txt summary"""
+    if not filename.endswith((".prof", ".txt")):
+        return jsonify({"error": "Not a profile file"}), 404
+    return send_from_directory(os.path.abspath(get_config().profile_dir), filename, as_attachment=True)
 
 @app.route('/api/start', methods=['POST'])
 def api_start():
@@ -111,11 +139,8 @@ def api_start():
 @app.route('/api/stop', methods=['POST'])
 def api_stop():
     """Stop bot monitoring"""
-    global scheduler
     try:
-        if scheduler:
-            scheduler.stop()
-            scheduler = None
+        get_service().stop_monitoring()
         return jsonify({"success": True, "message": "Bot stopped successfully"})
     except Exception as e:
         return jsonify({"success": False, "message": str(e)})
@@ -123,81 +148,61 @@ def api_stop():
 @app.route('/api/test-telegram', methods=['POST'])
 def api_test_telegram():
     """Test Telegram connection"""
-    try:
-        bot_instance = create_bot_instance()
-        success = bot_instance.send_telegram_message(
-            "🧪 <b>Test Message</b>\n\nTelegram connection is working!"
-        )
-        if success:
-            return jsonify({"success": True, "message": "Test message sent successfully"})
-        else:
-            return jsonify({"success": False, "message": "Failed to send test message"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
+    return jsonify(get_service().test_telegram())
 
 @app.route('/api/manual-check', methods=['POST'])
 def api_manual_check():
     """Manually trigger a check cycle"""
-    try:
-        bot_instance = create_bot_instance()
-        bot_instance.run_check_cycle()
-        return jsonify({"success": True, "message": "Manual check completed"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
+    return jsonify(get_service().manual_check())
 
 @app.route('/api/price-history')
 def api_price_history():
     """Get price history data"""
-    try:
-        bot_instance = create_bot_instance()
-        price_data = bot_instance.get_eth_24h_data()
-        
-        if price_data:
-            current, price_24h_ago = price_data
-            change = current - price_24h_ago
-            change_percent = (change / price_24h_ago) * 100
-            
-            return jsonify({
-                "current_price": current,
-                "price_24h_ago": price_24h_ago,
-                "change": change,
-                "change_percent": change_percent
-            })
-        else:
-            return jsonify({"error": "Unable to fetch price history"})
-    except Exception as e:
-        return jsonify({"error": str(e)})
+    return jsonify(get_service().price_history(request.args.get("id", "ethereum")))
+
+@app.route('/api/price-series')
+def api_price_series():
+    """Get locally recorded price points for charts"""
+    return jsonify(get_service().price_series(
+        request.args.get("id", "ethereum"),
+        request.args.get("since", type=float),
+        request.args.get("limit", 500, type=int)
+    ))
+
+@app.route('/api/subscribers', methods=['GET'])
+def api_subscribers():
+    """List subscribers"""
+    return jsonify(get_service().list_subscribers())
+
+@app.route('/api/subscribers', methods=['POST'])
+def api_add_subscriber():
+    """Add or update a subscriber"""
+    return jsonify(get_service().add_subscriber(request.get_json(force=True) or {}))
+
+@app.route('/api/subscribers/<chat_id>', methods=['DELETE'])
+def api_remove_subscriber(chat_id):
+    """Remove a subscriber"""
+    return jsonify(get_service().remove_subscriber(chat_id))
+
+@app.route('/api/alerts', methods=['GET'])
+def api_alerts():
+    """List price level alerts, optionally for one chat"""
+    return jsonify(get_service().list_alerts(request.args.get("chat_id")))
+
+@app.route('/api/alerts', methods=['POST'])
+def api_add_alert():
+    """Add a price level ("cross") or percent move ("percent") alert"""
+    return jsonify(get_service().add_alert(request.get_json(force=True) or {}))
+
+@app.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
+def api_remove_alert(alert_id):
+    """Remove a price level alert"""
+    return jsonify(get_service().remove_alert(alert_id))
 
 @app.route('/api/get-chat-updates')
 def api_get_chat_updates():
     """Get recent chat updates to help find user chat ID"""
-    try:
-        bot_instance = create_bot_instance()
-
-        response = requests.get(f"{bot_instance.telegram_api_url}/getUpdates", timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("ok") and data.get("result"):
-                updates = []
-                for update in data["result"][-5:]:  # Last 5 updates
-                    if "message" in update:
-                        msg = update["message"]
-                        chat = msg["chat"]
-                        updates.append({
-                            "chat_id": chat["id"],
-                            "username": chat.get("username", ""),
-                            "first_name": chat.get("first_name", ""),
-                            "text": msg.get("text", ""),
-                            "date": msg["date"]
-                        })
-                return jsonify({"success": True, "updates": updates})
-            else:
-                return jsonify({"success": False, "message": "No updates found"})
-        else:
-            return jsonify({"success": False, "message": f"HTTP error: {response.status_code}"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
+    return jsonify(get_service().chat_updates())
 
 if __name__ == '__main__':
     # Auto-start the bot
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from multiprocessing.connection import arbitrary_address
+from typing import List
+
+from werkzeug.serving import make_server
+
+import web_app
+from bot_service import BotServiceManager
+
+def _exit_with_owner(server, owner_pid: int):
+    """Stop serving once the owner process is gone, so no orphan keeps the port"""
+    while os.getppid() == owner_pid:
+        time.sleep(1)
+    print(f"👋 Owner process {owner_pid} exited, stopping web worker {os.getpid()}")
+    server.shutdown()
+
+def _run_worker(fd: int, host: str, port: int, address: str, authkey: bytes, owner_pid: int):
+    """HTTP worker: serve the dashboard on the shared socket, using the owner's bot"""
+    web_app.connect_to_owner(address, authkey)
+    server = make_server(host, port, web_app.app, threaded=True, fd=fd)
+    threading.Thread(target=_exit_with_owner, args=(server, owner_pid), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+def _interrupt(signum, frame):
+    """Turn SIGTERM from a process manager into the same shutdown as Ctrl+C"""
+    raise KeyboardInterrupt
+
+def serve(workers: int = 2, host: str = "0.0.0.0", port: int = 5000):
+    """Serve the dashboard from several worker processes while this process owns the bot
+    
+    All workers accept connections on one listening socket. Only this process
+    creates the bot and runs the scheduler; workers reach it through a
+    BotServiceManager on a private Unix socket, so there is exactly one set
+    of scheduled tasks and API polling however many workers serve HTTP.
+    Workers are forked before any bot threads start, and stop on their own if
+    this process dies. SIGTERM shuts down like Ctrl+C. Requires a POSIX system.
+    """
+    listener = socket.create_server((host, port), backlog=128)
+    listener.set_inheritable(True)
+    
+    # A fresh path in multiprocessing's own temp dir, which it removes at exit
+    address = arbitrary_address("AF_UNIX")
+    authkey = os.urandom(16)
+    
+    context = multiprocessing.get_context("fork")
+    processes: List[multiprocessing.Process] = []
+    for _ in range(workers):
+        process = context.Process(
+            target=_run_worker,
+            args=(listener.fileno(), host, port, address, authkey, os.getpid()),
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+    
+    service = web_app.get_service()
+    BotServiceManager.register("service", callable=lambda: service)
+    manager = BotServiceManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🌐 Serving on http://{host}:{port} with {workers} worker processes")
+    
+    # Installed after forking so workers keep the default SIGTERM, which terminate() sends
+    previous_handler = signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        service.start_monitoring()
+        while any(process.is_alive() for process in processes):
+            for process in processes:
+                process.join(1)
+                if process.exitcode not in (None, 0):
+                    print(f"❌ Web worker {process.pid} exited with code {process.exitcode}")
+                    processes.remove(process)
+                    break
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down...")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(5)
+        service.stop_monitoring()
+        listener.close()
+        signal.signal(signal.SIGTERM, previous_handler)